@@ -0,0 +1,387 @@
+"""ASGI entry point for async serving.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+The Groq-bound routes (/api/upload, /api/upload/stream, /api/ai/analyze) run
+as coroutines on an httpx client, so a request waiting on Groq holds no
+thread and one worker can keep hundreds of calls in flight. Text extraction,
+SQLite and the other blocking steps run on a thread pool; every other route
+is served by the Flask app from main.py on that pool. ``main:app`` stays the
+WSGI entry point.
+"""
+import io
+import os
+import sys
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from flask import jsonify
+from groq_client import AsyncGroqClient, GroqError, estimate_tokens
+from lazy_loading import LazyObject
+from metrics import STAGE_SECONDS
+from model_routing import AsyncModelRouter
+from llm_scheduler import INTERACTIVE
+from main import (
+    app as flask_app, GROQ_API_URL, LLM_CAPACITY_ERROR, MODEL_NAME, NO_LLM, SSE_HEADERS, SERVICES,
+    TASK_LATENCY_CLASSES, StreamingResumeParser, UploadAnalysis, UploadStream, analyze_offline, extract_local_fields,
+    extract_resumes_from_groq_content, finish_analysis, finish_upload, groq_breaker, groq_latency, groq_limiter,
+    llm_scheduler, local_fallback, prepare_analysis, prepare_upload, require_groq_key, uploaded_files,
+    valid_upload_reply, _merge_local, _upload_prompt
+)
+
+# Threads for extraction, SQLite and the Flask routes
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 32))
+# Read size of the streamed request body handed to the WSGI routes
+BODY_BUFFER_BYTES = 64 * 1024
+
+async_groq_client = LazyObject(
+    'async_groq_client',
+    lambda: AsyncGroqClient(require_groq_key(), GROQ_API_URL, MODEL_NAME, limiter=groq_limiter, breaker=groq_breaker,
+                            latency=groq_latency)
+)
+SERVICES.append(async_groq_client)
+async_model_router = AsyncModelRouter(async_groq_client)
+# httpx logs every request at INFO
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+# -------- Async Groq Path --------
+async def query_groq_async(task, prompt, validate=None):
+    async with llm_scheduler.slot_async(TASK_LATENCY_CLASSES.get(task, INTERACTIVE), estimate_tokens(prompt)) as ticket:
+        if ticket is None:
+            return {'error': LLM_CAPACITY_ERROR}
+        with STAGE_SECONDS.time(stage='groq_call'):
+            return await async_model_router.chat(task, prompt, validate)
+
+async def _query_upload_chunk(chunk, local_fields):
+    groq_response = await query_groq_async('upload_extract', _upload_prompt(chunk, local_fields),
+                                           lambda content: valid_upload_reply(content, chunk, local_fields))
+    if "choices" not in groq_response:
+        if groq_breaker.degraded():
+            return [local_fallback(filename, text) for filename, text in chunk], None
+        return None, str(groq_response)
+    return extract_resumes_from_groq_content(groq_response["choices"][0]["message"]["content"]), None
+
+async def analyze_resume_texts_async(resume_texts):
+    """main.analyze_resume_texts with every chunk of a pass awaited concurrently"""
+    if NO_LLM:
+        return analyze_offline(resume_texts)
+
+    local_fields = {filename: extract_local_fields(text) for filename, text in resume_texts.items()}
+    analysis = UploadAnalysis(resume_texts, local_fields)
+    for chunks in analysis.passes():
+        analysis.collect(chunks, await asyncio.gather(*(_query_upload_chunk(chunk, local_fields) for chunk in chunks)))
+    return analysis.outcome()
+
+async def _stream_upload_chunk(chunk, local_fields, events):
+    """Stream one chunk from Groq, putting each resume on ``events`` as soon as its block is complete"""
+    prompt = _upload_prompt(chunk, local_fields)
+    parser = StreamingResumeParser()
+    sent = set()
+    try:
+        async with llm_scheduler.slot_async(INTERACTIVE, estimate_tokens(prompt)) as ticket:
+            if ticket is None:
+                raise GroqError(LLM_CAPACITY_ERROR)
+            async for delta in async_model_router.chat_stream('upload_stream', prompt):
+                for resume in parser.feed(delta):
+                    sent.add(resume['filename'])
+                    events.put_nowait(('resume', _merge_local(resume, local_fields)))
+    except GroqError as e:
+        if groq_breaker.degraded():
+            for filename, text in chunk:
+                if filename not in sent:
+                    events.put_nowait(('resume', local_fallback(filename, text)))
+        else:
+            events.put_nowait(('chunk_error', {'files': [filename for filename, _ in chunk], 'error': str(e)}))
+    finally:
+        events.put_nowait(('chunk_done', None))
+
+# -------- Async Routes --------
+class AsyncStream:
+    """Streaming reply of an async route: an async iterator of str chunks"""
+
+    def __init__(self, chunks, mimetype, headers=None):
+        self.chunks = chunks
+        self.mimetype = mimetype
+        self.headers = headers or {}
+
+async def upload_resumes():
+    files, error = await asyncio.to_thread(uploaded_files)
+    if error:
+        return error
+
+    order, results_by_file, resume_texts, digests, signatures, error = await asyncio.to_thread(prepare_upload, files)
+    if error:
+        return error
+
+    analysis = await analyze_resume_texts_async(resume_texts) if resume_texts else ({}, [], [])
+    return await asyncio.to_thread(finish_upload, order, results_by_file, digests, signatures, *analysis)
+
+async def upload_resumes_stream():
+    files, error = await asyncio.to_thread(uploaded_files)
+    if error:
+        return error
+
+    order, results_by_file, resume_texts, digests, signatures, error = await asyncio.to_thread(prepare_upload, files)
+    if error:
+        return error
+    stream = UploadStream(order, results_by_file, resume_texts, digests, signatures)
+
+    async def generate():
+        for event in await asyncio.to_thread(list, stream.known()):
+            yield event
+        if resume_texts and NO_LLM:
+            for event in await asyncio.to_thread(list, stream.offline()):
+                yield event
+        elif resume_texts:
+            events = asyncio.Queue()
+            chunks = stream.chunks()
+            tasks = [asyncio.create_task(_stream_upload_chunk(chunk, stream.local_fields, events)) for chunk in chunks]
+            try:
+                remaining = len(chunks)
+                while remaining:
+                    kind, payload = await events.get()
+                    if kind == 'chunk_done':
+                        remaining -= 1
+                        continue
+                    # Stores the resume, so it runs off the event loop
+                    event = await asyncio.to_thread(stream.handle, kind, payload)
+                    if event is not None:
+                        yield event
+            finally:
+                # The client went away; stop paying for the remaining completions
+                for task in tasks:
+                    task.cancel()
+        for event in stream.finish():
+            yield event
+
+    return AsyncStream(generate(), 'text/event-stream', SSE_HEADERS)
+
+async def ai_analyze_resume():
+    try:
+        filename, cache_key, analysis_prompt, response = await asyncio.to_thread(prepare_analysis)
+        if response is not None:
+            return response
+        groq_response = await query_groq_async('analysis', analysis_prompt)
+        return await asyncio.to_thread(finish_analysis, filename, cache_key, groq_response)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+ASYNC_ROUTES = {
+    ('POST', '/api/upload'): upload_resumes,
+    ('POST', '/api/upload/stream'): upload_resumes_stream,
+    ('POST', '/api/ai/analyze'): ai_analyze_resume
+}
+
+# -------- ASGI Adapter --------
+class ReceiveStream(io.RawIOBase):
+    """Request body pulled from ASGI ``receive`` as a worker thread reads it.
+
+    Lets WSGI routes such as the bulk upload PATCH copy the body to disk
+    chunk by chunk instead of it being gathered in memory first. A client
+    disconnect ends the stream early.
+    """
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = bytearray()
+        self._done = False
+
+    def readable(self):
+        return True
+
+    def _pull(self):
+        message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+        if message['type'] == 'http.disconnect':
+            self._done = True
+            return
+        self._buffer += message.get('body', b'')
+        if not message.get('more_body'):
+            self._done = True
+
+    def readinto(self, b):
+        while not self._buffer and not self._done:
+            self._pull()
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        del self._buffer[:size]
+        return size
+
+def wsgi_environ(scope, body, content_length=None):
+    """WSGI environ for an ASGI http scope and its body.
+
+    ``body`` is either the buffered bytes or a stream of the client's
+    declared ``content_length``.
+    """
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    if isinstance(body, bytes):
+        content_length = len(body)
+        body = io.BytesIO(body)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': '',
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'CONTENT_LENGTH': str(content_length),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1')
+        value = value.decode('latin-1')
+        if name == 'content-length':
+            continue
+        key = 'CONTENT_TYPE' if name == 'content-type' else 'HTTP_' + name.upper().replace('-', '_')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+def _content_length(scope):
+    for name, value in scope['headers']:
+        if name.lower() == b'content-length':
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+def _header_list(headers):
+    return [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+class AsyncApp:
+    """ASGI app running ``routes`` as coroutines and everything else through the Flask WSGI app.
+
+    Async routes run inside a Flask request context with the app's before-
+    and after-request hooks, so CORS headers and request metrics match the
+    WSGI path. Bodies over MAX_CONTENT_LENGTH get a 413 up front. The async
+    routes and chunked requests are read in full before the route runs; every
+    other WSGI route reads its body from ``receive`` as it goes.
+    """
+
+    def __init__(self, flask_app, routes, threads=ASGI_THREADS):
+        self.flask_app = flask_app
+        self.routes = routes
+        self.threads = threads
+        self.max_body = flask_app.config.get('MAX_CONTENT_LENGTH')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+
+        handler = self.routes.get((scope['method'], scope['path']))
+        content_length = _content_length(scope)
+        if self.max_body is not None and content_length is not None and content_length > self.max_body:
+            return await self._send_plain(send, 413, b'Request Entity Too Large')
+
+        if handler is None and content_length is not None:
+            body = io.BufferedReader(ReceiveStream(receive, asyncio.get_running_loop()), BODY_BUFFER_BYTES)
+        else:
+            # Chunked bodies have no length to check up front, so they are read (and capped) first
+            body = await self._read_body(receive)
+            if body is None:
+                return await self._send_plain(send, 413, b'Request Entity Too Large')
+            content_length = len(body)
+        environ = wsgi_environ(scope, body, content_length)
+        if handler is None:
+            # One thread runs the whole WSGI call, so streamed responses keep their context
+            await asyncio.to_thread(self._run_wsgi, environ, send, asyncio.get_running_loop())
+        else:
+            await self._run_async(handler, environ, send)
+
+    async def _read_body(self, receive):
+        """Whole request body, or None once it exceeds MAX_CONTENT_LENGTH"""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if self.max_body is not None and size > self.max_body:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                break
+        return b''.join(chunks)
+
+    async def _send_plain(self, send, status, body):
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'text/plain'), (b'content-length', str(len(body)).encode())]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _run_async(self, handler, environ, send):
+        with self.flask_app.request_context(environ):
+            rv = self.flask_app.preprocess_request()
+            stream = None
+            if rv is None:
+                try:
+                    rv = await handler()
+                except Exception as e:
+                    self.flask_app.logger.exception("Async route failed")
+                    rv = jsonify({'error': str(e)}), 500
+            if isinstance(rv, AsyncStream):
+                stream = rv
+                rv = self.flask_app.response_class(mimetype=stream.mimetype, headers=stream.headers)
+            response = self.flask_app.process_response(self.flask_app.make_response(rv))
+
+        await send({'type': 'http.response.start', 'status': response.status_code,
+                    'headers': _header_list(response.headers.to_wsgi_list())})
+        if stream is None:
+            await send({'type': 'http.response.body', 'body': response.get_data()})
+            return
+        try:
+            async for chunk in stream.chunks:
+                await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+        finally:
+            await stream.chunks.aclose()
+        await send({'type': 'http.response.body', 'body': b''})
+
+    def _run_wsgi(self, environ, send, loop):
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        started = {}
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = headers
+
+        iterable = self.flask_app(environ, start_response)
+        try:
+            send_sync({'type': 'http.response.start', 'status': started['status'],
+                       'headers': _header_list(started['headers'])})
+            for chunk in iterable:
+                if chunk:
+                    send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            send_sync({'type': 'http.response.body', 'body': b''})
+        finally:
+            close = getattr(iterable, 'close', None)
+            if close is not None:
+                close()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                loop = asyncio.get_running_loop()
+                loop.set_default_executor(ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='asgi'))
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if async_groq_client.loaded:
+                    await async_groq_client.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+app = AsyncApp(flask_app, ASYNC_ROUTES)
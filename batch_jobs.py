@@ -0,0 +1,303 @@
+import os
+import json
+import time
+import uuid
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from llm_scheduler import ANONYMOUS, run_as
+
+logger = logging.getLogger(__name__)
+
+JOBS_FILE = os.environ.get('BATCH_JOBS_FILE', 'data/batch_jobs.sqlite3')
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 8))
+# Files claimed by a worker that died are handed out again after this many seconds
+BATCH_LEASE_SECONDS = int(os.environ.get('BATCH_LEASE_SECONDS', 600))
+
+# -------- Durable Job Store --------
+class BatchJobStore:
+    """SQLite-backed job and per-file state, shared by all worker processes"""
+
+    def __init__(self, path=JOBS_FILE):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS batch_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    total INTEGER NOT NULL,
+                    processed INTEGER NOT NULL DEFAULT 0,
+                    errors INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    sealed INTEGER NOT NULL DEFAULT 1,
+                    tenant TEXT NOT NULL DEFAULT 'anonymous'
+                )
+            """)
+            # Stores created before bulk ingest (every job sealed) or tenants lack these columns
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(batch_jobs)")}
+            if 'sealed' not in columns:
+                conn.execute("ALTER TABLE batch_jobs ADD COLUMN sealed INTEGER NOT NULL DEFAULT 1")
+            if 'tenant' not in columns:
+                conn.execute(f"ALTER TABLE batch_jobs ADD COLUMN tenant TEXT NOT NULL DEFAULT '{ANONYMOUS}'")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS batch_job_files (
+                    job_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    filename TEXT NOT NULL,
+                    data BLOB,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    claimed_at REAL,
+                    PRIMARY KEY (job_id, idx)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_batch_jobs_created ON batch_jobs(created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_batch_job_files_status ON batch_job_files(status)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def create_job(self, files, tenant=ANONYMOUS):
+        """Persist a new job; ``files`` is a list of (filename, bytes)"""
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO batch_jobs (id, status, total, created_at, tenant) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, len(files), time.time(), tenant)
+            )
+            conn.executemany(
+                "INSERT INTO batch_job_files (job_id, idx, filename, data, status) VALUES (?, ?, ?, ?, 'queued')",
+                [(job_id, idx, filename, sqlite3.Binary(data)) for idx, (filename, data) in enumerate(files)]
+            )
+        return job_id
+
+    def open_job(self, tenant=ANONYMOUS):
+        """Persist an empty job that grows with ``add_file`` and completes only once sealed"""
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO batch_jobs (id, status, total, created_at, sealed, tenant) VALUES (?, 'queued', 0, ?, 0, ?)",
+                (job_id, time.time(), tenant)
+            )
+        return job_id
+
+    def add_file(self, job_id, filename, data):
+        """Append a file to an open job and return its index"""
+        with self._connect() as conn:
+            return add_job_file(conn, job_id, filename, data)
+
+    def seal_job(self, job_id):
+        """Mark an open job complete once its files are; no more files may be added"""
+        with self._connect() as conn:
+            seal_open_job(conn, job_id)
+
+    def claim_file(self, job_id, idx):
+        """Atomically claim a queued (or abandoned) file. Returns (filename, data, tenant) or None."""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            cur = conn.execute(
+                """UPDATE batch_job_files SET status = 'running', claimed_at = ?
+                   WHERE job_id = ? AND idx = ?
+                     AND (status = 'queued' OR (status = 'running' AND claimed_at < ?))""",
+                (now, job_id, idx, now - BATCH_LEASE_SECONDS)
+            )
+            if cur.rowcount == 0:
+                return None
+            conn.execute(
+                "UPDATE batch_jobs SET status = 'running', started_at = COALESCE(started_at, ?) WHERE id = ?",
+                (now, job_id)
+            )
+        row = conn.execute(
+            """SELECT f.filename, f.data, j.tenant FROM batch_job_files f JOIN batch_jobs j ON j.id = f.job_id
+               WHERE f.job_id = ? AND f.idx = ?""", (job_id, idx)
+        ).fetchone()
+        return row['filename'], bytes(row['data']), row['tenant']
+
+    def finish_file(self, job_id, idx, result):
+        """Record a file result, drop its payload and roll the job forward"""
+        failed = result.get('status') == 'error'
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "UPDATE batch_job_files SET status = ?, result = ?, data = NULL WHERE job_id = ? AND idx = ?",
+                ('error' if failed else 'done', json.dumps(result), job_id, idx)
+            )
+            conn.execute(
+                f"UPDATE batch_jobs SET {'errors = errors + 1' if failed else 'processed = processed + 1'} WHERE id = ?",
+                (job_id,)
+            )
+            _settle_job(conn, job_id)
+
+    def resumable_files(self):
+        """(job_id, idx) pairs that are queued or whose worker's lease expired, oldest job first"""
+        rows = self._connect().execute(
+            """SELECT f.job_id, f.idx FROM batch_job_files f JOIN batch_jobs j ON j.id = f.job_id
+               WHERE f.status = 'queued' OR (f.status = 'running' AND f.claimed_at < ?)
+               ORDER BY j.created_at, f.idx""",
+            (time.time() - BATCH_LEASE_SECONDS,)
+        ).fetchall()
+        return [(row['job_id'], row['idx']) for row in rows]
+
+    def count_unfinished(self):
+        """Files queued or running across all jobs"""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM batch_job_files WHERE status IN ('queued', 'running')"
+        ).fetchone()[0]
+
+    def get_job(self, job_id, include_results=True):
+        conn = self._connect()
+        job = conn.execute("SELECT * FROM batch_jobs WHERE id = ?", (job_id,)).fetchone()
+        if job is None:
+            return None
+        info = _job_summary(job)
+        if include_results:
+            rows = conn.execute(
+                "SELECT result FROM batch_job_files WHERE job_id = ? AND result IS NOT NULL ORDER BY idx",
+                (job_id,)
+            ).fetchall()
+            info['results'] = [json.loads(row['result']) for row in rows]
+        return info
+
+    def list_jobs(self, limit=20):
+        rows = self._connect().execute(
+            "SELECT * FROM batch_jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [_job_summary(row) for row in rows]
+
+def add_job_file(conn, job_id, filename, data):
+    """Append a file to an open job in the caller's transaction on the jobs file; returns its index"""
+    idx = conn.execute("SELECT total FROM batch_jobs WHERE id = ?", (job_id,)).fetchone()[0]
+    conn.execute(
+        "INSERT INTO batch_job_files (job_id, idx, filename, data, status) VALUES (?, ?, ?, ?, 'queued')",
+        (job_id, idx, filename, sqlite3.Binary(data))
+    )
+    conn.execute("UPDATE batch_jobs SET total = total + 1 WHERE id = ?", (job_id,))
+    return idx
+
+def seal_open_job(conn, job_id):
+    """Seal a job in the caller's transaction and settle it if its files are done"""
+    conn.execute("UPDATE batch_jobs SET sealed = 1 WHERE id = ?", (job_id,))
+    _settle_job(conn, job_id)
+
+def _settle_job(conn, job_id):
+    """Give a sealed job whose files are all done its final status"""
+    job = conn.execute("SELECT total, processed, errors, sealed FROM batch_jobs WHERE id = ?", (job_id,)).fetchone()
+    if not job['sealed'] or job['processed'] + job['errors'] < job['total']:
+        return
+    if job['errors'] == 0:
+        status = 'completed'
+    elif job['processed'] == 0:
+        status = 'failed'
+    else:
+        status = 'partial'
+    conn.execute(
+        "UPDATE batch_jobs SET status = ?, finished_at = ? WHERE id = ?",
+        (status, time.time(), job_id)
+    )
+
+def _format_duration(seconds):
+    minutes, secs = divmod(int(round(seconds)), 60)
+    return f"{minutes}m {secs}s" if minutes else f"{secs}s"
+
+def _job_summary(job):
+    done = job['processed'] + job['errors']
+    end = job['finished_at'] or time.time()
+    duration = end - job['started_at'] if job['started_at'] else 0
+    return {
+        'id': job['id'],
+        'status': job['status'],
+        'date': time.strftime('%Y-%m-%d', time.localtime(job['created_at'])),
+        'createdAt': job['created_at'],
+        'filesCount': job['total'],
+        'total': job['total'],
+        'processed': job['processed'],
+        'errors': job['errors'],
+        'progress': round(100 * done / job['total']) if job['total'] else (100 if job['sealed'] else 0),
+        # False while a bulk upload is still adding files
+        'sealed': bool(job['sealed']),
+        'duration': _format_duration(duration)
+    }
+
+# -------- Job Engine --------
+class BatchJobEngine:
+    """Runs batch jobs on a thread pool; state lives in a BatchJobStore.
+
+    ``process_file(filename, data)`` must return a result dict whose
+    ``status`` is ``'error'`` for failures.
+    """
+
+    def __init__(self, store, process_file, workers=BATCH_WORKERS):
+        self.store = store
+        self.process_file = process_file
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch-job')
+        # Files waiting in or running on this process's executor
+        self._queued = set()
+        self._queued_lock = threading.Lock()
+
+    def submit(self, files, tenant=ANONYMOUS):
+        job_id = self.store.create_job(files, tenant)
+        for idx in range(len(files)):
+            self.dispatch(job_id, idx)
+        return job_id
+
+    def add_file(self, job_id, filename, data):
+        """Append a file to a job opened with ``store.open_job`` and queue it; returns its future"""
+        return self.dispatch(job_id, self.store.add_file(job_id, filename, data))
+
+    def dispatch(self, job_id, idx):
+        """Queue a stored file of a job; returns its future"""
+        with self._queued_lock:
+            self._queued.add((job_id, idx))
+        return self.executor.submit(self._run_file, job_id, idx)
+
+    def resume_pending(self):
+        """Re-dispatch files left unfinished by a previous process.
+
+        Re-runs itself every lease period so files whose lease expires later
+        (their worker died mid-file) are picked up as well. Files already
+        queued in this process are left where they are.
+        """
+        with self._queued_lock:
+            queued = set(self._queued)
+        pending = [(job_id, idx) for job_id, idx in self.store.resumable_files() if (job_id, idx) not in queued]
+        for job_id, idx in pending:
+            self.dispatch(job_id, idx)
+        timer = threading.Timer(BATCH_LEASE_SECONDS, self.resume_pending)
+        timer.daemon = True
+        timer.start()
+        return len(pending)
+
+    def _run_file(self, job_id, idx):
+        try:
+            self._process(job_id, idx)
+        finally:
+            with self._queued_lock:
+                self._queued.discard((job_id, idx))
+
+    def _process(self, job_id, idx):
+        claimed = self.store.claim_file(job_id, idx)
+        if claimed is None:
+            return
+        filename, data, tenant = claimed
+        try:
+            # Groq calls for the file are scheduled and billed as the job's tenant
+            result = run_as(tenant, self.process_file, filename, data)
+        except Exception as e:
+            result = {'filename': filename, 'status': 'error', 'message': str(e)}
+        try:
+            self.store.finish_file(job_id, idx, result)
+        except Exception:
+            logger.exception("Error recording batch result for %s", filename)
@@ -0,0 +1,139 @@
+"""Synthetic resume corpus for benchmarks.
+
+    python -m benchmarks.corpus --count 200 --format pdf --pages 2 --out bench_corpus
+"""
+import io
+import os
+import random
+import zipfile
+import argparse
+from xml.sax.saxutils import escape
+import fitz  # PyMuPDF
+from fast_extract import SKILLS, SOFTWARE, DOMAIN_SKILLS
+
+FIRST_NAMES = ["Aarav", "Priya", "John", "Maria", "Wei", "Fatima", "Lucas", "Aisha", "Kenji", "Sofia",
+               "Rahul", "Emma", "Omar", "Chloe", "Ivan", "Zara", "Noah", "Ananya", "Diego", "Mei"]
+LAST_NAMES = ["Sharma", "Smith", "Garcia", "Chen", "Khan", "Silva", "Patel", "Tanaka", "Rossi", "Novak",
+              "Jain", "Brown", "Haddad", "Martin", "Petrov", "Ali", "Kim", "Iyer", "Lopez", "Wang"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Tech",
+             "Tyrell Systems", "Cyberdyne", "Soylent Foods"]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimised", "Automated", "Maintained", "Shipped", "Scaled", "Refactored"]
+OBJECTS = ["a payments service", "the data pipeline", "an internal dashboard", "the mobile app", "CI/CD workflows",
+           "a recommendation engine", "the public API", "monitoring and alerting", "the search backend",
+           "a reporting platform"]
+FILLER = ("improving reliability and cutting latency for thousands of daily users while mentoring "
+          "junior engineers and working closely with product and design").split()
+
+def synthetic_candidate(rng):
+    """A parsed-resume dict like the ones Groq returns, for seeding the store"""
+    domain = rng.choice(list(DOMAIN_SKILLS))
+    domain_skills = sorted(skill for skill in DOMAIN_SKILLS[domain] if skill in SKILLS)
+    skills = rng.sample(domain_skills, min(len(domain_skills), rng.randint(2, 5)))
+    skills += rng.sample(SKILLS, rng.randint(1, 5))
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        "name": f"{first} {last}",
+        "email": f"{first.lower()}.{last.lower()}{rng.randint(1, 99999)}@example.com",
+        "phone_number": f"+91 9{rng.randint(100000000, 999999999)}",
+        "experience_in_years": rng.randint(0, 20),
+        "skills": list(dict.fromkeys(skills)),
+        "used_software": rng.sample(SOFTWARE, rng.randint(1, 4)),
+        "expected_domain": domain
+    }
+
+def resume_text(rng, paragraphs=6):
+    """Plain resume text with the usual sections; ``paragraphs`` sets the size"""
+    candidate = synthetic_candidate(rng)
+    lines = [
+        candidate["name"],
+        f"{candidate['email']} | {candidate['phone_number']}",
+        "",
+        "Summary",
+        f"{candidate['expected_domain']} professional with {candidate['experience_in_years']} years of experience.",
+        "",
+        "Experience"
+    ]
+    year = 2025
+    for _ in range(paragraphs):
+        start = year - rng.randint(1, 3)
+        lines.append(f"{rng.choice(COMPANIES)}  {start} - {year}")
+        for _ in range(3):
+            words = rng.sample(FILLER, rng.randint(6, len(FILLER)))
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} {' '.join(words)} ({rng.randint(1, 10**6)}).")
+        year = start
+    lines += ["", "Projects"]
+    lines += [f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(candidate['skills'])}." for _ in range(3)]
+    lines += ["", "Education", f"B.Tech in Computer Science, {year - 4} - {year}", "",
+              "Skills", ", ".join(candidate["skills"]), "", "Tools", ", ".join(candidate["used_software"])]
+    return "\n".join(lines) + "\n"
+
+def make_pdf(text, pages=1):
+    """PDF bytes holding ``text``, repeated over ``pages`` pages"""
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        body = text if page_number == 0 else f"Portfolio page {page_number + 1}\n" + text
+        page.insert_textbox(fitz.Rect(36, 36, 576, 806), body, fontsize=8)
+    try:
+        return doc.tobytes(garbage=3, deflate=True)
+    finally:
+        doc.close()
+
+def make_docx(text):
+    """Minimal DOCX bytes with one paragraph per line of ``text``"""
+    paragraphs = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' for line in text.splitlines()
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'))
+        archive.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="word/document.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            '</Relationships>'))
+        archive.writestr("word/document.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{paragraphs}</w:body></w:document>'))
+    return buffer.getvalue()
+
+def make_resume(rng, fmt="pdf", pages=1, paragraphs=6):
+    """(filename, bytes) of one synthetic resume; every call yields distinct text"""
+    text = resume_text(rng, paragraphs)
+    name = text.split("\n", 1)[0].replace(" ", "_")
+    filename = f"{name}_{rng.randint(0, 10**9)}.{fmt}"
+    return filename, make_pdf(text, pages) if fmt == "pdf" else make_docx(text)
+
+def generate(count, fmt="pdf", pages=1, paragraphs=6, seed=0):
+    """Yield ``count`` synthetic resumes; ``fmt`` may be "pdf", "docx" or "mixed\""""
+    rng = random.Random(seed)
+    for i in range(count):
+        file_format = fmt if fmt != "mixed" else ("pdf", "docx")[i % 2]
+        yield make_resume(rng, file_format, pages, paragraphs)
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic resume corpus")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--format", choices=["pdf", "docx", "mixed"], default="pdf")
+    parser.add_argument("--pages", type=int, default=1, help="PDF pages per resume")
+    parser.add_argument("--paragraphs", type=int, default=6, help="Experience entries per resume")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_corpus")
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+    for filename, data in generate(args.count, args.format, args.pages, args.paragraphs, args.seed):
+        with open(os.path.join(args.out, filename), "wb") as f:
+            f.write(data)
+    print(f"Wrote {args.count} resumes to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""End-to-end ingest benchmarks against a stub Groq server.
+
+    python -m benchmarks.run --candidates 1000,10000,100000 --output bench.json
+
+For each store size the store is topped up with synthetic candidates, then
+every scenario runs through the Flask app in-process. Results are written as
+JSON (one entry per scenario and size) so two runs can be diffed.
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ["upload", "upload_stream", "batch", "analyze", "dashboard"]
+DEFAULT_SCENARIOS = ["upload", "batch", "analyze", "dashboard"]
+# How often RSS is sampled while a scenario runs
+RSS_SAMPLE_SECONDS = 0.05
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark upload, batch, analysis and dashboard endpoints")
+    parser.add_argument("--candidates", default="1000,10000,100000",
+                        help="Comma-separated store sizes to run the scenarios at")
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per scenario (dashboard runs 10x)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--files-per-upload", type=int, default=5)
+    parser.add_argument("--batch-jobs", type=int, default=4)
+    parser.add_argument("--batch-files", type=int, default=25)
+    parser.add_argument("--format", choices=["pdf", "docx", "mixed"], default="pdf")
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=200, help="Stub Groq time to first byte")
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Share of stub calls answered with 429")
+    parser.add_argument("--stream-chunk-ms", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="Where the benchmark store lives (defaults to a temp dir)")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    return parser.parse_args()
+
+# -------- Measurement --------
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def lifetime_peak_rss_mb():
+    """Peak resident set size of this process and of reaped children since start, in MB (Linux reports KB)"""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return round(own, 1), round(children, 1)
+
+def _rss_mb(pid="self"):
+    """Current resident set size of a process in MB, or None without /proc"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        return None
+    return None
+
+def _descendant_pids(pid="self"):
+    """Live descendants of a process; pool workers started by a forkserver are grandchildren"""
+    pids = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                pids.extend(f.read().split())
+    except OSError:
+        return pids
+    return pids + [grandchild for child in pids for grandchild in _descendant_pids(child)]
+
+class RssSampler:
+    """Peak RSS of this process and of its live descendants (the extraction pool) while a scenario runs.
+
+    ru_maxrss only ever grows, so every scenario after the heaviest one would
+    report the same peak. /proc is sampled every RSS_SAMPLE_SECONDS instead;
+    without it (macOS) the lifetime peak is reported.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.own = 0.0
+        self.children = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        own = _rss_mb()
+        if own is None:
+            return
+        self.own = max(self.own, own)
+        self.children = max(self.children, sum(_rss_mb(pid) or 0 for pid in _descendant_pids()))
+
+    def peak_mb(self):
+        """(own, children) peak RSS in MB"""
+        if not self.own:
+            return lifetime_peak_rss_mb()
+        return round(self.own, 1), round(self.children, 1)
+
+def run_concurrent(call, count, concurrency):
+    """Run ``call(i)`` ``count`` times; returns (latencies in ms, errors, wall seconds)"""
+    latencies = []
+    errors = []
+
+    def timed(i):
+        started = time.perf_counter()
+        try:
+            ok, detail = call(i)
+        except Exception as e:
+            ok, detail = False, repr(e)
+        return (time.perf_counter() - started) * 1000, ok, detail
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, ok, detail in pool.map(timed, range(count)):
+            latencies.append(latency)
+            if not ok:
+                errors.append(detail)
+    return latencies, errors, time.perf_counter() - started
+
+def summarize(name, candidates, latencies, errors, elapsed, units=None, concurrency=None):
+    ordered = sorted(latencies)
+    return {
+        "scenario": name,
+        "candidates": candidates,
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "units_per_s": round(units / elapsed, 2) if units and elapsed else None,
+        "latency_ms": {
+            "p50": _round(percentile(ordered, 50)),
+            "p95": _round(percentile(ordered, 95)),
+            "p99": _round(percentile(ordered, 99)),
+            "mean": _round(sum(ordered) / len(ordered)) if ordered else None,
+            "max": _round(ordered[-1]) if ordered else None
+        }
+    }
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
+# -------- Scenarios --------
+def seed_store(app_module, target, rng):
+    """Top the candidate store up to ``target`` rows; returns seconds spent"""
+    from benchmarks.corpus import synthetic_candidate
+    store = app_module.resume_store
+    started = time.perf_counter()
+    missing = target - store.count()
+    while missing > 0:
+        batch = min(missing, store.batch_size)
+        store.save_many([synthetic_candidate(rng) for _ in range(batch)])
+        missing -= batch
+    return time.perf_counter() - started
+
+def scenario_upload(app, files, args, candidates):
+    def call(i):
+        chunk = files[i * args.files_per_upload:(i + 1) * args.files_per_upload]
+        response = app.test_client().post(
+            "/api/upload", content_type="multipart/form-data",
+            data={"files": [(_stream(data), filename) for filename, data in chunk]}
+        )
+        return response.status_code == 200, f"{response.status_code}: {response.get_data(as_text=True)[:200]}"
+    latencies, errors, elapsed = run_concurrent(call, args.requests, args.concurrency)
+    return summarize("upload", candidates, latencies, errors, elapsed,
+                     units=args.requests * args.files_per_upload, concurrency=args.concurrency)
+
+def scenario_upload_stream(app, files, args, candidates):
+    def call(i):
+        chunk = files[i * args.files_per_upload:(i + 1) * args.files_per_upload]
+        response = app.test_client().post(
+            "/api/upload/stream", content_type="multipart/form-data",
+            data={"files": [(_stream(data), filename) for filename, data in chunk]}
+        )
+        # Reading the body drains the event stream
+        body = response.get_data(as_text=True)
+        return response.status_code == 200 and "event: done" in body, f"{response.status_code}: {body[-200:]}"
+    latencies, errors, elapsed = run_concurrent(call, args.requests, args.concurrency)
+    return summarize("upload_stream", candidates, latencies, errors, elapsed,
+                     units=args.requests * args.files_per_upload, concurrency=args.concurrency)
+
+def scenario_batch(app, app_module, files, args, candidates):
+    def call(i):
+        chunk = files[i * args.batch_files:(i + 1) * args.batch_files]
+        response = app.test_client().post(
+            "/api/batch/process", content_type="multipart/form-data",
+            data={"files": [(_stream(data), filename) for filename, data in chunk]}
+        )
+        if response.status_code != 202:
+            return False, f"{response.status_code}: {response.get_data(as_text=True)[:200]}"
+        job_id = response.get_json()["job_id"]
+        # Latency of a batch is submit-to-last-file
+        while True:
+            job = app_module.batch_engine.store.get_job(job_id, include_results=False)
+            if job["status"] in ("completed", "partial", "failed"):
+                return job["status"] == "completed", f"job {job_id} {job['status']}"
+            time.sleep(0.02)
+    latencies, errors, elapsed = run_concurrent(call, args.batch_jobs, args.batch_jobs)
+    return summarize("batch", candidates, latencies, errors, elapsed,
+                     units=args.batch_jobs * args.batch_files, concurrency=args.batch_jobs)
+
+def scenario_analyze(app, files, args, candidates):
+    def call(i):
+        filename, data = files[i]
+        response = app.test_client().post(
+            "/api/ai/analyze", content_type="multipart/form-data", data={"file": (_stream(data), filename)}
+        )
+        return response.status_code == 200, f"{response.status_code}: {response.get_data(as_text=True)[:200]}"
+    latencies, errors, elapsed = run_concurrent(call, args.requests, args.concurrency)
+    return summarize("analyze", candidates, latencies, errors, elapsed, concurrency=args.concurrency)
+
+def scenario_dashboard(app, args, candidates):
+    def call(i):
+        response = app.test_client().get("/api/dashboard/stats")
+        return response.status_code == 200, str(response.status_code)
+    count = args.requests * 10
+    latencies, errors, elapsed = run_concurrent(call, count, args.concurrency)
+    return summarize("dashboard", candidates, latencies, errors, elapsed, concurrency=args.concurrency)
+
+def _stream(data):
+    return io.BytesIO(data)
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+# -------- Entry Point --------
+def main():
+    args = parse_args()
+    sizes = [int(size) for size in args.candidates.split(",") if size.strip()]
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    sys.path.insert(0, REPO_ROOT)
+    from benchmarks.corpus import generate
+    from benchmarks.stub_groq import StubGroqServer
+
+    stub = StubGroqServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_429=args.rate_429,
+                          stream_chunk_ms=args.stream_chunk_ms, seed=args.seed).start()
+    # The app reads these at import time; keep quotas out of the way unless overridden
+    os.environ["GROQ_API_URL"] = stub.url
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    os.environ.setdefault("GROQ_RPM", "1000000")
+    os.environ.setdefault("GROQ_TPM", "1000000000")
+    os.environ.setdefault("DEFAULT_TENANT_PLAN", "default")
+    os.environ.setdefault("LLM_PLAN_LIMITS", '{"default": {"tpm": null}}')
+    # Store, caches and job state live in the work dir, never in the repo's data/
+    output_path = os.path.abspath(args.output) if args.output else None
+    workdir = args.workdir or tempfile.mkdtemp(prefix="techcruit-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+
+    import main as app_module
+    app = app_module.app
+    rng = random.Random(args.seed)
+
+    # Distinct files for every request so neither the caches nor duplicate detection short-circuit
+    per_size = {
+        "upload": args.requests * args.files_per_upload if "upload" in scenarios else 0,
+        "upload_stream": args.requests * args.files_per_upload if "upload_stream" in scenarios else 0,
+        "batch": args.batch_jobs * args.batch_files if "batch" in scenarios else 0,
+        "analyze": args.requests if "analyze" in scenarios else 0
+    }
+    corpus = generate(sum(per_size.values()) * len(sizes), args.format, args.pages, seed=args.seed)
+
+    results = []
+    for size in sizes:
+        seed_seconds = seed_store(app_module, size, rng)
+        candidates = app_module.resume_store.count()
+        print(f"[{size}] store holds {candidates} candidates (seeded in {seed_seconds:.1f}s)", file=sys.stderr)
+        files = {name: [next(corpus) for _ in range(count)] for name, count in per_size.items()}
+        for name in scenarios:
+            with RssSampler() as rss:
+                if name == "upload":
+                    result = scenario_upload(app, files["upload"], args, candidates)
+                elif name == "upload_stream":
+                    result = scenario_upload_stream(app, files["upload_stream"], args, candidates)
+                elif name == "batch":
+                    result = scenario_batch(app, app_module, files["batch"], args, candidates)
+                elif name == "analyze":
+                    result = scenario_analyze(app, files["analyze"], args, candidates)
+                else:
+                    result = scenario_dashboard(app, args, candidates)
+            result["peak_rss_mb"], result["peak_rss_children_mb"] = rss.peak_mb()
+            result["seed_s"] = round(seed_seconds, 2)
+            results.append(result)
+            latency = result["latency_ms"]
+            print(f"[{size}] {name:<9} {result['throughput_rps']:>8} req/s  p50 {latency['p50']}ms  "
+                  f"p95 {latency['p95']}ms  p99 {latency['p99']}ms  errors {result['errors']}  "
+                  f"rss {result['peak_rss_mb']}MB", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "workdir": workdir,
+            "args": vars(args),
+            "stub": {"requests": stub.requests, "rejected_429": stub.rejected}
+        },
+        "results": results
+    }
+    stub.stop()
+    output = json.dumps(report, indent=2)
+    if output_path:
+        with open(output_path, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
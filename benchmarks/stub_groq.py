@@ -0,0 +1,186 @@
+"""Local stand-in for Groq's chat-completions API.
+
+    python -m benchmarks.stub_groq --port 8089 --latency-ms 800 --rate-429 0.05
+
+Point the app at it with GROQ_API_URL=http://127.0.0.1:8089/openai/v1/chat/completions.
+Replies follow the formats the app's prompts ask for, so uploads, batch jobs and
+analysis all parse successfully.
+"""
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESUME_HEADER_PATTERN = re.compile(r"^Resume (\d+) - (.+?):\n(\[name needed\]\n)?", re.MULTILINE)
+class _Server(ThreadingHTTPServer):
+    # Async clients open hundreds of connections at once; the default backlog of 5 drops them
+    request_queue_size = 1024
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping idle keep-alive connections is not an error
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+DOMAINS = ["Web Development", "Data Science", "DevOps", "Backend Development", "Mobile Development"]
+
+def completion_for(prompt, rng):
+    """Reply text in the shape each of the app's prompts expects"""
+    headers = RESUME_HEADER_PATTERN.findall(prompt)
+    if headers:
+        blocks = []
+        for number, filename, name_needed in headers:
+            fields = {"expected_domain": rng.choice(DOMAINS), "experience_in_years": rng.randint(0, 15)}
+            if name_needed:
+                fields["name"] = "Stub Candidate"
+            blocks.append(f"**Resume {number} - {filename}**\n```json\n{json.dumps(fields)}\n```")
+        return "\n\n".join(blocks)
+    if prompt.startswith("Analyze this resume"):
+        fields = {"expected_domain": rng.choice(DOMAINS), "experience_in_years": rng.randint(0, 15)}
+        if "experience_in_years, name" in prompt:
+            fields["name"] = "Stub Candidate"
+        return json.dumps(fields)
+    return "Strengths: solid fundamentals.\n" * 40
+
+class StubGroqServer:
+    """Threaded HTTP server answering chat completions with configurable latency and failures.
+
+    ``latency_ms`` (plus up to ``jitter_ms``) passes before the first byte;
+    streamed replies then send one chunk every ``stream_chunk_ms``. A share
+    ``rate_429`` of requests is answered with 429 and ``Retry-After``, a
+    share ``rate_503`` with 503, and a share ``slow_rate`` waits an extra
+    ``slow_ms`` (a degraded upstream's tail).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, rate_429=0.0,
+                 retry_after=1, stream_chunk_ms=0.0, seed=0, rate_503=0.0, slow_rate=0.0, slow_ms=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.rate_503 = rate_503
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.retry_after = retry_after
+        self.stream_chunk_ms = stream_chunk_ms
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.requests = 0
+        self.rejected = 0
+        self.httpd = _Server((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/openai/v1/chat/completions"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="stub-groq", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with server.rng_lock:
+                    server.requests += 1
+                    reject = server.rng.random() < server.rate_429
+                    unavailable = server.rng.random() < server.rate_503
+                    delay = (server.latency_ms + server.rng.random() * server.jitter_ms) / 1000
+                    if server.rng.random() < server.slow_rate:
+                        delay += server.slow_ms / 1000
+                    content = completion_for(body["messages"][0]["content"], server.rng)
+                if reject:
+                    with server.rng_lock:
+                        server.rejected += 1
+                    return self._send(429, {"error": {"message": "Rate limit reached"}},
+                                      {"Retry-After": str(server.retry_after)})
+                if unavailable:
+                    return self._send(503, {"error": {"message": "Service unavailable"}})
+                time.sleep(delay)
+                usage = {"prompt_tokens": len(body["messages"][0]["content"]) // 4,
+                         "completion_tokens": len(content) // 4}
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+                if body.get("stream"):
+                    return self._stream(content, usage)
+                return self._send(200, {
+                    "id": "stub", "object": "chat.completion", "model": body.get("model"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    "usage": usage
+                })
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, content, usage):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                pieces = [content[i:i + 24] for i in range(0, len(content), 24)]
+                for i, piece in enumerate(pieces):
+                    chunk = {"choices": [{"index": 0, "delta": {"content": piece}}]}
+                    if i == len(pieces) - 1:
+                        # Groq reports usage on the last chunk under x_groq
+                        chunk["x_groq"] = {"usage": usage}
+                    self._chunk(f"data: {json.dumps(chunk)}\n\n")
+                    if server.stream_chunk_ms:
+                        time.sleep(server.stream_chunk_ms / 1000)
+                self._chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _chunk(self, text):
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub Groq chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--stream-chunk-ms", type=float, default=5)
+    parser.add_argument("--rate-503", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    server = StubGroqServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.rate_429,
+                            args.retry_after, args.stream_chunk_ms, rate_503=args.rate_503,
+                            slow_rate=args.slow_rate, slow_ms=args.slow_ms)
+    print(f"Stub Groq listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
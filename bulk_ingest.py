@@ -0,0 +1,363 @@
+import os
+import time
+import uuid
+import sqlite3
+import zipfile
+import threading
+from batch_jobs import BATCH_LEASE_SECONDS, JOBS_FILE, add_job_file, seal_open_job
+from extraction import detect_format
+from llm_scheduler import ANONYMOUS
+
+BULK_DIR = os.environ.get('BULK_UPLOAD_DIR', 'data/bulk')
+BULK_MAX_BYTES = int(os.environ.get('BULK_MAX_BYTES', 5 * 1024 ** 3))
+# Resumes taken from one archive (the Enterprise plan tops out at 20,000)
+BULK_MAX_FILES = int(os.environ.get('BULK_MAX_FILES', 20000))
+# Largest archive member read, uncompressed; bigger ones are skipped
+BULK_MAX_MEMBER_BYTES = int(os.environ.get('BULK_MAX_MEMBER_BYTES', 16 * 1024 * 1024))
+# Members queued or running at once per archive; bounds memory and the job queue
+BULK_WINDOW = int(os.environ.get('BULK_WINDOW', 32))
+# Uploads that receive no chunk for this long are deleted
+BULK_UPLOAD_TTL = int(os.environ.get('BULK_UPLOAD_TTL', 24 * 3600))
+COPY_CHUNK = 1024 * 1024
+
+class LeaseLost(Exception):
+    """Another process took over an archive walk whose lease ran out"""
+
+class BulkUploadError(ValueError):
+    """Rejected bulk upload request; ``status`` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+# -------- Upload Sessions --------
+class BulkUploadStore:
+    """SQLite-backed state of resumable archive uploads.
+
+    Kept in the batch jobs file, so an archive member is added to its job
+    in the same transaction that records the walk's progress.
+    """
+
+    def __init__(self, path=JOBS_FILE):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bulk_uploads (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    received INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    job_id TEXT,
+                    members_read INTEGER NOT NULL DEFAULT 0,
+                    skipped INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    claimed_by TEXT,
+                    claimed_at REAL,
+                    tenant TEXT NOT NULL DEFAULT 'anonymous'
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(bulk_uploads)")}
+            if 'tenant' not in columns:
+                conn.execute(f"ALTER TABLE bulk_uploads ADD COLUMN tenant TEXT NOT NULL DEFAULT '{ANONYMOUS}'")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def create(self, filename, size, tenant=ANONYMOUS):
+        upload_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """INSERT INTO bulk_uploads (id, filename, size, status, created_at, updated_at, tenant)
+                   VALUES (?, ?, ?, 'uploading', ?, ?, ?)""",
+                (upload_id, filename, size, now, now, tenant)
+            )
+        return self.get(upload_id)
+
+    def get(self, upload_id):
+        row = self._connect().execute("SELECT * FROM bulk_uploads WHERE id = ?", (upload_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def update(self, upload_id, **fields):
+        fields['updated_at'] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE bulk_uploads SET {assignments} WHERE id = ?", (*fields.values(), upload_id))
+
+    def start_ingest(self, upload_id, job_id):
+        """Move a fully received upload to 'ingesting' with ``job_id``; returns the walk's lease"""
+        lease = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """UPDATE bulk_uploads SET status = 'ingesting', job_id = ?, claimed_by = ?, claimed_at = ?,
+                   updated_at = ? WHERE id = ?""",
+                (job_id, lease, now, now, upload_id)
+            )
+        return lease
+
+    def claim(self, upload_id):
+        """Atomically take over the walk of an ingesting upload whose lease expired; returns the lease or None"""
+        lease = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                """UPDATE bulk_uploads SET claimed_by = ?, claimed_at = ?
+                   WHERE id = ? AND status = 'ingesting' AND (claimed_at IS NULL OR claimed_at < ?)""",
+                (lease, now, upload_id, now - BATCH_LEASE_SECONDS)
+            )
+        return lease if cur.rowcount else None
+
+    def renew(self, upload_id, lease):
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE bulk_uploads SET claimed_at = ? WHERE id = ? AND claimed_by = ?",
+                (time.time(), upload_id, lease)
+            )
+        if not cur.rowcount:
+            raise LeaseLost(upload_id)
+
+    def advance(self, upload_id, lease, members_read, skipped, job_id=None, filename=None, data=None):
+        """Record the walk's progress, adding ``data`` to the job in the same transaction.
+
+        Returns the new file's index in the job, or None when nothing was added.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                """UPDATE bulk_uploads SET members_read = ?, skipped = ?, claimed_at = ?, updated_at = ?
+                   WHERE id = ? AND claimed_by = ?""",
+                (members_read, skipped, now, now, upload_id, lease)
+            )
+            if not cur.rowcount:
+                raise LeaseLost(upload_id)
+            return add_job_file(conn, job_id, filename, data) if data is not None else None
+
+    def finish_ingest(self, upload_id, lease, status, error):
+        """Seal the upload's job and give the upload its final status, unless the lease was lost"""
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                """UPDATE bulk_uploads SET status = ?, error = ?, claimed_by = NULL, claimed_at = NULL,
+                   updated_at = ? WHERE id = ? AND claimed_by = ?""",
+                (status, error, now, upload_id, lease)
+            )
+            if not cur.rowcount:
+                raise LeaseLost(upload_id)
+            job_id = conn.execute("SELECT job_id FROM bulk_uploads WHERE id = ?", (upload_id,)).fetchone()['job_id']
+            seal_open_job(conn, job_id)
+
+    def with_status(self, status):
+        rows = self._connect().execute(
+            "SELECT * FROM bulk_uploads WHERE status = ? ORDER BY created_at", (status,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete(self, upload_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM bulk_uploads WHERE id = ?", (upload_id,))
+
+# -------- Archive Members --------
+def iter_archive_members(archive, start=0):
+    """Yield (position, ZipInfo, bytes or None) for entries from ``start`` on, reading one member at a time.
+
+    Data is None for entries that are not resumes: folders, macOS metadata,
+    encrypted or oversized members (checked again while reading, so a
+    header that understates the size cannot inflate memory use), and files
+    that are neither PDF nor DOCX.
+    """
+    for position, info in enumerate(archive.infolist()):
+        if position < start:
+            continue
+        name = os.path.basename(info.filename)
+        if (info.is_dir() or not name or name.startswith('.') or info.filename.startswith('__MACOSX/')
+                or info.flag_bits & 0x1 or info.file_size > BULK_MAX_MEMBER_BYTES):
+            yield position, info, None
+            continue
+        with archive.open(info) as member:
+            data = member.read(BULK_MAX_MEMBER_BYTES + 1)
+        if len(data) > BULK_MAX_MEMBER_BYTES or detect_format(data) is None:
+            data = None
+        yield position, info, data
+
+# -------- Ingest --------
+class BulkIngest:
+    """Resumable chunked ZIP uploads, fed member by member into a batch job.
+
+    Chunks are appended to a file on disk at the offset the client states,
+    so an interrupted upload resumes from the offset ``get`` reports. Once
+    the last byte arrives, a thread walks the archive and adds each resume
+    to an open batch job, never holding more than BULK_WINDOW members in
+    the job queue. Each member is added to the job in the same
+    transaction that saves the archive progress. The walk holds a lease on
+    the upload that it renews as it goes; ``resume_pending``, run at start
+    and then every lease period, takes over walks whose lease expired
+    because their process died, in whichever worker process claims them.
+    """
+
+    def __init__(self, store, engine, directory=BULK_DIR):
+        self.store = store
+        self.engine = engine
+        self.directory = directory
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, upload_id):
+        return os.path.join(self.directory, f"{upload_id}.zip")
+
+    def _lock(self, upload_id):
+        with self._locks_lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def create(self, filename, size, tenant=ANONYMOUS):
+        """Start an upload of an archive of ``size`` bytes; its resumes are processed as ``tenant``"""
+        if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+            raise BulkUploadError('size must be the archive size in bytes')
+        if size > BULK_MAX_BYTES:
+            raise BulkUploadError(f'Archives are limited to {BULK_MAX_BYTES} bytes', 413)
+        self.expire_stale()
+        upload = self.store.create(os.path.basename(filename) or 'resumes.zip', size, tenant)
+        open(self._path(upload['id']), 'wb').close()
+        return upload
+
+    def get(self, upload_id):
+        upload = self.store.get(upload_id)
+        if upload is None:
+            raise BulkUploadError('Bulk upload not found', 404)
+        return upload
+
+    def write_chunk(self, upload_id, offset, stream):
+        """Append the bytes of ``stream`` at ``offset``, which must equal the bytes received so far"""
+        with self._lock(upload_id):
+            upload = self.get(upload_id)
+            if upload['status'] != 'uploading':
+                raise BulkUploadError(f"Upload is already {upload['status']}", 409, upload['received'])
+            if offset != upload['received']:
+                raise BulkUploadError('Upload-Offset does not match the bytes received', 409, upload['received'])
+            received = offset
+            try:
+                with open(self._path(upload_id), 'r+b') as f:
+                    f.seek(offset)
+                    while True:
+                        chunk = stream.read(COPY_CHUNK)
+                        if not chunk:
+                            break
+                        if received + len(chunk) > upload['size']:
+                            raise BulkUploadError('Chunk runs past the declared archive size', 413, received)
+                        f.write(chunk)
+                        received += len(chunk)
+            finally:
+                # Whatever arrived before a disconnect still counts
+                self.store.update(upload_id, received=received)
+            if received == upload['size']:
+                self._start_ingest(upload_id)
+            return self.store.get(upload_id)
+
+    def _start_ingest(self, upload_id):
+        if not zipfile.is_zipfile(self._path(upload_id)):
+            self.store.update(upload_id, status='failed', error='Not a ZIP archive')
+            os.remove(self._path(upload_id))
+            return
+        tenant = self.store.get(upload_id)['tenant']
+        lease = self.store.start_ingest(upload_id, self.engine.store.open_job(tenant))
+        self._spawn(upload_id, lease)
+
+    def _spawn(self, upload_id, lease):
+        threading.Thread(target=self._ingest, args=(upload_id, lease), name=f"bulk-{upload_id[:8]}",
+                         daemon=True).start()
+
+    def resume_pending(self):
+        """Take over archive walks whose process died; returns how many.
+
+        Re-runs itself every lease period, like the batch engine, since a
+        walk's lease may run out long after this process started.
+        """
+        resumed = 0
+        for upload in self.store.with_status('ingesting'):
+            lease = self.store.claim(upload['id'])
+            if lease is not None:
+                self._spawn(upload['id'], lease)
+                resumed += 1
+        timer = threading.Timer(BATCH_LEASE_SECONDS, self.resume_pending)
+        timer.daemon = True
+        timer.start()
+        return resumed
+
+    def _wait_for_window(self, window, upload_id, lease):
+        """Wait for room in the job queue, renewing the lease while the workers catch up"""
+        while not window.acquire(timeout=BATCH_LEASE_SECONDS / 3):
+            self.store.renew(upload_id, lease)
+
+    def _ingest(self, upload_id, lease):
+        upload = self.store.get(upload_id)
+        job_id = upload['job_id']
+        window = threading.BoundedSemaphore(BULK_WINDOW)
+        skipped = upload['skipped']
+        fed = upload['members_read'] - skipped
+        error = None
+        owned = True
+        try:
+            with zipfile.ZipFile(self._path(upload_id)) as archive:
+                for position, info, data in iter_archive_members(archive, upload['members_read']):
+                    if data is None:
+                        skipped += 1
+                    elif fed >= BULK_MAX_FILES:
+                        error = f'Stopped after {BULK_MAX_FILES} resumes'
+                        break
+                    else:
+                        self._wait_for_window(window, upload_id, lease)
+                    try:
+                        idx = self.store.advance(upload_id, lease, position + 1, skipped, job_id, info.filename, data)
+                    except BaseException:
+                        if data is not None:
+                            window.release()
+                        raise
+                    if idx is not None:
+                        self.engine.dispatch(job_id, idx).add_done_callback(lambda _: window.release())
+                        fed += 1
+        except LeaseLost:
+            # Another process walks the archive now
+            owned = False
+        except (zipfile.BadZipFile, OSError, RuntimeError) as e:
+            error = f'Archive could not be read: {e}'
+        except Exception as e:
+            error = f'Ingest stopped: {e}'
+        finally:
+            # The job must not stay open, whatever stopped the walk
+            if owned:
+                self._finish(upload_id, lease, 'failed' if error and not fed else 'done', error)
+
+    def _finish(self, upload_id, lease, status, error):
+        try:
+            self.store.finish_ingest(upload_id, lease, status, error)
+        except LeaseLost:
+            return
+        try:
+            os.remove(self._path(upload_id))
+        except OSError:
+            pass
+
+    def expire_stale(self):
+        """Delete uploads that have not received a chunk within BULK_UPLOAD_TTL"""
+        cutoff = time.time() - BULK_UPLOAD_TTL
+        for upload in self.store.with_status('uploading'):
+            if upload['updated_at'] < cutoff:
+                try:
+                    os.remove(self._path(upload['id']))
+                except OSError:
+                    pass
+                self.store.delete(upload['id'])
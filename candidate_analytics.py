@@ -0,0 +1,340 @@
+import threading
+import numpy as np
+from candidate_search import normalize_term, parse_experience
+from dashboard_stats import split_skills
+
+# Candidates read from the store per query while loading
+LOAD_BATCH = 50000
+# Skill sets are packed into float64 bit masks, exact up to 52 skills
+MAX_COOCCURRENCE_SKILLS = 50
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+# Period unit of each trend interval, as a NumPy datetime unit
+TREND_INTERVALS = {'day': 'D', 'week': 'D', 'month': 'M', 'year': 'Y'}
+MAX_TREND_PERIODS = 1000
+UNKNOWN_DOMAIN = 'Unknown'
+
+class _Column:
+    """Append-only NumPy array grown by doubling; ``values`` is a view of the filled part"""
+
+    def __init__(self, dtype, capacity=1024):
+        self._data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        end = self.size + len(values)
+        if end > len(self._data):
+            grown = np.empty(max(end, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:end] = values
+        self.size = end
+
+    @property
+    def values(self):
+        return self._data[:self.size]
+
+class _Dictionary:
+    """Integer ids of normalised values; the first spelling seen is kept as the label"""
+
+    def __init__(self):
+        self.ids = {}
+        self.labels = []
+
+    def encode(self, value):
+        key = normalize_term(value)
+        if not key:
+            return -1
+        value_id = self.ids.get(key)
+        if value_id is None:
+            value_id = self.ids[key] = len(self.labels)
+            self.labels.append(str(value).strip())
+        return value_id
+
+    def lookup(self, value):
+        return self.ids.get(normalize_term(value))
+
+class _View:
+    """Consistent views of every column, taken under the lock"""
+
+    def __init__(self, columns):
+        self.ids = columns.ids.values
+        self.created = columns.created.values
+        self.experience = columns.experience.values
+        self.domain = columns.domain.values
+        self.skill_ids = columns.skill_ids.values
+        self.skill_rows = columns.skill_rows.values
+        self.skill_labels = list(columns.skills.labels)
+        self.domain_labels = list(columns.domains.labels)
+
+    def __len__(self):
+        return len(self.ids)
+
+# -------- Columnar Candidates --------
+class CandidateColumns:
+    """In-memory columnar copy of the stored candidates for analytics queries.
+
+    Experience (float32, NaN when unknown), ingest time and the
+    dictionary-encoded domain are NumPy arrays with one entry per candidate.
+    Skills form a sparse candidate-by-skill matrix in coordinate form
+    (``skill_rows``, ``skill_ids``). ``sync`` appends the candidates stored
+    since its last call, so the store is read in full once and afterwards
+    only by id range. Candidates are never updated or deleted, so appending
+    keeps the copy exact.
+    """
+
+    def __init__(self):
+        self.ids = _Column(np.int64)
+        self.created = _Column(np.float64)
+        self.experience = _Column(np.float32)
+        self.domain = _Column(np.int32)
+        self.skill_ids = _Column(np.int32, 8192)
+        self.skill_rows = _Column(np.int32, 8192)
+        self.skills = _Dictionary()
+        self.domains = _Dictionary()
+        self.last_id = 0
+        self._lock = threading.Lock()
+
+    def sync(self, conn):
+        """Append candidates stored since the last sync; returns how many"""
+        with self._lock:
+            added = 0
+            while True:
+                rows = conn.execute(
+                    """SELECT id, created_at, experience_in_years, skills, expected_domain
+                       FROM candidates WHERE id > ? ORDER BY id LIMIT ?""",
+                    (self.last_id, LOAD_BATCH)
+                ).fetchall()
+                if rows:
+                    self._append(rows)
+                    added += len(rows)
+                if len(rows) < LOAD_BATCH:
+                    return added
+
+    def _append(self, rows):
+        first_row = self.ids.size
+        experience = []
+        domains = []
+        entry_ids = []
+        entry_rows = []
+        for offset, (_, _, years, skills, domain) in enumerate(rows):
+            value = parse_experience(years)
+            experience.append(np.nan if value is None else value)
+            domains.append(self.domains.encode(domain) if domain else -1)
+            encoded = {self.skills.encode(skill) for skill in split_skills(skills)} if skills else set()
+            encoded.discard(-1)
+            entry_ids.extend(encoded)
+            entry_rows.extend([first_row + offset] * len(encoded))
+        # Skill entries go in first, so a view never sees a row without its skills
+        self.skill_ids.extend(entry_ids)
+        self.skill_rows.extend(entry_rows)
+        self.experience.extend(experience)
+        self.domain.extend(domains)
+        self.created.extend([row[1] for row in rows])
+        self.ids.extend([row[0] for row in rows])
+        self.last_id = rows[-1][0]
+
+    def view(self):
+        with self._lock:
+            return _View(self)
+
+    def __len__(self):
+        return self.ids.size
+
+    # -------- Queries --------
+    def _mask(self, view, domain=None, min_experience=None, max_experience=None, since=None, until=None):
+        """Boolean mask of the candidates matching the filters, or None when nothing is filtered"""
+        conditions = []
+        if domain:
+            domain_id = self.domains.lookup(domain)
+            conditions.append(view.domain == (domain_id if domain_id is not None else -2))
+        if min_experience is not None:
+            conditions.append(view.experience >= min_experience)
+        if max_experience is not None:
+            conditions.append(view.experience <= max_experience)
+        if since is not None:
+            conditions.append(view.created >= since)
+        if until is not None:
+            conditions.append(view.created < until)
+        if not conditions:
+            return None
+        mask = conditions[0]
+        for condition in conditions[1:]:
+            mask &= condition
+        return mask
+
+    def _skill_entries(self, view, mask):
+        """(rows, skill ids) of the matrix entries belonging to masked-in candidates"""
+        if mask is None:
+            return view.skill_rows, view.skill_ids
+        keep = mask[view.skill_rows]
+        return view.skill_rows[keep], view.skill_ids[keep]
+
+    def _skill_counts(self, view, mask):
+        _, skill_ids = self._skill_entries(view, mask)
+        return np.bincount(skill_ids, minlength=len(view.skill_labels))
+
+    def top_skills(self, limit=20, **filters):
+        """Most common skills among the matching candidates; ties go to the skill seen first"""
+        view = self.view()
+        mask = self._mask(view, **filters)
+        total = len(view) if mask is None else int(mask.sum())
+        counts = self._skill_counts(view, mask)
+        order = np.argsort(-counts, kind='stable')[:limit]
+        order = order[counts[order] > 0]
+        return {
+            'candidates': total,
+            'skills': [
+                {'skill': view.skill_labels[i], 'count': int(counts[i]), 'share': round(float(counts[i]) / total, 4)}
+                for i in order
+            ]
+        }
+
+    def cooccurrence(self, skills=None, top=20, **filters):
+        """Candidates having each pair of skills: the given ones, or the ``top`` most common.
+
+        Every candidate's selected skills are packed into one bit mask, so
+        the matrix is built from the distinct skill combinations rather
+        than from every candidate.
+        """
+        view = self.view()
+        mask = self._mask(view, **filters)
+        if skills:
+            selected = []
+            for skill in skills:
+                skill_id = self.skills.lookup(skill)
+                if skill_id is None:
+                    raise ValueError(f"Unknown skill: {skill}")
+                if skill_id not in selected:
+                    selected.append(skill_id)
+        else:
+            counts = self._skill_counts(view, mask)
+            order = np.argsort(-counts, kind='stable')[:top]
+            selected = [int(i) for i in order if counts[i] > 0]
+        if len(selected) > MAX_COOCCURRENCE_SKILLS:
+            raise ValueError(f"At most {MAX_COOCCURRENCE_SKILLS} skills can be compared at once")
+        size = len(selected)
+        matrix = np.zeros((size, size), dtype=np.int64)
+        if size:
+            column = np.full(len(view.skill_labels), -1, dtype=np.int64)
+            column[selected] = np.arange(size)
+            rows, skill_ids = self._skill_entries(view, mask)
+            columns = column[skill_ids]
+            keep = columns >= 0
+            # A candidate holds each skill once, so summing its bits ORs them
+            packed = np.bincount(rows[keep], weights=np.exp2(columns[keep]), minlength=len(view))
+            patterns, weights = np.unique(packed[packed > 0].astype(np.uint64), return_counts=True)
+            members = ((patterns[:, None] >> np.arange(size, dtype=np.uint64)) & np.uint64(1)).astype(np.float64)
+            matrix = np.rint(members.T @ (members * weights[:, None])).astype(np.int64)
+        return {
+            'candidates': len(view) if mask is None else int(mask.sum()),
+            'skills': [view.skill_labels[i] for i in selected],
+            'counts': matrix.tolist()
+        }
+
+    def experience_percentiles(self, percentiles=DEFAULT_PERCENTILES, **filters):
+        """Experience percentiles (linear interpolation) overall and per domain, for candidates with a known experience"""
+        view = self.view()
+        known = ~np.isnan(view.experience)
+        mask = self._mask(view, **filters)
+        if mask is not None:
+            known &= mask
+        experience = view.experience[known].astype(np.float64)
+        domains = view.domain[known]
+        order = np.lexsort((experience, domains))
+        experience = experience[order]
+        domains = domains[order]
+        starts = np.flatnonzero(np.r_[True, domains[1:] != domains[:-1]]) if len(domains) else np.array([], dtype=np.int64)
+        sizes = np.diff(np.r_[starts, len(domains)])
+        values = _group_percentiles(experience, starts, sizes, percentiles)
+        means = np.add.reduceat(experience, starts) / sizes if len(starts) else np.array([])
+        groups = [
+            dict(
+                {'domain': view.domain_labels[domains[start]] if domains[start] >= 0 else UNKNOWN_DOMAIN,
+                 'count': int(size), 'mean': round(float(mean), 2)},
+                **{f"p{p:g}": round(float(value), 2) for p, value in zip(percentiles, row)}
+            )
+            for start, size, mean, row in zip(starts, sizes, means, values)
+        ]
+        groups.sort(key=lambda group: -group['count'])
+        overall = None
+        if len(experience):
+            overall = dict(
+                {'count': len(experience), 'mean': round(float(experience.mean()), 2)},
+                **{f"p{p:g}": round(float(value), 2) for p, value in zip(percentiles, np.percentile(experience, percentiles))}
+            )
+        return {'percentiles': list(percentiles), 'overall': overall, 'domains': groups}
+
+    def trends(self, interval='month', skill=None, **filters):
+        """Candidates ingested per period, their median experience and, with ``skill``, how many have it"""
+        if interval not in TREND_INTERVALS:
+            raise ValueError(f"interval must be one of: {', '.join(TREND_INTERVALS)}")
+        skill_id = None
+        if skill:
+            skill_id = self.skills.lookup(skill)
+            if skill_id is None:
+                raise ValueError(f"Unknown skill: {skill}")
+        view = self.view()
+        mask = self._mask(view, **filters)
+        rows = np.arange(len(view)) if mask is None else np.flatnonzero(mask)
+        periods = _periods(view.created[rows], interval)
+        result = {'interval': interval, 'periods': []}
+        if not len(rows):
+            return result
+        step = np.timedelta64(7, 'D') if interval == 'week' else np.timedelta64(1, TREND_INTERVALS[interval])
+        axis = np.arange(periods.min(), periods.max() + step, step)
+        if len(axis) > MAX_TREND_PERIODS:
+            raise ValueError(f"More than {MAX_TREND_PERIODS} periods - use a longer interval or a since date")
+        slots = np.searchsorted(axis, periods)
+        candidates = np.bincount(slots, minlength=len(axis))
+
+        experience = view.experience[rows].astype(np.float64)
+        known = ~np.isnan(experience)
+        order = np.lexsort((experience[known], slots[known]))
+        known_slots = slots[known][order]
+        starts = np.flatnonzero(np.r_[True, known_slots[1:] != known_slots[:-1]]) if len(known_slots) else np.array([], dtype=np.int64)
+        sizes = np.diff(np.r_[starts, len(known_slots)])
+        medians = np.full(len(axis), np.nan)
+        medians[known_slots[starts]] = _group_percentiles(experience[known][order], starts, sizes, (50,))[:, 0]
+
+        with_skill = None
+        if skill_id is not None:
+            has_skill = np.zeros(len(view), dtype=bool)
+            has_skill[view.skill_rows[view.skill_ids == skill_id]] = True
+            with_skill = np.bincount(slots, weights=has_skill[rows], minlength=len(axis))
+
+        labels = np.datetime_as_string(axis, unit='D' if interval in ('day', 'week') else TREND_INTERVALS[interval])
+        for i, label in enumerate(labels):
+            period = {
+                'period': str(label),
+                'candidates': int(candidates[i]),
+                'median_experience': None if np.isnan(medians[i]) else round(float(medians[i]), 2)
+            }
+            if with_skill is not None:
+                period['with_skill'] = int(with_skill[i])
+                period['share'] = round(float(with_skill[i]) / candidates[i], 4) if candidates[i] else 0.0
+            result['periods'].append(period)
+        if skill_id is not None:
+            result['skill'] = view.skill_labels[skill_id]
+        return result
+
+def _group_percentiles(values, starts, sizes, percentiles):
+    """Percentiles of each sorted group ``values[start:start + size]``, interpolated like np.percentile"""
+    if not len(starts):
+        return np.empty((0, len(percentiles)))
+    positions = (sizes[:, None] - 1) * (np.asarray(percentiles, dtype=np.float64)[None, :] / 100)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    low = values[starts[:, None] + lower]
+    high = values[starts[:, None] + upper]
+    return low + (high - low) * (positions - lower)
+
+def _periods(created, interval):
+    """Start of the period (UTC) each ingest time falls in, as datetime64"""
+    days = np.floor(created / 86400).astype(np.int64).astype('datetime64[D]')
+    if interval == 'day':
+        return days
+    if interval == 'week':
+        # Day 0 (1970-01-01) was a Thursday; weeks start on Monday
+        return days - ((days.astype(np.int64) + 3) % 7).astype('timedelta64[D]')
+    return days.astype(f'datetime64[{TREND_INTERVALS[interval]}]')
@@ -0,0 +1,185 @@
+import re
+import numpy as np
+from candidate_search import as_list, normalize_term, parse_experience
+
+MAX_COMPARE_CANDIDATES = 5000
+# Pairwise similarities are only returned for small comparisons
+MAX_SIMILARITY_CANDIDATES = 50
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Weights of the overall score with and without a job description
+WEIGHTS_WITH_JD = {'technical_skills': 0.6, 'experience_score': 0.25, 'domain_match': 0.15}
+WEIGHTS_WITHOUT_JD = {'technical_skills': 0.65, 'experience_score': 0.35}
+
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+# Experience at which the experience score saturates
+EXPERIENCE_CAP_YEARS = 10.0
+
+def candidate_terms(resume):
+    """Normalised skill and software terms of a stored resume"""
+    terms = set()
+    for key in ('skills', 'used_software'):
+        for value in as_list(resume.get(key)):
+            term = normalize_term(value)
+            if term:
+                terms.add(term)
+    return terms
+
+def text_ngrams(text, max_n=3):
+    """Normalised 1..max_n word n-grams of free text (used to spot multi-word skills)"""
+    words = [word.rstrip('.,;:') for word in WORD_PATTERN.findall(text.lower())]
+    grams = set()
+    for n in range(1, max_n + 1):
+        for i in range(len(words) - n + 1):
+            grams.add(" ".join(words[i:i + n]))
+    return grams
+
+def document_frequencies(conn, terms):
+    """Store-wide document frequency of each term, from the candidate index"""
+    terms = list(terms)
+    df = {}
+    for start in range(0, len(terms), 900):
+        batch = terms[start:start + 900]
+        placeholders = ",".join("?" * len(batch))
+        for term, count in conn.execute(
+            f"""SELECT term, COUNT(DISTINCT candidate_id) FROM candidate_terms
+                WHERE term IN ({placeholders}) GROUP BY term""", batch
+        ):
+            df[term] = count
+    return df
+
+# -------- Vectorised Comparison --------
+def compare_candidates(conn, candidates, job_description=None):
+    """Score candidates against each other and an optional job description.
+
+    ``candidates`` is a list of (candidate id, resume dict). All scores come
+    from a few vectorised operations over a sparse candidate-by-term matrix
+    (its nonzero entries in coordinate form), so ranking thousands of
+    candidates costs one pass rather than one call per pair, and memory
+    grows with the skills held rather than candidates times vocabulary.
+    """
+    ids = [candidate_id for candidate_id, _ in candidates]
+    docs = [candidate_terms(resume) for _, resume in candidates]
+
+    # Query terms: job description n-grams that are known skills anywhere in the store
+    query_terms = []
+    if job_description:
+        grams = text_ngrams(job_description)
+        known = set().union(*docs) & grams
+        known |= set(document_frequencies(conn, grams - known))
+        query_terms = sorted(known)
+
+    vocab = sorted(set().union(*docs) | set(query_terms))
+    column = {term: i for i, term in enumerate(vocab)}
+    n, v = len(docs), len(vocab)
+
+    # The binary candidate-by-term matrix in coordinate form: one (row, col) per held term
+    rows = np.fromiter((i for i, doc in enumerate(docs) for _ in doc), dtype=np.int64)
+    cols = np.fromiter((column[term] for doc in docs for term in doc), dtype=np.int64)
+
+    # IDF from the whole store so small comparisons still weight rare skills higher
+    total = max(conn.execute("SELECT COUNT(*) FROM candidate_attrs").fetchone()[0], n)
+    df_map = document_frequencies(conn, vocab)
+    df = np.array([df_map.get(term, 0) for term in vocab] or [0], dtype=np.float32)
+    idf = np.log1p((total - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+    # TF-IDF weight of every nonzero entry
+    weights_per_entry = idf[cols]
+
+    experience = np.array([parse_experience(resume.get("experience_in_years")) or 0.0
+                           for _, resume in candidates], dtype=np.float32)
+    experience_score = np.clip(experience / EXPERIENCE_CAP_YEARS, 0, 1) * 100
+
+    matched = None
+    if query_terms:
+        is_query = np.zeros(max(v, 1), dtype=bool)
+        is_query[[column[term] for term in query_terms]] = True
+        hits = is_query[cols]
+        dl = np.bincount(rows, minlength=n).astype(np.float32)
+        avgdl = dl.mean() if dl.mean() > 0 else 1.0
+        # Every held query term has tf 1
+        denom = 1 + BM25_K1 * (1 - BM25_B + BM25_B * dl / avgdl)
+        bm25 = np.bincount(rows[hits], weights=(BM25_K1 + 1) / denom[rows[hits]] * idf[cols[hits]],
+                           minlength=n).astype(np.float32)
+        # A document holding every query term at average length scores sum(idf)
+        ideal = float(idf[is_query].sum()) or 1.0
+        technical = np.clip(bm25 / ideal, 0, 1) * 100
+        matched = np.bincount(rows[hits], minlength=n)
+
+        jd_grams = text_ngrams(job_description)
+        domain_match = np.array([_domain_match(resume.get("expected_domain"), jd_grams)
+                                 for _, resume in candidates], dtype=np.float32)
+        weights = WEIGHTS_WITH_JD
+        components = {'technical_skills': technical, 'experience_score': experience_score, 'domain_match': domain_match}
+    else:
+        # Without a job description: IDF-weighted skill breadth relative to the best candidate
+        breadth = np.bincount(rows, weights=weights_per_entry, minlength=n).astype(np.float32)
+        technical = breadth / breadth.max() * 100 if breadth.max() > 0 else np.zeros(n, dtype=np.float32)
+        domain_match = None
+        weights = WEIGHTS_WITHOUT_JD
+        components = {'technical_skills': technical, 'experience_score': experience_score}
+
+    overall = sum(weights[name] * components[name] for name in weights)
+    order = np.argsort(-overall, kind='stable')
+
+    result = {
+        'resumes': ids,
+        'comparison_matrix': {
+            'technical_skills': _rounded(technical),
+            'experience': [float(x) for x in experience],
+            'experience_score': _rounded(experience_score),
+            'overall_score': _rounded(overall)
+        },
+        'ranking': [{'id': ids[i], 'overall_score': round(float(overall[i]), 1)} for i in order[:10]],
+        'winner': ids[int(order[0])],
+        'query_terms': query_terms
+    }
+    if domain_match is not None:
+        result['comparison_matrix']['domain_match'] = _rounded(domain_match)
+    if n <= MAX_SIMILARITY_CANDIDATES:
+        similarity = _cosine_similarity(rows, cols, weights_per_entry, n, v)
+        result['similarity'] = [[round(float(x), 3) for x in row] for row in similarity]
+    result['insights'] = _insights(candidates, docs, ids, order, experience, query_terms, matched)
+    return result
+
+def _cosine_similarity(rows, cols, values, n, v):
+    """Pairwise cosine similarity of the TF-IDF rows; dense, so only for a handful of candidates"""
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=n)).astype(np.float32)
+    scale = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    unit = np.zeros((n, max(v, 1)), dtype=np.float32)
+    unit[rows, cols] = values * scale[rows]
+    return unit @ unit.T
+
+def _rounded(values):
+    return [round(float(x), 1) for x in values]
+
+def _domain_match(domain, grams):
+    """100 when the whole domain appears in the job description, else the share of its words that do"""
+    domain = normalize_term(domain or "")
+    if not domain:
+        return 0.0
+    if domain in grams:
+        return 100.0
+    words = domain.split()
+    return 100.0 * sum(word in grams for word in words) / len(words)
+
+def _insights(candidates, docs, ids, order, experience, query_terms, matched):
+    best = int(order[0])
+    name = lambda i: candidates[i][1].get("name") or f"Resume {ids[i]}"
+    insights = []
+    if query_terms:
+        insights.append(f"{name(best)} matches {int(matched[best])}/{len(query_terms)} job skills and has the best overall fit")
+    else:
+        insights.append(f"{name(best)} has the strongest overall profile")
+    most_experienced = int(np.argmax(experience))
+    insights.append(f"{name(most_experienced)} has the most experience ({experience[most_experienced]:g} years)")
+    if len(candidates) <= MAX_SIMILARITY_CANDIDATES:
+        shared = set.intersection(*docs) if docs else set()
+        if shared:
+            insights.append(f"All candidates share: {', '.join(sorted(shared)[:5])}")
+        unique = docs[best] - set().union(*(doc for i, doc in enumerate(docs) if i != best))
+        if unique:
+            insights.append(f"Only {name(best)} lists: {', '.join(sorted(unique)[:5])}")
+    return insights
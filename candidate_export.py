@@ -0,0 +1,216 @@
+import io
+import re
+import csv
+import json
+import math
+import time
+import zipfile
+import importlib.util
+from datetime import datetime, timezone
+from functools import lru_cache
+from xml.sax.saxutils import escape
+from candidate_search import iter_candidates
+from lazy_loading import LazyModule
+from metrics import STAGE_SECONDS
+
+openpyxl = LazyModule('openpyxl')
+# Optional: only Parquet exports need pyarrow
+pyarrow = LazyModule('pyarrow')
+parquet = LazyModule('pyarrow.parquet')
+
+# Bytes gathered before a chunk is handed to the response
+CHUNK_BYTES = 64 * 1024
+# Rows per Parquet row group, i.e. held in memory at once
+PARQUET_BATCH_ROWS = 10000
+
+EXPORT_COLUMNS = [
+    ("id", "ID"), ("name", "Name"), ("email", "Email"), ("phone_number", "Phone Number"),
+    ("experience_in_years", "Experience (Years)"), ("skills", "Skills"), ("used_software", "Used Software"),
+    ("expected_domain", "Expected Domain"), ("filename", "Filename"), ("created_at", "Created At")
+]
+EXPORT_FIELDS = [field for field, _ in EXPORT_COLUMNS]
+# Characters XML 1.0 does not allow; the model occasionally echoes them from PDFs
+ILLEGAL_XML_PATTERN = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+def _timestamp(created_at):
+    return datetime.fromtimestamp(created_at, timezone.utc)
+
+def _iso(created_at):
+    return _timestamp(created_at).isoformat(timespec='seconds')
+
+class _Drain:
+    """Write-only, unseekable file object emptied with ``take``.
+
+    zipfile and pyarrow write through it, so their output can be sent as it
+    is produced instead of being assembled first.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.pending = 0
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        self.pending += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        self.pending = 0
+        return data
+
+# -------- Writers --------
+def csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        writer.writerow(row[:-1] + (_iso(row[-1]),))
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+def jsonl_chunks(rows):
+    lines = []
+    size = 0
+    for candidate_id, data, created_at in rows:
+        candidate = json.loads(data)
+        candidate['id'] = candidate_id
+        candidate['created_at'] = created_at
+        line = json.dumps(candidate, ensure_ascii=False) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(lines).encode('utf-8')
+            lines = []
+            size = 0
+    yield "".join(lines).encode('utf-8')
+
+def parquet_chunks(rows, batch_rows=PARQUET_BATCH_ROWS):
+    """One row group per ``batch_rows`` rows, each sent as soon as it is encoded"""
+    schema = pyarrow.schema(
+        [("id", pyarrow.int64())]
+        + [(field, pyarrow.string()) for field in EXPORT_FIELDS[1:-1]]
+        + [("created_at", pyarrow.timestamp('us', tz='UTC'))]
+    )
+    sink = _Drain()
+    writer = parquet.ParquetWriter(sink, schema)
+    batch = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_rows:
+                writer.write_table(_parquet_table(batch, schema))
+                batch = []
+                yield sink.take()
+        if batch:
+            writer.write_table(_parquet_table(batch, schema))
+    finally:
+        writer.close()
+    yield sink.take()
+
+def _parquet_table(batch, schema):
+    columns = list(zip(*batch))
+    data = {"id": list(columns[0])}
+    for field, values in zip(EXPORT_FIELDS[1:-1], columns[1:-1]):
+        # experience_in_years holds numbers or free text
+        data[field] = [None if value is None or value == "" else str(value) for value in values]
+    data["created_at"] = [_timestamp(value) for value in columns[-1]]
+    return pyarrow.Table.from_pydict(data, schema)
+
+@lru_cache(maxsize=1)
+def _xlsx_template():
+    """Package parts of a write-only workbook holding just the bold header row, and its sheet split around the rows"""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Candidates")
+    header = []
+    for _, title in EXPORT_COLUMNS:
+        cell = openpyxl.cell.WriteOnlyCell(ws, value=title)
+        cell.font = openpyxl.styles.Font(bold=True)
+        header.append(cell)
+    ws.append(header)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    with zipfile.ZipFile(buffer) as package:
+        parts = [(name, package.read(name)) for name in package.namelist()]
+    sheet_name = "xl/worksheets/sheet1.xml"
+    sheet = dict(parts)[sheet_name]
+    split = sheet.index(b"</sheetData>")
+    return [part for part in parts if part[0] != sheet_name], sheet_name, sheet[:split], sheet[split:]
+
+def _xlsx_cell(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # SpreadsheetML has no NaN or infinity; Excel rejects a workbook holding one
+        return f"<c><v>{value}</v></c>" if math.isfinite(value) else "<c/>"
+    if value is None or value == "":
+        return "<c/>"
+    text = escape(ILLEGAL_XML_PATTERN.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def xlsx_chunks(rows):
+    """XLSX whose worksheet XML is deflated and sent row by row.
+
+    openpyxl's write-only workbook supplies the package (styles, content
+    types, the header row); only the data rows are written here, since
+    openpyxl itself assembles the archive after the last row.
+    """
+    parts, sheet_name, sheet_head, sheet_tail = _xlsx_template()
+    sink = _Drain()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as package:
+        for name, data in parts:
+            package.writestr(name, data)
+        with package.open(sheet_name, 'w', force_zip64=True) as sheet:
+            sheet.write(sheet_head)
+            for row in rows:
+                cells = "".join(_xlsx_cell(value) for value in row[:-1])
+                sheet.write(f"<row>{cells}{_xlsx_cell(_iso(row[-1]))}</row>".encode('utf-8'))
+                if sink.pending >= CHUNK_BYTES:
+                    yield sink.take()
+            sheet.write(sheet_tail)
+    yield sink.take()
+
+# (mimetype, columns read, writer)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', EXPORT_FIELDS, csv_chunks),
+    'jsonl': ('application/x-ndjson', ['id', 'data', 'created_at'], jsonl_chunks),
+    'parquet': ('application/vnd.apache.parquet', EXPORT_FIELDS, parquet_chunks),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', EXPORT_FIELDS, xlsx_chunks)
+}
+
+def parquet_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+# -------- Export --------
+def export_candidates(conn, fmt, **filters):
+    """Generator of the export file's bytes for candidates matching the search ``filters``.
+
+    The query is compiled (raising ValueError for a bad one) before the
+    generator is returned; rows are then read and encoded as the response
+    is consumed, so memory stays flat however many candidates match.
+    """
+    _, columns, writer = EXPORT_FORMATS[fmt]
+    rows = iter_candidates(conn, columns, **filters)
+
+    def generate():
+        started = time.perf_counter()
+        try:
+            for chunk in writer(rows):
+                if chunk:
+                    yield chunk
+        finally:
+            rows.close()
+            STAGE_SECONDS.observe(time.perf_counter() - started, stage='export', format=fmt)
+    return generate()
@@ -0,0 +1,273 @@
+import re
+import json
+from dashboard_stats import EXPERIENCE_PATTERN
+
+SEARCH_FIELDS = {'skill': 'skill', 'skills': 'skill', 'software': 'software'}
+MAX_PER_PAGE = 100
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+def normalize_term(value):
+    """Lower-case, trim and collapse whitespace so 'Node.JS ' and 'node.js' match"""
+    return WHITESPACE_PATTERN.sub(" ", str(value).strip().lower())
+
+def parse_experience(value):
+    """Years of experience as a float, or None when there is no number"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    exp_match = EXPERIENCE_PATTERN.search(str(value))
+    return float(exp_match.group(1)) if exp_match else None
+
+def as_list(value):
+    """List form of a skills-like field (the model sometimes returns a comma-separated string)"""
+    if isinstance(value, str):
+        return [item for item in value.split(",")]
+    return value or []
+
+# -------- Candidate Index --------
+class CandidateIndex:
+    """Search indexes over stored candidates, maintained on every insert.
+
+    - ``candidate_terms``: inverted index of normalised skills and used software
+    - ``candidate_attrs``: numeric experience and normalised domain, each B-tree indexed
+    """
+
+    def create(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS candidate_terms (
+                term TEXT NOT NULL,
+                field TEXT NOT NULL,
+                candidate_id INTEGER NOT NULL,
+                PRIMARY KEY (term, field, candidate_id)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS candidate_attrs (
+                candidate_id INTEGER PRIMARY KEY,
+                experience REAL,
+                domain TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_candidate_attrs_experience ON candidate_attrs(experience)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_candidate_attrs_domain ON candidate_attrs(domain, experience)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS candidate_index_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+
+    def is_built(self, conn):
+        return conn.execute("SELECT 1 FROM candidate_index_meta WHERE key = 'built'").fetchone() is not None
+
+    def mark_built(self, conn):
+        conn.execute("INSERT OR REPLACE INTO candidate_index_meta (key, value) VALUES ('built', 1)")
+
+    def on_insert(self, conn, candidate_id, resume):
+        terms = set()
+        for field, key in (('skill', 'skills'), ('software', 'used_software')):
+            for value in as_list(resume.get(key)):
+                term = normalize_term(value)
+                if term:
+                    terms.add((term, field, candidate_id))
+        conn.executemany(
+            "INSERT OR IGNORE INTO candidate_terms (term, field, candidate_id) VALUES (?, ?, ?)", terms
+        )
+        domain = normalize_term(resume.get("expected_domain") or "") or None
+        conn.execute(
+            "INSERT OR REPLACE INTO candidate_attrs (candidate_id, experience, domain) VALUES (?, ?, ?)",
+            (candidate_id, parse_experience(resume.get("experience_in_years")), domain)
+        )
+
+# -------- Boolean Query Parsing --------
+TOKEN_PATTERN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+
+def tokenize(query):
+    tokens = []
+    pos = 0
+    query = query.strip()
+    while pos < len(query):
+        match = TOKEN_PATTERN.match(query, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Invalid query near: {query[pos:]}")
+        pos = match.end()
+        lparen, rparen, quoted, word = match.groups()
+        if lparen:
+            tokens.append(('(', None))
+        elif rparen:
+            tokens.append((')', None))
+        elif quoted is not None:
+            tokens.append(('term', quoted))
+        elif word.upper() in ('AND', 'OR', 'NOT'):
+            tokens.append((word.upper(), None))
+        else:
+            tokens.append(('term', word))
+    return tokens
+
+class _QueryParser:
+    """Recursive-descent parser for skill queries.
+
+    Grammar: ``expr := and (OR and)*``, ``and := unary ((AND)? unary)*``,
+    ``unary := NOT unary | '(' expr ')' | term``. Terms may be quoted and
+    prefixed with ``skill:`` or ``software:``; bare terms match either field.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.expr()
+        if self.peek() is not None:
+            raise ValueError("Unexpected token in query")
+        return node
+
+    def expr(self):
+        node = self.and_expr()
+        while self.peek() == 'OR':
+            self.take()
+            node = ('or', node, self.and_expr())
+        return node
+
+    def and_expr(self):
+        node = self.unary()
+        while self.peek() in ('AND', 'NOT', '(', 'term'):
+            if self.peek() == 'AND':
+                self.take()
+            node = ('and', node, self.unary())
+        return node
+
+    def unary(self):
+        kind = self.peek()
+        if kind == 'NOT':
+            self.take()
+            return ('not', self.unary())
+        if kind == '(':
+            self.take()
+            node = self.expr()
+            if self.peek() != ')':
+                raise ValueError("Unbalanced parentheses in query")
+            self.take()
+            return node
+        if kind == 'term':
+            value = self.take()[1]
+            field = None
+            prefix, sep, rest = value.partition(':')
+            if sep and prefix.lower() in SEARCH_FIELDS and rest:
+                field, value = SEARCH_FIELDS[prefix.lower()], rest
+            term = normalize_term(value)
+            if not term:
+                raise ValueError("Empty term in query")
+            return ('term', field, term)
+        raise ValueError("Incomplete query")
+
+def parse_query(query):
+    """Parse a boolean skill query into a small AST"""
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    return _QueryParser(tokens).parse()
+
+def compile_query(node, params):
+    """Compile a query AST into a SELECT of matching candidate ids"""
+    kind = node[0]
+    if kind == 'term':
+        _, field, term = node
+        if field:
+            params.extend([term, field])
+            return "SELECT candidate_id FROM candidate_terms WHERE term = ? AND field = ?"
+        params.append(term)
+        return "SELECT candidate_id FROM candidate_terms WHERE term = ?"
+    if kind == 'not':
+        inner = compile_query(node[1], params)
+        return f"SELECT candidate_id FROM candidate_attrs EXCEPT SELECT candidate_id FROM ({inner})"
+    if kind == 'and' and (node[1][0] == 'not' or node[2][0] == 'not'):
+        # "a AND NOT b" is a set difference; avoids materialising the complement of b
+        positive, negative = (node[2], node[1]) if node[1][0] == 'not' else (node[1], node[2])
+        if positive[0] != 'not':
+            left = compile_query(positive, params)
+            right = compile_query(negative[1], params)
+            return f"SELECT candidate_id FROM ({left}) EXCEPT SELECT candidate_id FROM ({right})"
+    left = compile_query(node[1], params)
+    right = compile_query(node[2], params)
+    operator = 'INTERSECT' if kind == 'and' else 'UNION'
+    return f"SELECT candidate_id FROM ({left}) {operator} SELECT candidate_id FROM ({right})"
+
+# -------- Search --------
+SORT_ORDERS = {
+    'experience': "a.experience DESC, a.candidate_id DESC",
+    'experience_asc': "a.experience ASC, a.candidate_id ASC"
+}
+
+def filter_sql(query=None, min_experience=None, max_experience=None, domain=None):
+    """WHERE clause over ``candidate_attrs a`` and its parameters for the search filters"""
+    params = []
+    where = []
+    if query:
+        node = parse_query(query)
+        if node is not None and node[0] == 'not':
+            where.append(f"a.candidate_id NOT IN ({compile_query(node[1], params)})")
+        elif node is not None:
+            where.append(f"a.candidate_id IN ({compile_query(node, params)})")
+    if min_experience is not None:
+        where.append("a.experience >= ?")
+        params.append(float(min_experience))
+    if max_experience is not None:
+        where.append("a.experience <= ?")
+        params.append(float(max_experience))
+    if domain:
+        where.append("a.domain = ?")
+        params.append(normalize_term(domain))
+    return (f"WHERE {' AND '.join(where)}" if where else ""), params
+
+def clamp_page(page, per_page):
+    """Page number and page size as a search actually serves them"""
+    return max(1, int(page)), max(1, min(int(per_page), MAX_PER_PAGE))
+
+def search_candidates(conn, query=None, min_experience=None, max_experience=None,
+                      domain=None, page=1, per_page=20, sort='recent'):
+    """Run a paginated candidate search; returns (total, candidate dicts)"""
+    where_sql, params = filter_sql(query, min_experience, max_experience, domain)
+    order = SORT_ORDERS.get(sort, "a.candidate_id DESC")
+    page, per_page = clamp_page(page, per_page)
+
+    total = conn.execute(f"SELECT COUNT(*) FROM candidate_attrs a {where_sql}", params).fetchone()[0]
+    rows = conn.execute(
+        f"""SELECT c.id, c.data, c.created_at FROM candidate_attrs a
+            JOIN candidates c ON c.id = a.candidate_id
+            {where_sql} ORDER BY {order} LIMIT ? OFFSET ?""",
+        params + [per_page, (page - 1) * per_page]
+    ).fetchall()
+
+    results = []
+    for candidate_id, data, created_at in rows:
+        candidate = json.loads(data)
+        candidate['id'] = candidate_id
+        candidate['created_at'] = created_at
+        results.append(candidate)
+    return total, results
+
+def iter_candidates(conn, columns, query=None, min_experience=None, max_experience=None,
+                    domain=None, sort='recent'):
+    """Cursor over ``columns`` of ``candidates`` for every match, unpaginated.
+
+    The filters are compiled (and a bad query raises ValueError) before
+    this returns; rows are then read from SQLite as they are consumed.
+    """
+    where_sql, params = filter_sql(query, min_experience, max_experience, domain)
+    order = SORT_ORDERS.get(sort, "a.candidate_id DESC")
+    return conn.execute(
+        f"""SELECT {', '.join(f'c.{column}' for column in columns)} FROM candidate_attrs a
+            JOIN candidates c ON c.id = a.candidate_id
+            {where_sql} ORDER BY {order}""",
+        params
+    )
@@ -0,0 +1,121 @@
+import re
+import threading
+from resume_store import resume_row
+
+EXPERIENCE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)')
+
+def split_skills(value):
+    """Skills of a stored comma-separated skills cell"""
+    return [skill.strip() for skill in str(value).split(',') if skill.strip()]
+
+def experience_level(value):
+    """Junior/Mid/Senior bucket of a stored experience cell, or None"""
+    if not value:
+        return None
+    exp_match = EXPERIENCE_PATTERN.search(str(value).strip())
+    if not exp_match:
+        return None
+    exp = float(exp_match.group(1))
+    if exp <= 2:
+        return 'Junior'
+    elif exp <= 5:
+        return 'Mid'
+    return 'Senior'
+
+# -------- Incremental Dashboard Aggregates --------
+class DashboardAggregates:
+    """Skill frequencies, experience histogram and totals kept up to date on every insert.
+
+    Counts live in SQLite next to the candidates and are updated in the same
+    transaction, so every worker process sees the same numbers. Ties in
+    skill counts are broken by first appearance, matching a full scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = (None, None)
+
+    def create(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS dashboard_counters (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS dashboard_skill_counts (
+                skill TEXT PRIMARY KEY,
+                count INTEGER NOT NULL,
+                first_seen INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_dashboard_skill_rank
+            ON dashboard_skill_counts(count DESC, first_seen ASC)
+        """)
+
+    def is_built(self, conn):
+        return conn.execute("SELECT 1 FROM dashboard_counters WHERE key = 'built'").fetchone() is not None
+
+    def mark_built(self, conn):
+        conn.execute("INSERT OR REPLACE INTO dashboard_counters (key, value) VALUES ('built', 1)")
+
+    def _bump(self, conn, key, amount=1):
+        conn.execute(
+            """INSERT INTO dashboard_counters (key, value) VALUES (?, ?)
+               ON CONFLICT(key) DO UPDATE SET value = value + excluded.value""",
+            (key, amount)
+        )
+
+    def on_insert(self, conn, candidate_id, resume):
+        row = resume_row(resume)
+        self._bump(conn, 'total')
+        self._bump(conn, 'version')
+        for skill in (split_skills(row[4]) if row[4] else []):
+            cur = conn.execute("UPDATE dashboard_skill_counts SET count = count + 1 WHERE skill = ?", (skill,))
+            if cur.rowcount == 0:
+                self._bump(conn, 'skill_seq')
+                seq = conn.execute("SELECT value FROM dashboard_counters WHERE key = 'skill_seq'").fetchone()[0]
+                conn.execute(
+                    "INSERT INTO dashboard_skill_counts (skill, count, first_seen) VALUES (?, 1, ?)",
+                    (skill, seq)
+                )
+        level = experience_level(row[3])
+        if level:
+            self._bump(conn, f'level:{level}')
+
+    def version(self, conn):
+        row = conn.execute("SELECT value FROM dashboard_counters WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def snapshot(self, conn):
+        """Return (version, stats) served from the aggregates, memoised per version"""
+        version = self.version(conn)
+        with self._lock:
+            cached_version, cached_stats = self._snapshot
+        if cached_version == version:
+            return version, cached_stats
+
+        # Read counters and ranking from one consistent snapshot
+        conn.execute("BEGIN")
+        try:
+            counters = dict(conn.execute("SELECT key, value FROM dashboard_counters").fetchall())
+            top = conn.execute(
+                "SELECT skill, count FROM dashboard_skill_counts ORDER BY count DESC, first_seen ASC LIMIT 10"
+            ).fetchall()
+        finally:
+            conn.commit()
+        version = counters.get('version', 0)
+        stats = {
+            'resumesProcessed': counters.get('total', 0),
+            'topSkills': [list(item) for item in top[:5]],
+            'skillsDistribution': dict(top),
+            'experienceLevels': {
+                'Junior': counters.get('level:Junior', 0),
+                'Mid': counters.get('level:Mid', 0),
+                'Senior': counters.get('level:Senior', 0)
+            }
+        }
+        with self._lock:
+            self._snapshot = (version, stats)
+        return version, stats
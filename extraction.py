@@ -0,0 +1,226 @@
+import io
+import os
+import time
+import logging
+import zipfile
+import threading
+import multiprocessing
+import xml.etree.ElementTree as ET
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from lazy_loading import LazyModule
+from resume_sections import budget_sections
+from metrics import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# PyMuPDF is only imported once the first PDF is parsed
+fitz = LazyModule('fitz')
+
+# Number of worker processes used for resume parsing (0 or 1 = parse inline)
+EXTRACT_WORKERS = int(os.environ.get('EXTRACT_WORKERS', os.cpu_count() or 1))
+# Characters of text kept per resume (about PROMPT_INPUT_TOKENS worth)
+EXTRACT_MAX_CHARS = int(os.environ.get('EXTRACT_MAX_CHARS', 24000))
+# Pages stop being read once this multiple of the budget has been collected,
+# leaving room to choose sections without parsing a whole portfolio
+EXTRACT_READ_FACTOR = 2
+# Part of the text cache key; bump when extraction or section budgeting changes
+TEXT_EXTRACTOR_VERSION = "2"
+TEXT_VERSION = f"{TEXT_EXTRACTOR_VERSION}-{EXTRACT_MAX_CHARS}-{EXTRACT_READ_FACTOR}"
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_unavailable = False
+
+class UnsupportedFormatError(ValueError):
+    pass
+
+# -------- PDF Text Extraction --------
+def iter_pdf_pages(doc):
+    """Yield page texts one at a time; pages after the caller stops are never parsed"""
+    with doc:
+        for page in doc:
+            yield page.get_text()
+
+def read_budgeted(pages, max_chars=EXTRACT_MAX_CHARS):
+    """Read ``pages`` until the read limit is reached, then keep the best sections within ``max_chars``"""
+    collected = []
+    read = 0
+    with closing(pages):
+        for text in pages:
+            collected.append(text)
+            read += len(text)
+            if read >= max_chars * EXTRACT_READ_FACTOR:
+                break
+    return budget_sections("".join(collected), max_chars)
+
+def extract_text_from_pdf(filepath, max_chars=EXTRACT_MAX_CHARS):
+    return read_budgeted(iter_pdf_pages(fitz.open(filepath)), max_chars)
+
+def extract_text_from_pdf_bytes(data, max_chars=EXTRACT_MAX_CHARS):
+    """Extract text straight from in-memory PDF bytes (no temp file)"""
+    return read_budgeted(iter_pdf_pages(fitz.open(stream=data, filetype="pdf")), max_chars)
+
+# -------- DOCX Text Extraction --------
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+def iter_docx_paragraphs(data):
+    """Yield paragraph texts of in-memory DOCX bytes, streaming word/document.xml out of the zip"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive, archive.open("word/document.xml") as xml:
+        parts = []
+        for event, elem in ET.iterparse(xml, events=("end",)):
+            tag = elem.tag
+            if tag == W_NS + "t":
+                parts.append(elem.text or "")
+            elif tag == W_NS + "tab":
+                parts.append("\t")
+            elif tag in (W_NS + "br", W_NS + "cr"):
+                parts.append("\n")
+            elif tag == W_NS + "p":
+                yield "".join(parts) + "\n"
+                parts = []
+                # Paragraphs are done with; drop them to keep memory flat
+                elem.clear()
+
+def extract_text_from_docx_bytes(data, max_chars=EXTRACT_MAX_CHARS):
+    return read_budgeted(iter_docx_paragraphs(data), max_chars)
+
+# -------- Format Registry --------
+# (format name, sniff(data) -> bool, extract(data, max_chars) -> text), checked in order
+EXTRACTORS = []
+
+def register_extractor(name, sniff, extract):
+    """Route files whose leading bytes satisfy ``sniff`` to ``extract``"""
+    EXTRACTORS.append((name, sniff, extract))
+
+def _is_pdf(data):
+    # The header may follow a little junk; readers accept it within the first 1KB
+    return b"%PDF-" in data[:1024]
+
+def _is_docx(data):
+    if not data.startswith(b"PK\x03\x04"):
+        return False
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            return "word/document.xml" in archive.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+register_extractor("pdf", _is_pdf, extract_text_from_pdf_bytes)
+register_extractor("docx", _is_docx, extract_text_from_docx_bytes)
+
+def find_extractor(data):
+    """(format name, extract function) matching the leading bytes of ``data``, or (None, None)"""
+    for name, sniff, extract in EXTRACTORS:
+        if sniff(data):
+            return name, extract
+    return None, None
+
+def detect_format(data):
+    """Name of the registered format of ``data``, or None"""
+    return find_extractor(data)[0]
+
+def extract_text_from_bytes(data, max_chars=EXTRACT_MAX_CHARS):
+    """Extract text with the extractor matching the file's magic bytes"""
+    _, extract = find_extractor(data)
+    if extract is None:
+        raise UnsupportedFormatError("Unsupported file format. Only PDF and DOCX files are allowed.")
+    return extract(data, max_chars)
+
+def _extract_timed(data):
+    """Worker entry point: (format, text or exception, seconds); never raises"""
+    started = time.perf_counter()
+    fmt, extract = find_extractor(data)
+    try:
+        if extract is None:
+            raise UnsupportedFormatError("Unsupported file format. Only PDF and DOCX files are allowed.")
+        result = extract(data, EXTRACT_MAX_CHARS)
+    except Exception as e:
+        result = e
+    return fmt or "unknown", result, time.perf_counter() - started
+
+class ExtractionStats:
+    """Per-format counts and parse times, recorded in the serving process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._formats = {}
+
+    def record(self, fmt, seconds, ok):
+        with self._lock:
+            entry = self._formats.setdefault(fmt, {'count': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            entry['count'] += 1
+            entry['errors'] += 0 if ok else 1
+            entry['total_seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                fmt: {
+                    'count': entry['count'],
+                    'errors': entry['errors'],
+                    'avg_ms': round(entry['total_seconds'] / entry['count'] * 1000, 2),
+                    'max_ms': round(entry['max_seconds'] * 1000, 2),
+                    'total_ms': round(entry['total_seconds'] * 1000, 2)
+                }
+                for fmt, entry in self._formats.items()
+            }
+
+extraction_stats = ExtractionStats()
+
+# -------- Extraction Process Pool --------
+def get_extract_pool():
+    """Return the shared process pool, creating it once per process"""
+    global _pool, _pool_unavailable
+    if EXTRACT_WORKERS <= 1 or _pool_unavailable:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None and not _pool_unavailable:
+                try:
+                    # forkserver avoids forking a multi-threaded server process
+                    methods = multiprocessing.get_all_start_methods()
+                    ctx = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+                    _pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, mp_context=ctx)
+                except (OSError, NotImplementedError, ValueError) as e:
+                    # e.g. serverless runtimes without /dev/shm semaphores
+                    logger.warning("Extraction pool unavailable, parsing inline: %s", e)
+                    _pool_unavailable = True
+    return _pool
+
+def shutdown_extract_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def extract_texts(blobs):
+    """Extract text from a list of PDF/DOCX byte strings in parallel.
+
+    Returns a list aligned with ``blobs`` where each item is either the
+    extracted text or the exception raised while parsing that file.
+    """
+    pool = get_extract_pool() if blobs else None
+    if pool is None:
+        return [_record(*_extract_timed(data)) for data in blobs]
+
+    futures = [pool.submit(_extract_timed, data) for data in blobs]
+    results = []
+    for future in futures:
+        try:
+            results.append(_record(*future.result()))
+        except BrokenProcessPool as e:
+            # A worker died (e.g. a malformed PDF crashed MuPDF); start a fresh pool next time
+            shutdown_extract_pool()
+            results.append(e)
+        except Exception as e:
+            results.append(e)
+    return results
+
+def _record(fmt, result, seconds):
+    extraction_stats.record(fmt, seconds, not isinstance(result, Exception))
+    STAGE_SECONDS.observe(seconds, stage="extract", format=fmt)
+    return result
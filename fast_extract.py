@@ -0,0 +1,231 @@
+import os
+import re
+from collections import Counter, deque
+from datetime import datetime
+from metrics import STAGE_SECONDS
+
+# Skip the LLM entirely and fill every field locally (works offline)
+NO_LLM = os.environ.get('NO_LLM', '').lower() in ('1', 'true', 'yes')
+# Part of the cache keys; bump when the patterns or dictionaries change
+EXTRACTOR_VERSION = "1"
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_PATTERN = re.compile(r"(?<![\w+])\+?\d[\d \t().-]{7,}\d(?!\w)")
+YEARS_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+DATE_RANGE_PATTERN = re.compile(
+    r"\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now|till date)\b", re.IGNORECASE
+)
+NON_DIGIT_PATTERN = re.compile(r"\D")
+NAME_LINE_PATTERN = re.compile(r"^[A-Za-z][A-Za-z.'-]*(?:\s+[A-Za-z][A-Za-z.'-]*){1,3}$")
+NOT_A_NAME = {'resume', 'curriculum vitae', 'cv', 'profile', 'summary', 'contact', 'personal details'}
+
+# Canonical names of well-known skills and tools. Single-letter or very
+# ambiguous names (C, R, Go) are left to the LLM / surrounding context.
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Golang", "Rust", "Kotlin", "Swift",
+    "PHP", "Ruby", "Scala", "Perl", "MATLAB", "SQL", "NoSQL", "HTML", "CSS", "Sass", "Bash",
+    "React", "React Native", "Angular", "Vue.js", "Next.js", "Node.js", "Express.js", "Django", "Flask",
+    "FastAPI", "Spring Boot", "Spring", "Hibernate", ".NET", "ASP.NET", "Laravel", "Ruby on Rails",
+    "jQuery", "Bootstrap", "Tailwind CSS", "Redux", "GraphQL", "REST APIs", "Microservices",
+    "Machine Learning", "Deep Learning", "Data Science", "Data Analysis", "Natural Language Processing",
+    "NLP", "Computer Vision", "TensorFlow", "PyTorch", "Keras", "scikit-learn", "Pandas", "NumPy",
+    "OpenCV", "Statistics", "Big Data", "Hadoop", "Spark", "PySpark", "Kafka", "Airflow", "ETL",
+    "Data Warehousing", "Power BI", "Tableau", "MySQL", "PostgreSQL", "MongoDB", "Redis", "Oracle",
+    "SQLite", "Cassandra", "Elasticsearch", "DynamoDB", "Firebase", "AWS", "Azure", "Google Cloud", "GCP",
+    "Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins", "CI/CD", "DevOps", "Linux", "Git",
+    "Android", "iOS", "Flutter", "Unity", "Selenium", "Cypress", "JUnit", "Pytest", "Agile", "Scrum",
+    "Project Management", "Cybersecurity", "Networking", "Blockchain", "Solidity", "UI/UX", "SEO",
+    "Digital Marketing", "Salesforce", "SAP", "Embedded Systems", "IoT", "AutoCAD", "Accounting",
+]
+SOFTWARE = [
+    "VS Code", "Visual Studio", "IntelliJ IDEA", "PyCharm", "Eclipse", "Jupyter", "Postman", "Jira",
+    "Confluence", "Trello", "Slack", "GitHub", "GitLab", "Bitbucket", "Figma", "Adobe Photoshop",
+    "Photoshop", "Adobe Illustrator", "Adobe XD", "Canva", "Excel", "MS Excel", "Microsoft Excel",
+    "MS Office", "Microsoft Office", "PowerPoint", "Word", "Tally", "Android Studio", "Xcode",
+    "Google Analytics", "Notion", "SolidWorks",
+]
+ALIASES = {
+    "js": "JavaScript", "ts": "TypeScript", "node": "Node.js", "nodejs": "Node.js", "reactjs": "React",
+    "react.js": "React", "vue": "Vue.js", "vuejs": "Vue.js", "nextjs": "Next.js", "postgres": "PostgreSQL",
+    "k8s": "Kubernetes", "ml": "Machine Learning", "dl": "Deep Learning", "sklearn": "scikit-learn",
+    "amazon web services": "AWS", "microsoft azure": "Azure", "vscode": "VS Code",
+    "visual studio code": "VS Code", "github actions": "CI/CD", "google cloud platform": "GCP",
+}
+
+# Domain guessed from skills when no LLM is available
+DOMAIN_SKILLS = {
+    "Data Science": {"Machine Learning", "Deep Learning", "Data Science", "Natural Language Processing", "NLP",
+                     "Computer Vision", "TensorFlow", "PyTorch", "Keras", "scikit-learn", "Pandas", "NumPy",
+                     "OpenCV", "Statistics", "Jupyter"},
+    "Data Engineering": {"Big Data", "Hadoop", "Spark", "PySpark", "Kafka", "Airflow", "ETL", "Data Warehousing"},
+    "Data Analytics": {"Data Analysis", "Power BI", "Tableau", "Excel", "MS Excel", "Microsoft Excel", "SQL"},
+    "Web Development": {"JavaScript", "TypeScript", "HTML", "CSS", "Sass", "React", "Angular", "Vue.js", "Next.js",
+                        "jQuery", "Bootstrap", "Tailwind CSS", "Redux", "Figma"},
+    "Backend Development": {"Node.js", "Express.js", "Django", "Flask", "FastAPI", "Spring Boot", "Spring",
+                            "Hibernate", ".NET", "ASP.NET", "Laravel", "Ruby on Rails", "GraphQL", "REST APIs",
+                            "Microservices", "PostgreSQL", "MySQL", "MongoDB", "Redis", "Java", "Golang"},
+    "DevOps": {"Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins", "CI/CD", "DevOps", "AWS", "Azure",
+               "Google Cloud", "GCP", "Linux", "Bash"},
+    "Mobile Development": {"Android", "iOS", "Flutter", "React Native", "Kotlin", "Swift", "Android Studio", "Xcode"},
+    "Quality Assurance": {"Selenium", "Cypress", "JUnit", "Pytest"},
+    "Cybersecurity": {"Cybersecurity", "Networking"},
+    "Design": {"UI/UX", "Adobe Photoshop", "Photoshop", "Adobe Illustrator", "Adobe XD", "Canva"},
+    "Marketing": {"SEO", "Digital Marketing", "Google Analytics", "Salesforce"},
+    "Finance": {"Accounting", "Tally", "SAP"},
+}
+
+# -------- Aho-Corasick Matcher --------
+class KeywordMatcher:
+    """Aho-Corasick automaton finding every dictionary keyword in one pass over the text.
+
+    Matching is case-insensitive and only whole words count, so "Java" is not
+    found inside "JavaScript".
+    """
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for keyword, value in keywords.items():
+            self._add(keyword.lower(), value)
+        self._build()
+
+    def _add(self, keyword, value):
+        node = 0
+        for char in keyword:
+            nxt = self.goto[node].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = nxt
+        self.output[node].append((len(keyword), value))
+
+    def _build(self):
+        # Breadth-first so every failure link points at an already finished node
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, nxt in self.goto[node].items():
+                queue.append(nxt)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0) if node else 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find(self, text):
+        """Return matched values in order of first appearance (deduplicated)"""
+        lowered = text.lower()
+        found = {}
+        node = 0
+        for end, char in enumerate(lowered):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for length, value in self.output[node]:
+                start = end - length + 1
+                if _is_boundary(lowered, start - 1) and _is_boundary(lowered, end + 1) and value not in found:
+                    found[value] = start
+        return sorted(found, key=found.get)
+
+def _is_boundary(text, index):
+    return index < 0 or index >= len(text) or not (text[index].isalnum() or text[index] in "+#")
+
+def _build_matchers():
+    skills = {name: name for name in SKILLS}
+    software = {name: name for name in SOFTWARE}
+    for alias, name in ALIASES.items():
+        (software if name in software else skills)[alias] = name
+    return KeywordMatcher(skills), KeywordMatcher(software)
+
+SKILL_MATCHER, SOFTWARE_MATCHER = _build_matchers()
+
+# -------- Local Field Extraction --------
+def extract_email(text):
+    match = EMAIL_PATTERN.search(text)
+    return match.group(0) if match else ""
+
+def extract_phone(text):
+    for match in PHONE_PATTERN.finditer(text):
+        candidate = match.group(0).strip()
+        digits = NON_DIGIT_PATTERN.sub("", candidate)
+        # Skip year ranges like "2018 - 2022" and other short number runs
+        if 10 <= len(digits) <= 15 and not DATE_RANGE_PATTERN.search(candidate):
+            return candidate
+    return ""
+
+def extract_name(text):
+    """Best-effort name from the first lines of the resume ("" when unsure)"""
+    for line in [line.strip() for line in text.splitlines() if line.strip()][:5]:
+        if line.lower() in NOT_A_NAME or not NAME_LINE_PATTERN.match(line):
+            continue
+        words = line.split()
+        if all(word[0].isupper() for word in words):
+            return line.title() if line.isupper() else line
+    return ""
+
+def estimate_experience(text):
+    """Years of experience from explicit mentions or, failing that, from date ranges"""
+    mentions = [float(value) for value in YEARS_PATTERN.findall(text) if float(value) < 50]
+    if mentions:
+        return max(mentions)
+    current_year = datetime.now().year
+    spans = []
+    for start, end in DATE_RANGE_PATTERN.findall(text):
+        end_year = current_year if not end[0].isdigit() else int(end)
+        if int(start) <= end_year <= current_year:
+            spans.append((int(start), end_year))
+    # Merge overlapping spans so parallel roles are not double counted
+    total = 0
+    last_end = None
+    for start, end in sorted(spans):
+        if last_end is not None and start < last_end:
+            start = last_end
+        if end > start:
+            total += end - start
+        last_end = max(end, last_end or end)
+    return total
+
+def guess_domain(skills, software):
+    votes = Counter()
+    for item in list(skills) + list(software):
+        for domain, members in DOMAIN_SKILLS.items():
+            if item in members:
+                votes[domain] += 1
+    return votes.most_common(1)[0][0] if votes else ""
+
+def extract_local_fields(text):
+    """Deterministic fields that need no LLM: contact details and known skills/software"""
+    with STAGE_SECONDS.time(stage='local_extract'):
+        return {
+            "name": extract_name(text),
+            "email": extract_email(text),
+            "phone_number": extract_phone(text),
+            "skills": SKILL_MATCHER.find(text),
+            "used_software": SOFTWARE_MATCHER.find(text)
+        }
+
+def extract_offline(text):
+    """Every field filled locally, for NO_LLM mode"""
+    fields = extract_local_fields(text)
+    fields["experience_in_years"] = estimate_experience(text)
+    fields["expected_domain"] = guess_domain(fields["skills"], fields["used_software"])
+    return fields
+
+def merge_fields(local, llm):
+    """Combine local fields with the LLM's judgement fields.
+
+    Local contact details win; the LLM only fills what it was asked for or
+    what the local pass could not find.
+    """
+    merged = dict(local)
+    for key, value in (llm or {}).items():
+        if key in ("skills", "used_software"):
+            extra = [item for item in (value if isinstance(value, list) else []) if item not in merged.get(key, [])]
+            merged[key] = list(merged.get(key, [])) + extra
+        elif not merged.get(key):
+            merged[key] = value
+    return merged
@@ -0,0 +1,722 @@
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from email.utils import parsedate_to_datetime
+from lazy_loading import LazyModule
+from metrics import GROQ_CIRCUIT_TRIPS, GROQ_ERRORS, GROQ_HEDGES, GROQ_REQUEST_SECONDS, GROQ_RETRIES, GROQ_TOKENS
+
+# Imported when the first client is built, not on a cold start
+requests = LazyModule('requests')
+httpx = LazyModule('httpx')
+
+GROQ_RPM = int(os.environ.get('GROQ_RPM', 30))
+GROQ_TPM = int(os.environ.get('GROQ_TPM', 12000))
+GROQ_MAX_RETRIES = int(os.environ.get('GROQ_MAX_RETRIES', 4))
+GROQ_QUEUE_TIMEOUT = float(os.environ.get('GROQ_QUEUE_TIMEOUT', 120))
+GROQ_POOL_SIZE = int(os.environ.get('GROQ_POOL_SIZE', 10))
+# Connections the async client may open; each in-flight call holds one
+GROQ_ASYNC_CONNECTIONS = int(os.environ.get('GROQ_ASYNC_CONNECTIONS', 256))
+# httpcore scans its whole pool on every request, so one pool of hundreds of
+# connections slows down quadratically; calls are spread over pools this size
+GROQ_ASYNC_POOL_SIZE = 32
+# Longest a call may take; once enough calls are seen, the limit is GROQ_TIMEOUT_FACTOR
+# times their p99, but never under GROQ_MIN_TIMEOUT
+GROQ_TIMEOUT = float(os.environ.get('GROQ_TIMEOUT', 30))
+GROQ_MIN_TIMEOUT = float(os.environ.get('GROQ_MIN_TIMEOUT', 5))
+GROQ_TIMEOUT_FACTOR = float(os.environ.get('GROQ_TIMEOUT_FACTOR', 2))
+# Recent calls per model and completion budget that the percentiles are taken over,
+# and how many must be seen before they are trusted
+GROQ_LATENCY_WINDOW = int(os.environ.get('GROQ_LATENCY_WINDOW', 200))
+GROQ_LATENCY_MIN_SAMPLES = int(os.environ.get('GROQ_LATENCY_MIN_SAMPLES', 20))
+# Hedged duplicates allowed per completed call, and threads running hedged calls
+GROQ_HEDGE_RATIO = float(os.environ.get('GROQ_HEDGE_RATIO', 0.1))
+GROQ_HEDGE_THREADS = int(os.environ.get('GROQ_HEDGE_THREADS', 64))
+# The circuit opens when GROQ_BREAKER_ERROR_RATE of the last GROQ_BREAKER_CALLS calls
+# ended within GROQ_BREAKER_WINDOW seconds failed (at least GROQ_BREAKER_MIN_CALLS
+# of them), and lets a probe through after GROQ_BREAKER_COOLDOWN seconds
+GROQ_BREAKER_CALLS = int(os.environ.get('GROQ_BREAKER_CALLS', 20))
+GROQ_BREAKER_WINDOW = float(os.environ.get('GROQ_BREAKER_WINDOW', 30))
+GROQ_BREAKER_MIN_CALLS = int(os.environ.get('GROQ_BREAKER_MIN_CALLS', 10))
+GROQ_BREAKER_ERROR_RATE = float(os.environ.get('GROQ_BREAKER_ERROR_RATE', 0.5))
+GROQ_BREAKER_COOLDOWN = float(os.environ.get('GROQ_BREAKER_COOLDOWN', 15))
+CIRCUIT_OPEN_MESSAGE = "AI service is temporarily unavailable - please try again shortly"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class GroqError(Exception):
+    """A Groq call failed after retries"""
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+# -------- Token Bucket Limiter --------
+class TokenBucket:
+    """Thread-safe token bucket; ``acquire`` blocks until tokens are available"""
+
+    def __init__(self, capacity, per_seconds=60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / per_seconds
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1, timeout=None):
+        """Take ``amount`` tokens, waiting up to ``timeout`` seconds. Returns False on timeout."""
+        amount = min(float(amount), self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return True
+                wait = (amount - self.tokens) / self.rate
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                self._cond.wait(wait)
+
+    def reserve(self, amount=1):
+        """Take ``amount`` tokens if available and return 0, else return the seconds until they will be"""
+        amount = min(float(amount), self.capacity)
+        with self._cond:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    async def acquire_async(self, amount=1, timeout=None):
+        """Like ``acquire``, but waits with asyncio.sleep instead of blocking the thread"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.reserve(amount)
+            if not wait:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            await asyncio.sleep(wait)
+
+    def debit(self, amount):
+        """Charge tokens after the fact (may leave the bucket in debt)"""
+        with self._cond:
+            self._refill()
+            self.tokens -= amount
+
+    def available(self):
+        with self._cond:
+            self._refill()
+            return self.tokens
+
+    def refund(self, amount):
+        with self._cond:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+            self._cond.notify_all()
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute quotas shared by all callers"""
+
+    def __init__(self, rpm=GROQ_RPM, tpm=GROQ_TPM):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def acquire(self, tokens, timeout=None):
+        start = time.monotonic()
+        if not self.requests.acquire(1, timeout):
+            return False
+        remaining = None if timeout is None else max(0.0, timeout - (time.monotonic() - start))
+        if not self.tokens.acquire(tokens, remaining):
+            self.requests.refund(1)
+            return False
+        return True
+
+    async def acquire_async(self, tokens, timeout=None):
+        start = time.monotonic()
+        if not await self.requests.acquire_async(1, timeout):
+            return False
+        remaining = None if timeout is None else max(0.0, timeout - (time.monotonic() - start))
+        if not await self.tokens.acquire_async(tokens, remaining):
+            self.requests.refund(1)
+            return False
+        return True
+
+# -------- Adaptive Timeouts --------
+class LatencyTracker:
+    """Recent Groq round trips per call class, for percentile-based timeouts and hedging.
+
+    A call class is a model and completion budget. A call that timed out is
+    recorded as taking its whole timeout, so the percentiles follow a
+    lasting slowdown up to the ceiling instead of failing every call.
+    """
+
+    def __init__(self, window=GROQ_LATENCY_WINDOW, min_samples=GROQ_LATENCY_MIN_SAMPLES,
+                 min_timeout=GROQ_MIN_TIMEOUT, factor=GROQ_TIMEOUT_FACTOR, hedge_ratio=GROQ_HEDGE_RATIO):
+        self.window = window
+        self.min_samples = min_samples
+        self.min_timeout = min_timeout
+        self.factor = factor
+        self.hedge_ratio = hedge_ratio
+        # Hedges earned by completed calls, spent one per hedge; capped so a quiet spell cannot bank a burst
+        self.hedge_credit = 1.0
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key, seconds):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self.hedge_credit = min(1.0 + self.hedge_ratio * 10, self.hedge_credit + self.hedge_ratio)
+
+    def percentile(self, key, q):
+        """The ``q`` quantile of recent round trips, or None until ``min_samples`` are seen"""
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def timeout(self, key, ceiling):
+        p99 = self.percentile(key, 0.99)
+        if p99 is None:
+            return ceiling
+        return min(ceiling, max(self.min_timeout, p99 * self.factor))
+
+    def take_hedge(self):
+        with self._lock:
+            if self.hedge_credit < 1:
+                return False
+            self.hedge_credit -= 1
+            return True
+
+    def snapshot(self, ceiling):
+        """p50/p95/p99 and current timeout per call class"""
+        with self._lock:
+            keys = list(self._samples)
+        stats = []
+        for key in keys:
+            model, max_tokens = key
+            stats.append({
+                'model': model, 'max_tokens': max_tokens, 'p50': self.percentile(key, 0.5),
+                'p95': self.percentile(key, 0.95), 'p99': self.percentile(key, 0.99),
+                'timeout': self.timeout(key, ceiling)
+            })
+        return stats
+
+# -------- Circuit Breaker --------
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """Stops sending calls to Groq while most recent ones fail.
+
+    Outcomes of the last ``calls`` calls ended within ``window`` seconds are
+    kept; once ``min_calls`` ended and ``error_rate`` of them failed (timeouts,
+    connection errors, 5xx), the circuit opens and calls fail at once
+    instead of each waiting out a timeout. After ``cooldown`` one probe
+    call is let through: its success closes the circuit, its failure opens
+    it again. Outcomes saying nothing about Groq's health (401, 429, local
+    quota waits) are recorded as None and never count.
+    """
+
+    def __init__(self, calls=GROQ_BREAKER_CALLS, window=GROQ_BREAKER_WINDOW, min_calls=GROQ_BREAKER_MIN_CALLS,
+                 error_rate=GROQ_BREAKER_ERROR_RATE, cooldown=GROQ_BREAKER_COOLDOWN):
+        self.calls = calls
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.opened_at = None
+        self._outcomes = deque()
+        self._failures = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may be sent now; every allowed call must be followed by one ``record``"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, healthy):
+        """Outcome of an allowed call: True, False, or None when it says nothing about Groq"""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if healthy is None:
+                    self._probing = False
+                elif healthy:
+                    self.state = CLOSED
+                else:
+                    self._open(now)
+                return
+            if self.state == OPEN or healthy is None:
+                # Calls sent before the circuit opened
+                return
+            self._outcomes.append((now, healthy))
+            self._failures += not healthy
+            while self._outcomes and (len(self._outcomes) > self.calls or now - self._outcomes[0][0] > self.window):
+                self._failures -= not self._outcomes.popleft()[1]
+            if len(self._outcomes) >= self.min_calls and self._failures >= self.error_rate * len(self._outcomes):
+                self._open(now)
+
+    def _open(self, now):
+        self.state = OPEN
+        self.opened_at = now
+        self._outcomes.clear()
+        self._failures = 0
+        self._probing = False
+        GROQ_CIRCUIT_TRIPS.inc()
+
+    def degraded(self):
+        """True while calls are failing fast or only a probe is let through"""
+        return self.state != CLOSED
+
+def _healthy(status_code):
+    """Breaker outcome of an HTTP error: 5xx means Groq is struggling, other errors say nothing about it"""
+    return False if status_code >= 500 else None
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+# -------- Groq Client --------
+class _GroqClientBase:
+    """Request building, backoff, error and usage accounting shared by the sync and async clients"""
+
+    def __init__(self, api_key, api_url, model, timeout=GROQ_TIMEOUT, limiter=None, breaker=None, latency=None,
+                 max_retries=GROQ_MAX_RETRIES, queue_timeout=GROQ_QUEUE_TIMEOUT,
+                 backoff_base=1.0, backoff_cap=30.0):
+        self.api_url = api_url
+        self.model = model
+        self.timeout = timeout
+        self.limiter = limiter or RateLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = latency or LatencyTracker()
+        self.max_retries = max_retries
+        self.queue_timeout = queue_timeout
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = retry_after + random.uniform(0, self.backoff_base)
+        return delay
+
+    def _payload(self, prompt, temperature, max_tokens, stream=False, model=None):
+        payload = {
+            "model": model or self.model,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _fail(self, category, message):
+        GROQ_ERRORS.inc(category=category)
+        return {"error": message}
+
+    def _latency_key(self, payload):
+        return payload["model"], payload["max_tokens"]
+
+    def _attempt_timeout(self, payload, stream):
+        # Streams answer with their first token, so only whole completions have a learned limit
+        return self.timeout if stream else self.latency.timeout(self._latency_key(payload), self.timeout)
+
+    def _hedge_delay(self, payload):
+        """Seconds after which a call gets a duplicate (the p95 of its class), or None to send just one"""
+        if self.breaker.degraded():
+            return None
+        return self.latency.percentile(self._latency_key(payload), 0.95)
+
+    def _may_hedge(self):
+        # A duplicate never waits for quota, and at most GROQ_HEDGE_RATIO of calls get one
+        return self.limiter.requests.available() >= 1 and self.latency.take_hedge()
+
+    def _circuit_open(self):
+        return None, self._fail("circuit_open", CIRCUIT_OPEN_MESSAGE)
+
+    def _status_error(self, status_code, detail):
+        if status_code == 401:
+            return self._fail("unauthorized", "Invalid API key - please check your GROQ_API_KEY")
+        elif status_code == 429:
+            return self._fail("rate_limited", "Rate limit exceeded - please try again later")
+        else:
+            return self._fail("http_error", f"HTTP error {status_code}: {detail}")
+
+    def _settle(self, usage, prompt_tokens):
+        """Settle the token budget against what Groq actually billed"""
+        if usage:
+            GROQ_TOKENS.inc(usage.get("prompt_tokens", 0), type="prompt")
+            GROQ_TOKENS.inc(usage.get("completion_tokens", 0), type="completion")
+        if usage and usage.get("total_tokens"):
+            extra = usage["total_tokens"] - prompt_tokens
+            if extra > 0:
+                self.limiter.tokens.debit(extra)
+            else:
+                self.limiter.tokens.refund(-extra)
+
+    def _stream_deltas(self, line, prompt_tokens, on_usage=None):
+        """Content deltas of one SSE line of a streamed completion; None once [DONE] arrives"""
+        if not line or not line.startswith("data:"):
+            return []
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return None
+        chunk = json.loads(data)
+        # Groq reports usage on the last chunk under x_groq
+        usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+        if usage:
+            self._settle(usage, prompt_tokens)
+            if on_usage is not None:
+                on_usage(usage)
+        deltas = []
+        for choice in chunk.get("choices", []):
+            content = (choice.get("delta") or {}).get("content")
+            if content:
+                deltas.append(content)
+        return deltas
+
+class GroqClient(_GroqClientBase):
+    """Chat-completions client with connection pooling, rate limiting and retries.
+
+    All calls share one keep-alive session and one limiter, so concurrent
+    batch work queues for quota instead of failing with 429s. Timeouts
+    follow the observed latency, and while Groq keeps failing the circuit
+    breaker answers at once instead of letting every caller wait.
+    """
+
+    def __init__(self, api_key, api_url, model, pool_size=GROQ_POOL_SIZE, hedge_threads=GROQ_HEDGE_THREADS, **options):
+        super().__init__(api_key, api_url, model, **options)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
+        # Hedged calls and their duplicates run here while the caller waits for the first reply
+        self.hedge_pool = ThreadPoolExecutor(max_workers=hedge_threads, thread_name_prefix='groq-hedge')
+
+    def _post(self, payload, prompt_tokens, stream=False):
+        """POST unless the circuit is open. Returns (response, None) or (None, error dict)."""
+        if not self.breaker.allow():
+            return self._circuit_open()
+        healthy = None
+        try:
+            response, error, healthy = self._attempts(payload, prompt_tokens, stream)
+        finally:
+            self.breaker.record(healthy)
+        return response, error
+
+    def _attempts(self, payload, prompt_tokens, stream):
+        """POST with quota, retries and backoff. Returns (response, error dict, healthy) for the breaker."""
+        key = self._latency_key(payload)
+        for attempt in range(self.max_retries + 1):
+            if not self.limiter.acquire(prompt_tokens, timeout=self.queue_timeout):
+                return None, self._fail("queue_timeout", "Rate limit exceeded - please try again later"), None
+            timeout = self._attempt_timeout(payload, stream)
+            started = time.perf_counter()
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=timeout, stream=stream)
+            except requests.exceptions.Timeout:
+                GROQ_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome="timeout")
+                if not stream:
+                    self.latency.observe(key, timeout)
+                return None, self._fail("timeout", "Request timeout - please try again"), False
+            except requests.exceptions.ConnectionError as e:
+                GROQ_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome="connection_error")
+                if attempt < self.max_retries:
+                    GROQ_RETRIES.inc(cause="connection_error")
+                    time.sleep(self._backoff(attempt))
+                    continue
+                return None, self._fail("connection_error", f"Unexpected error: {str(e)}"), False
+            except Exception as e:
+                return None, self._fail("unexpected", f"Unexpected error: {str(e)}"), None
+            elapsed = time.perf_counter() - started
+            GROQ_REQUEST_SECONDS.observe(elapsed, outcome=str(response.status_code))
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                GROQ_RETRIES.inc(cause=str(response.status_code))
+                response.close()
+                time.sleep(self._backoff(attempt, parse_retry_after(response.headers.get("Retry-After"))))
+                continue
+
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                response.close()
+                return None, self._status_error(response.status_code, str(e)), _healthy(response.status_code)
+            if not stream:
+                self.latency.observe(key, elapsed)
+            return response, None, True
+
+        return None, self._fail("rate_limited", "Rate limit exceeded - please try again later"), None
+
+    def chat(self, prompt, temperature=0.7, max_tokens=4000, model=None, hedge=False):
+        """Send a single-message chat completion and return the JSON response or an error dict.
+
+        ``model`` overrides the client's default model for this call. With
+        ``hedge`` (for idempotent calls only) a duplicate is sent once the
+        call runs past the p95 of its class, and the first good reply wins.
+        """
+        prompt_tokens = estimate_tokens(prompt)
+        payload = self._payload(prompt, temperature, max_tokens, model=model)
+        delay = self._hedge_delay(payload) if hedge else None
+        if delay is None:
+            return self._complete(payload, prompt_tokens)
+        return self._hedged(payload, prompt_tokens, delay)
+
+    def _complete(self, payload, prompt_tokens):
+        response, error = self._post(payload, prompt_tokens)
+        if error:
+            return error
+        try:
+            result = response.json()
+        except Exception as e:
+            return self._fail("unexpected", f"Unexpected error: {str(e)}")
+        self._settle(result.get("usage"), prompt_tokens)
+        return result
+
+    def _hedged(self, payload, prompt_tokens, delay):
+        primary = self.hedge_pool.submit(self._complete, payload, prompt_tokens)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+        if not self._may_hedge():
+            return primary.result()
+        GROQ_HEDGES.inc(outcome="sent")
+        backup = self.hedge_pool.submit(self._complete, payload, prompt_tokens)
+        pending = {primary, backup}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if "choices" in result:
+                    # The slower call finishes in the background; its tokens are still settled
+                    if future is backup:
+                        GROQ_HEDGES.inc(outcome="won")
+                    return result
+        return result
+
+    def chat_stream(self, prompt, temperature=0.7, max_tokens=4000, model=None, on_usage=None):
+        """Yield content deltas of a streamed chat completion.
+
+        ``on_usage`` is called with the billed usage once the last chunk
+        reports it. Raises GroqError with the same messages ``chat`` returns
+        as error dicts.
+        """
+        prompt_tokens = estimate_tokens(prompt)
+        response, error = self._post(self._payload(prompt, temperature, max_tokens, stream=True, model=model),
+                                     prompt_tokens, stream=True)
+        if error:
+            raise GroqError(error["error"])
+        with response:
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    deltas = self._stream_deltas(line, prompt_tokens, on_usage)
+                    if deltas is None:
+                        break
+                    yield from deltas
+            except requests.exceptions.RequestException as e:
+                raise GroqError(self._fail("stream_error", f"Unexpected error: {str(e)}")["error"])
+
+    def close(self):
+        self.session.close()
+        self.hedge_pool.shutdown(wait=False)
+
+class AsyncGroqClient(_GroqClientBase):
+    """asyncio counterpart of GroqClient built on httpx.
+
+    A call waiting on Groq holds a connection but no thread, so one worker
+    can keep hundreds in flight. Pass the sync client's ``limiter`` to share
+    one quota between both. The httpx clients are created on first use,
+    inside the running event loop.
+    """
+
+    def __init__(self, api_key, api_url, model, max_connections=GROQ_ASYNC_CONNECTIONS, **options):
+        super().__init__(api_key, api_url, model, **options)
+        self.max_connections = max_connections
+        self._clients = []
+        self._next = 0
+
+    def _http(self):
+        """Next httpx client, round robin over several small pools"""
+        if not self._clients:
+            pools = max(1, -(-self.max_connections // GROQ_ASYNC_POOL_SIZE))
+            size = -(-self.max_connections // pools)
+            limits = httpx.Limits(max_connections=size, max_keepalive_connections=size)
+            self._clients = [httpx.AsyncClient(headers=self.headers, timeout=self.timeout, limits=limits)
+                             for _ in range(pools)]
+        self._next = (self._next + 1) % len(self._clients)
+        return self._clients[self._next]
+
+    async def _post(self, payload, prompt_tokens, stream=False):
+        """POST unless the circuit is open. Returns (response, None) or (None, error dict)."""
+        if not self.breaker.allow():
+            return self._circuit_open()
+        healthy = None
+        try:
+            response, error, healthy = await self._attempts(payload, prompt_tokens, stream)
+        finally:
+            # Also runs when the call is cancelled, so a cancelled probe cannot hold the circuit half open
+            self.breaker.record(healthy)
+        return response, error
+
+    async def _attempts(self, payload, prompt_tokens, stream):
+        """POST with quota, retries and backoff. Returns (response, error dict, healthy) for the breaker."""
+        client = self._http()
+        key = self._latency_key(payload)
+        for attempt in range(self.max_retries + 1):
+            if not await self.limiter.acquire_async(prompt_tokens, timeout=self.queue_timeout):
+                return None, self._fail("queue_timeout", "Rate limit exceeded - please try again later"), None
+            timeout = self._attempt_timeout(payload, stream)
+            started = time.perf_counter()
+            try:
+                request = client.build_request("POST", self.api_url, json=payload, timeout=timeout)
+                response = await client.send(request, stream=stream)
+            except httpx.TimeoutException:
+                GROQ_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome="timeout")
+                if not stream:
+                    self.latency.observe(key, timeout)
+                return None, self._fail("timeout", "Request timeout - please try again"), False
+            except httpx.TransportError as e:
+                GROQ_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome="connection_error")
+                if attempt < self.max_retries:
+                    GROQ_RETRIES.inc(cause="connection_error")
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                return None, self._fail("connection_error", f"Unexpected error: {str(e)}"), False
+            except Exception as e:
+                return None, self._fail("unexpected", f"Unexpected error: {str(e)}"), None
+            elapsed = time.perf_counter() - started
+            GROQ_REQUEST_SECONDS.observe(elapsed, outcome=str(response.status_code))
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                GROQ_RETRIES.inc(cause=str(response.status_code))
+                await response.aclose()
+                await asyncio.sleep(self._backoff(attempt, parse_retry_after(response.headers.get("Retry-After"))))
+                continue
+
+            if response.is_error:
+                await response.aclose()
+                return None, self._status_error(response.status_code, response.reason_phrase), _healthy(response.status_code)
+            if not stream:
+                self.latency.observe(key, elapsed)
+            return response, None, True
+
+        return None, self._fail("rate_limited", "Rate limit exceeded - please try again later"), None
+
+    async def chat(self, prompt, temperature=0.7, max_tokens=4000, model=None, hedge=False):
+        """Send a single-message chat completion and return the JSON response or an error dict.
+
+        ``hedge`` races a duplicate like ``GroqClient.chat``; the slower call is cancelled.
+        """
+        prompt_tokens = estimate_tokens(prompt)
+        payload = self._payload(prompt, temperature, max_tokens, model=model)
+        delay = self._hedge_delay(payload) if hedge else None
+        if delay is None:
+            return await self._complete(payload, prompt_tokens)
+        primary = asyncio.ensure_future(self._complete(payload, prompt_tokens))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._may_hedge():
+                return await primary
+            GROQ_HEDGES.inc(outcome="sent")
+            backup = asyncio.ensure_future(self._complete(payload, prompt_tokens))
+            tasks.append(backup)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if "choices" in result:
+                        if task is backup:
+                            GROQ_HEDGES.inc(outcome="won")
+                        return result
+            return result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _complete(self, payload, prompt_tokens):
+        response, error = await self._post(payload, prompt_tokens)
+        if error:
+            return error
+        try:
+            result = response.json()
+        except Exception as e:
+            return self._fail("unexpected", f"Unexpected error: {str(e)}")
+        self._settle(result.get("usage"), prompt_tokens)
+        return result
+
+    async def chat_stream(self, prompt, temperature=0.7, max_tokens=4000, model=None, on_usage=None):
+        """Async iterator of content deltas; raises GroqError like ``GroqClient.chat_stream``"""
+        prompt_tokens = estimate_tokens(prompt)
+        response, error = await self._post(self._payload(prompt, temperature, max_tokens, stream=True, model=model),
+                                           prompt_tokens, stream=True)
+        if error:
+            raise GroqError(error["error"])
+        try:
+            async for line in response.aiter_lines():
+                deltas = self._stream_deltas(line, prompt_tokens, on_usage)
+                if deltas is None:
+                    break
+                for content in deltas:
+                    yield content
+        except httpx.HTTPError as e:
+            raise GroqError(self._fail("stream_error", f"Unexpected error: {str(e)}")["error"])
+        finally:
+            await response.aclose()
+
+    async def close(self):
+        clients, self._clients = self._clients, []
+        for client in clients:
+            await client.aclose()
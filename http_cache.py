@@ -0,0 +1,130 @@
+import os
+import re
+import gzip
+import json
+import hashlib
+import mimetypes
+import threading
+import importlib.util
+from werkzeug.security import safe_join
+from lazy_loading import LazyModule
+
+# Optional: without it only gzip variants are served
+brotli = LazyModule('brotli')
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'application/xml',
+                      'application/manifest+json', 'application/wasm', 'image/svg+xml', 'font/ttf', 'font/otf')
+# Smaller bodies fit in one packet anyway
+MIN_COMPRESS_BYTES = 1024
+# Files above this are sent from disk as before, not held in memory
+MAX_CACHED_BYTES = 8 * 1024 * 1024
+# Vite writes bundles to assets/ named after their content, e.g. assets/index-B7x_kQ2m.js
+HASHED_ASSET_PATTERN = re.compile(r"^assets/.+[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+def brotli_available():
+    return importlib.util.find_spec('brotli') is not None
+
+def json_etag(value):
+    """Strong ETag for a JSON-serialisable value"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:20]
+
+# -------- Cached Bodies --------
+class CachedBody:
+    """A response body with its ETag, compressed at most once per encoding.
+
+    Every encoding is a separate representation, so each gets its own ETag.
+    """
+
+    def __init__(self, data, mimetype, cache_control=REVALIDATE):
+        self.data = data
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.etag = hashlib.sha256(data).hexdigest()[:20]
+        self.compressible = len(data) >= MIN_COMPRESS_BYTES and mimetype.startswith(COMPRESSIBLE_TYPES)
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def _variant(self, encoding):
+        variant = self._variants.get(encoding)
+        if variant is None:
+            with self._lock:
+                variant = self._variants.get(encoding)
+                if variant is None:
+                    if encoding == 'br':
+                        variant = brotli.compress(self.data, quality=11)
+                    else:
+                        variant = gzip.compress(self.data, compresslevel=9, mtime=0)
+                    # Not worth a Content-Encoding when it saves nothing
+                    self._variants[encoding] = variant = variant if len(variant) < len(self.data) else b""
+        return variant
+
+    def encodings(self):
+        if not self.compressible:
+            return ()
+        return ('br', 'gzip') if brotli_available() else ('gzip',)
+
+    def negotiate(self, accept_encodings):
+        """(Content-Encoding or None, body, ETag) for a parsed Accept-Encoding header"""
+        for encoding in self.encodings():
+            if accept_encodings[encoding] > 0:
+                variant = self._variant(encoding)
+                if variant:
+                    return encoding, variant, f"{self.etag}-{encoding}"
+        return None, self.data, self.etag
+
+    def warm(self):
+        for encoding in self.encodings():
+            self._variant(encoding)
+
+class StaticAssets:
+    """Files of the built frontend, read, hashed and compressed once per process.
+
+    Content-hashed build files are marked immutable; everything else
+    (index.html) must be revalidated, which costs a 304 while unchanged.
+    Entries are rebuilt when a file's size or mtime changes.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """CachedBody of a file under the root, or None when missing or too large to cache"""
+        full_path = safe_join(self.root, path)
+        if full_path is None:
+            return None
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return None
+        if not os.path.isfile(full_path) or stat.st_size > MAX_CACHED_BYTES:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        mimetype = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        cache_control = IMMUTABLE if HASHED_ASSET_PATTERN.match(path) else REVALIDATE
+        body = CachedBody(data, mimetype, cache_control)
+        with self._lock:
+            self._entries[path] = (key, body)
+        return body
+
+    def warm(self):
+        """Load and compress every file now, so no visitor waits for brotli; returns the file count"""
+        count = 0
+        if not os.path.isdir(self.root):
+            return count
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.relpath(os.path.join(directory, filename), self.root).replace(os.sep, '/')
+                body = self.get(path)
+                if body is not None:
+                    body.warm()
+                    count += 1
+        return count
@@ -0,0 +1,61 @@
+import time
+import importlib
+import threading
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    Lets heavy libraries (PyMuPDF, openpyxl, requests, NumPy) stay out of a
+    cold start until a request actually needs them.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+class LazyObject:
+    """Proxy that builds its target with ``factory`` on first attribute access.
+
+    Construction runs once, under a lock, and its duration is kept for the
+    startup report.
+    """
+
+    def __init__(self, name, factory):
+        self._name = name
+        self._factory = factory
+        self._value = None
+        self._lock = threading.Lock()
+        self.load_seconds = None
+
+    @property
+    def loaded(self):
+        return self._value is not None
+
+    def load(self):
+        value = self._value
+        if value is None:
+            with self._lock:
+                value = self._value
+                if value is None:
+                    started = time.perf_counter()
+                    value = self._factory()
+                    self.load_seconds = time.perf_counter() - started
+                    self._value = value
+        return value
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<LazyObject {self._name} ({state})>"
@@ -0,0 +1,328 @@
+import os
+import json
+import time
+import ipaddress
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from groq_client import GROQ_QUEUE_TIMEOUT, TokenBucket
+from metrics import LLM_QUEUE_WAIT, LLM_REJECTED
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+LATENCY_CLASSES = (INTERACTIVE, BULK)
+ANONYMOUS = 'anonymous'
+
+# Groq calls admitted at once across all tenants; the rest wait here, in fair order
+LLM_SLOTS = int(os.environ.get('LLM_SLOTS', 32))
+# Slots bulk work may never take, so an interactive call rarely waits for one
+LLM_INTERACTIVE_RESERVE = int(os.environ.get('LLM_INTERACTIVE_RESERVE', max(1, LLM_SLOTS // 4)))
+# Bulk calls have no one waiting on them, so they queue far longer before giving up
+LLM_BULK_QUEUE_TIMEOUT = float(os.environ.get('LLM_BULK_QUEUE_TIMEOUT', 1800))
+# Share of the slots (weight), calls in flight per latency class, and tokens per
+# minute of prompt (None: only the global Groq quota applies), by pricing plan.
+# 'default' is for callers not mapped to a plan, so a single-tenant deployment
+# is limited by the global Groq quota alone. LLM_PLAN_LIMITS takes JSON of the
+# same shape to override them.
+PLAN_LIMITS = {
+    'default': {'weight': 1, 'concurrency': LLM_SLOTS, 'tpm': None},
+    'starter': {'weight': 1, 'concurrency': 2, 'tpm': 4000},
+    'growth': {'weight': 2, 'concurrency': 4, 'tpm': 8000},
+    'enterprise': {'weight': 4, 'concurrency': 16, 'tpm': None}
+}
+for _plan, _overrides in json.loads(os.environ.get('LLM_PLAN_LIMITS', '{}')).items():
+    PLAN_LIMITS[_plan] = dict(PLAN_LIMITS.get(_plan, PLAN_LIMITS['default']), **_overrides)
+# Tenant id -> plan, e.g. TENANT_PLANS="acme=enterprise,globex=growth"; others get DEFAULT_TENANT_PLAN
+TENANT_PLANS = dict(
+    item.split('=', 1) for item in os.environ.get('TENANT_PLANS', '').replace(' ', '').split(',') if '=' in item
+)
+DEFAULT_TENANT_PLAN = os.environ.get('DEFAULT_TENANT_PLAN', 'default')
+# Gateways allowed to name the tenant in X-Tenant-ID, as addresses or networks,
+# e.g. "10.0.0.0/8,127.0.0.1"; the header from any other peer is ignored
+TENANT_TRUSTED_PROXIES = [
+    ipaddress.ip_network(item, strict=False)
+    for item in os.environ.get('TENANT_TRUSTED_PROXIES', '').replace(' ', '').split(',') if item
+]
+# Tenants without a Groq call for this long are forgotten, stats included
+LLM_TENANT_IDLE_SECONDS = float(os.environ.get('LLM_TENANT_IDLE_SECONDS', 600))
+
+# Tenant whose quota pays for Groq calls made in this context
+current_tenant = contextvars.ContextVar('current_tenant', default=ANONYMOUS)
+
+def run_as(tenant, fn, *args):
+    """Call ``fn`` with ``tenant`` as the current tenant; for work handed to other threads"""
+    token = current_tenant.set(tenant)
+    try:
+        return fn(*args)
+    finally:
+        current_tenant.reset(token)
+
+def tenant_plan(tenant):
+    return TENANT_PLANS.get(tenant, DEFAULT_TENANT_PLAN)
+
+def request_tenant(tenant_id, remote_addr, trusted_proxies=TENANT_TRUSTED_PROXIES):
+    """Tenant named by a request's X-Tenant-ID header, or ANONYMOUS.
+
+    The header is only believed from a trusted gateway and only for tenants
+    listed in TENANT_PLANS, so a client can neither borrow another plan nor
+    make up new tenants.
+    """
+    tenant_id = (tenant_id or '').strip()
+    if tenant_id not in TENANT_PLANS:
+        return ANONYMOUS
+    try:
+        address = ipaddress.ip_address(remote_addr or '')
+    except ValueError:
+        return ANONYMOUS
+    return tenant_id if any(address in network for network in trusted_proxies) else ANONYMOUS
+
+class _Tenant:
+    def __init__(self, name, plan, limits):
+        self.name = name
+        self.plan = plan
+        self.weight = float(limits['weight'])
+        self.concurrency = limits['concurrency']
+        self.tokens = TokenBucket(limits['tpm']) if limits.get('tpm') else None
+        self.queues = {latency_class: deque() for latency_class in LATENCY_CLASSES}
+        self.in_flight = {latency_class: 0 for latency_class in LATENCY_CLASSES}
+        # Calls between ``_tenant`` and their release or rejection; the tenant is kept while any remain
+        self.callers = 0
+        self.last_active = time.monotonic()
+        # Virtual finish time of the tenant's last admitted call
+        self.finish = 0.0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def busy(self):
+        return any(self.queues.values()) or any(self.in_flight.values())
+
+class _Waiter:
+    __slots__ = ('tenant', 'latency_class', 'cost', 'wake', 'enqueued', 'granted')
+
+    def __init__(self, tenant, latency_class, cost, wake):
+        self.tenant = tenant
+        self.latency_class = latency_class
+        self.cost = cost
+        self.wake = wake
+        self.enqueued = time.monotonic()
+        self.granted = False
+
+# -------- Fair Scheduler --------
+class FairScheduler:
+    """Weighted fair queueing of Groq calls across tenants, in two latency classes.
+
+    Every call first takes its tokens from the tenant's per-minute quota,
+    then waits for one of ``slots``. A freed slot goes to queued interactive
+    calls before any bulk call, and within a class to the tenant with the
+    smallest virtual finish time (start-time fair queueing): each admitted
+    call advances its tenant's clock by tokens / plan weight, so tenants
+    share capacity in proportion to their weights whatever their backlog.
+    Each tenant may have ``concurrency`` calls of each class in flight, and
+    bulk calls never take the last ``interactive_reserve`` slots.
+    """
+
+    def __init__(self, slots=LLM_SLOTS, interactive_reserve=LLM_INTERACTIVE_RESERVE,
+                 plan_limits=PLAN_LIMITS, queue_timeouts=None, idle_seconds=LLM_TENANT_IDLE_SECONDS):
+        self.slots = slots
+        self.interactive_reserve = min(interactive_reserve, slots - 1)
+        self.plan_limits = plan_limits
+        self.queue_timeouts = queue_timeouts or {INTERACTIVE: GROQ_QUEUE_TIMEOUT, BULK: LLM_BULK_QUEUE_TIMEOUT}
+        self.idle_seconds = idle_seconds
+        self.free = slots
+        self.bulk_in_flight = 0
+        self.tenants = {}
+        self.virtual_time = 0.0
+        self._lock = threading.Lock()
+
+    def _tenant(self, name):
+        """The tenant's state, kept until the caller's call is released or rejected"""
+        with self._lock:
+            tenant = self.tenants.get(name)
+            if tenant is None:
+                self._evict_idle()
+                plan = tenant_plan(name)
+                tenant = _Tenant(name, plan, self.plan_limits.get(plan, PLAN_LIMITS['default']))
+                self.tenants[name] = tenant
+            tenant.callers += 1
+            return tenant
+
+    def _leave(self, tenant):
+        """A caller of ``tenant`` is done; called with the lock held"""
+        tenant.callers -= 1
+        tenant.last_active = time.monotonic()
+
+    def _evict_idle(self):
+        """Forget tenants without callers for ``idle_seconds``; called with the lock held"""
+        cutoff = time.monotonic() - self.idle_seconds
+        for name in [name for name, tenant in self.tenants.items()
+                     if tenant.callers == 0 and tenant.last_active < cutoff]:
+            del self.tenants[name]
+
+    def _enqueue(self, waiter):
+        tenant = waiter.tenant
+        with self._lock:
+            if not tenant.busy():
+                # A tenant returning from idle starts at the current virtual time, with no saved-up credit
+                tenant.finish = max(tenant.finish, self.virtual_time)
+            tenant.queues[waiter.latency_class].append(waiter)
+            self._dispatch()
+
+    def _eligible(self, tenant, latency_class):
+        return tenant.queues[latency_class] and tenant.in_flight[latency_class] < tenant.concurrency
+
+    def _dispatch(self):
+        """Hand free slots to the next waiters; called with the lock held"""
+        while self.free > 0:
+            chosen = None
+            for latency_class in LATENCY_CLASSES:
+                if latency_class == BULK and self.bulk_in_flight >= self.slots - self.interactive_reserve:
+                    break
+                candidates = [tenant for tenant in self.tenants.values() if self._eligible(tenant, latency_class)]
+                if candidates:
+                    chosen = min(candidates, key=lambda tenant: tenant.finish)
+                    break
+            if chosen is None:
+                return
+            waiter = chosen.queues[latency_class].popleft()
+            self.virtual_time = chosen.finish
+            chosen.finish += max(1, waiter.cost) / chosen.weight
+            chosen.in_flight[latency_class] += 1
+            self.free -= 1
+            if latency_class == BULK:
+                self.bulk_in_flight += 1
+            waiter.granted = True
+            waiter.wake()
+
+    def _withdraw(self, waiter):
+        """Take a waiter out of its queue; False if it was granted a slot meanwhile"""
+        with self._lock:
+            if waiter.granted:
+                return False
+            waiter.tenant.queues[waiter.latency_class].remove(waiter)
+            return True
+
+    def _granted(self, waiter):
+        waited = time.monotonic() - waiter.enqueued
+        tenant = waiter.tenant
+        with self._lock:
+            tenant.waits += 1
+            tenant.wait_total += waited
+            tenant.wait_max = max(tenant.wait_max, waited)
+        LLM_QUEUE_WAIT.observe(waited, plan=tenant.plan, **{'class': waiter.latency_class})
+        return waiter
+
+    def _reject(self, tenant, reason, cost):
+        if reason == 'queue_timeout' and tenant.tokens is not None:
+            tenant.tokens.refund(cost)
+        with self._lock:
+            self._leave(tenant)
+        LLM_REJECTED.inc(plan=tenant.plan, reason=reason)
+        return None
+
+    def acquire(self, tenant, latency_class, cost, timeout=None):
+        """Wait for a slot; returns a ticket for ``release``, or None when quota or queue time runs out"""
+        timeout = self.queue_timeouts[latency_class] if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        tenant = self._tenant(tenant)
+        if tenant.tokens is not None and not tenant.tokens.acquire(cost, timeout):
+            return self._reject(tenant, 'token_quota', cost)
+        granted = threading.Event()
+        waiter = _Waiter(tenant, latency_class, cost, granted.set)
+        self._enqueue(waiter)
+        if not granted.wait(max(0.0, deadline - time.monotonic())) and self._withdraw(waiter):
+            return self._reject(tenant, 'queue_timeout', cost)
+        return self._granted(waiter)
+
+    async def acquire_async(self, tenant, latency_class, cost, timeout=None):
+        """``acquire`` for coroutines; waiting holds no thread"""
+        timeout = self.queue_timeouts[latency_class] if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        tenant = self._tenant(tenant)
+        try:
+            if tenant.tokens is not None and not await tenant.tokens.acquire_async(cost, timeout):
+                return self._reject(tenant, 'token_quota', cost)
+        except asyncio.CancelledError:
+            with self._lock:
+                self._leave(tenant)
+            raise
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(True))
+
+        waiter = _Waiter(tenant, latency_class, cost, wake)
+        self._enqueue(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            if self._withdraw(waiter):
+                return self._reject(tenant, 'queue_timeout', cost)
+        except asyncio.CancelledError:
+            # The caller went away; give back a slot granted in the meantime
+            if self._withdraw(waiter):
+                with self._lock:
+                    self._leave(tenant)
+            else:
+                self.release(waiter)
+            raise
+        return self._granted(waiter)
+
+    def release(self, ticket):
+        with self._lock:
+            ticket.tenant.in_flight[ticket.latency_class] -= 1
+            self._leave(ticket.tenant)
+            self.free += 1
+            if ticket.latency_class == BULK:
+                self.bulk_in_flight -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, latency_class, cost):
+        """Hold a slot for the current tenant while the block runs; yields None if none was granted"""
+        ticket = self.acquire(current_tenant.get(), latency_class, cost)
+        try:
+            yield ticket
+        finally:
+            if ticket is not None:
+                self.release(ticket)
+
+    @asynccontextmanager
+    async def slot_async(self, latency_class, cost):
+        ticket = await self.acquire_async(current_tenant.get(), latency_class, cost)
+        try:
+            yield ticket
+        finally:
+            if ticket is not None:
+                self.release(ticket)
+
+    def stats(self):
+        """Slots in use and per-tenant queue depth, calls in flight and queue wait times"""
+        with self._lock:
+            tenants = {
+                tenant.name: {
+                    'plan': tenant.plan,
+                    'weight': tenant.weight,
+                    'queued': {latency_class: len(queue) for latency_class, queue in tenant.queues.items()},
+                    'in_flight': dict(tenant.in_flight),
+                    'wait': {
+                        'count': tenant.waits,
+                        'avg_ms': round(1000 * tenant.wait_total / tenant.waits, 1) if tenant.waits else 0.0,
+                        'max_ms': round(1000 * tenant.wait_max, 1)
+                    }
+                }
+                for tenant in self.tenants.values()
+            }
+            return {'slots': self.slots, 'free': self.free, 'bulk_in_flight': self.bulk_in_flight, 'tenants': tenants}
+
+    def queued(self):
+        with self._lock:
+            counts = {}
+            for tenant in self.tenants.values():
+                for latency_class, queue in tenant.queues.items():
+                    key = (tenant.plan, latency_class)
+                    counts[key] = counts.get(key, 0) + len(queue)
+        return [({'plan': plan, 'class': latency_class}, count) for (plan, latency_class), count in counts.items()]
@@ -1,210 +1,765 @@
+import time
+IMPORT_STARTED = time.perf_counter()
 import os 
-import fitz  # PyMuPDF
-import requests
+import sys
 import json
 import re
-import openpyxl
-from openpyxl.styles import Font
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Blueprint, Flask, Response, g, render_template, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import logging
-from datetime import datetime, timedelta
+import queue
+from datetime import datetime, timedelta, timezone
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from extraction import TEXT_VERSION, detect_format, extract_texts, extraction_stats
+from groq_client import (
+    CLOSED, GROQ_TIMEOUT, HALF_OPEN, OPEN, CircuitBreaker, GroqClient, GroqError, LatencyTracker, RateLimiter,
+    estimate_tokens
+)
+from prompt_packing import PROMPT_INPUT_TOKENS, PROMPT_OUTPUT_TOKENS, OUTPUT_TOKENS_PER_RESUME, fit_text, pack_resumes
+from batch_jobs import BatchJobEngine, BatchJobStore
+from bulk_ingest import BulkIngest, BulkUploadError, BulkUploadStore
+from resume_cache import ResumeCache, file_digest, prompt_version
+from resume_store import ResumeStore
+from dashboard_stats import DashboardAggregates
+from candidate_search import CandidateIndex, clamp_page, parse_experience, search_candidates
+from candidate_export import EXPORT_FORMATS, export_candidates, parquet_available
+from fast_extract import NO_LLM, EXTRACTOR_VERSION, extract_local_fields, extract_offline, merge_fields
+from model_routing import MODEL_TIERS, ModelRouter, route_version
+from llm_scheduler import BULK, INTERACTIVE, FairScheduler, current_tenant, request_tenant, run_as
+from metrics import HTTP_REQUEST_SECONDS, STAGE_SECONDS, GaugeCallback, render as render_metrics
+from lazy_loading import LazyModule, LazyObject
+from http_cache import CachedBody, StaticAssets, json_etag
 
-app = Flask(__name__, static_folder='ui ux/dist', static_url_path='')
-CORS(app)  # Enable CORS for all routes
+# Both pull in NumPy; only uploads, batch files and comparisons need them
+near_duplicates = LazyModule('near_duplicates')
+candidate_compare = LazyModule('candidate_compare')
+candidate_analytics = LazyModule('candidate_analytics')
 
-# Configuration
-app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'fallback-secret-key-for-development')
-
-# Set up logging
-if os.environ.get('FLASK_ENV') == 'production':
-    logging.basicConfig(level=logging.WARNING)
-else:
-    logging.basicConfig(level=logging.INFO)
-
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Routes are registered on this blueprint and mounted by create_app()
+api = Blueprint('api', __name__)
 
 # Environment variable configuration
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY environment variable is required. Please set it in your deployment settings.")
-
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
-MODEL_NAME = "llama-3.3-70b-versatile"
+GROQ_API_URL = os.environ.get("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+# Client default; each call's model comes from its task's route (model_routing.ROUTES)
+MODEL_NAME = MODEL_TIERS['large']
 EXCEL_FILE = "data/resumes_data.xlsx"
+STATIC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ui ux', 'dist')
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 500))
+GROQ_CONCURRENCY = int(os.environ.get('GROQ_CONCURRENCY', 8))
+# Build stores and clients in create_app() instead of on first use. Off on
+# Vercel, where a cold start should only pay for the route it serves.
+PRELOAD_SERVICES = os.environ.get('PRELOAD_SERVICES', '0' if os.environ.get('VERCEL') else '1').lower() in ('1', 'true', 'yes')
+# Reported by /api/health when loaded, to show what a cold start paid for
+HEAVY_MODULES = ['fitz', 'openpyxl', 'requests', 'numpy']
 
-# Ensure data directory exists
-os.makedirs("data", exist_ok=True)
+# Prompt templates (their hash is part of every cache key). Contact details and
+# known skills are extracted locally, so the model is only asked for judgement calls.
+UPLOAD_PROMPT = (
+    "Analyze the following resumes one by one. For each resume, return a single JSON object with keys: "
+    "expected_domain, experience_in_years (a number). Add a name key only where a resume is marked [name needed]. "
+    "Answer with one block per resume, in order: a line with its number and filename in bold, then the JSON "
+    "in a json code block, exactly like this:\n"
+    "**Resume 1 - cv.pdf**\n```json\n{\"expected_domain\": \"Data Science\", \"experience_in_years\": 4}\n```\n\n"
+)
+BATCH_PROMPT = "Analyze this resume and extract: expected domain, years of experience{name_hint}. Return as JSON with keys expected_domain, experience_in_years{name_key}: {text}..."
+NAME_NEEDED = "[name needed]\n"
+ANALYSIS_PROMPT = """
+        Perform a comprehensive analysis of this resume. Provide detailed insights on:
+        1. Candidate strengths and weaknesses
+        2. Skill proficiency levels
+        3. Career progression analysis
+        4. Recommended roles and salary range
+        5. Areas for improvement
+        6. Cultural fit indicators
+        
+        Resume text: {text}...
+        
+        Return a detailed analysis in a structured format.
+        """
 
-HEADERS = {
-    "Authorization": f"Bearer {GROQ_API_KEY}",
-    "Content-Type": "application/json"
-}
+# Offline results are cached separately from model results, model results per route, and
+# everything per text extractor and character budget
+UPLOAD_PROMPT_VERSION = prompt_version(UPLOAD_PROMPT, 'no-llm' if NO_LLM else route_version('upload_extract', 'upload_stream'),
+                                       EXTRACTOR_VERSION, TEXT_VERSION)
+UPLOAD_PROMPT_TOKENS = estimate_tokens(UPLOAD_PROMPT)
+BATCH_PROMPT_VERSION = prompt_version(BATCH_PROMPT, 'no-llm' if NO_LLM else route_version('batch_extract'), EXTRACTOR_VERSION,
+                                      TEXT_VERSION)
+BATCH_PROMPT_TOKENS = estimate_tokens(BATCH_PROMPT)
+ANALYSIS_PROMPT_VERSION = prompt_version(ANALYSIS_PROMPT, route_version('analysis'), TEXT_VERSION)
+# Resume text sent for deep analysis (the old fixed 3000-character cut)
+ANALYSIS_TEXT_TOKENS = 750
+
+# -------- Services --------
+# Each is built on first use so health and pricing requests never open the
+# stores or import the libraries behind them.
+dashboard_aggregates = DashboardAggregates()
+candidate_index = CandidateIndex()
+
+def _open_resume_store():
+    # System of record for parsed resumes; the Excel file is only an export
+    store = ResumeStore()
+    store.register_index(dashboard_aggregates)
+    store.register_index(candidate_index)
+    store.import_excel(EXCEL_FILE)
+    return store
+
+def _open_candidate_columns():
+    # Columnar copy of the store for /api/analytics; read in full once, then appended to
+    columns = candidate_analytics.CandidateColumns()
+    columns.sync(resume_store.connection())
+    return columns
+
+def _open_near_duplicate_index():
+    # MinHash/LSH signatures of stored candidates, written after each save
+    index = near_duplicates.NearDuplicateIndex()
+    with resume_store.connection() as conn:
+        index.create(conn)
+    return index
 
-# -------- PDF Text Extraction --------
-def extract_text_from_pdf(filepath):
-    text = ""
-    with fitz.open(filepath) as doc:
-        for page in doc:
-            text += page.get_text()
-    return text
+# One Groq quota, circuit breaker and latency history for the sync client and the async one in asgi.py
+groq_limiter = RateLimiter()
+groq_breaker = CircuitBreaker()
+groq_latency = LatencyTracker()
+# Shares that quota between tenants; also used by asgi.py
+llm_scheduler = FairScheduler()
+
+def require_groq_key():
+    if not GROQ_API_KEY:
+        raise ValueError("GROQ_API_KEY environment variable is required. Please set it in your deployment settings.")
+    return GROQ_API_KEY
+
+def _create_groq_client():
+    # Shared, pooled and rate-limited Groq client
+    return GroqClient(require_groq_key(), GROQ_API_URL, MODEL_NAME, limiter=groq_limiter, breaker=groq_breaker,
+                      latency=groq_latency)
+
+resume_cache = LazyObject('resume_cache', ResumeCache)
+resume_store = LazyObject('resume_store', _open_resume_store)
+near_duplicate_index = LazyObject('near_duplicate_index', _open_near_duplicate_index)
+candidate_columns = LazyObject('candidate_columns', _open_candidate_columns)
+groq_client = LazyObject('groq_client', _create_groq_client)
+# Picks the model tier of every call; builds nothing until the first one
+model_router = ModelRouter(groq_client)
+# Built frontend, served from memory with precompressed variants
+static_assets = LazyObject('static_assets', lambda: StaticAssets(STATIC_FOLDER))
+# Threads used to keep several Groq calls of one request in flight
+llm_executor = LazyObject('llm_executor', lambda: ThreadPoolExecutor(max_workers=GROQ_CONCURRENCY, thread_name_prefix='groq'))
+
+# -------- Metrics --------
+@api.before_app_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+@api.before_app_request
+def _set_tenant():
+    # Named by the gateway in front of the app; Groq calls of the request count against this tenant
+    current_tenant.set(request_tenant(request.headers.get('X-Tenant-ID'), request.remote_addr))
+
+@api.after_app_request
+def _record_request(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=request.url_rule.rule if request.url_rule else 'unmatched',
+            method=request.method,
+            status=str(response.status_code)
+        )
+    return response
+
+def _cache_counters(kind):
+    stats = resume_cache.stats()
+    return [({'kind': name}, value) for name, value in stats[kind].items()]
+
+def _when_loaded(service, fn):
+    """Gauge reader that reports nothing until ``service`` exists, so a scrape never builds it"""
+    return lambda: fn() if service.loaded else []
+
+GaugeCallback('techcruit_resume_cache_entries', 'Entries in the resume cache',
+              _when_loaded(resume_cache, lambda: resume_cache.stats()['entries']))
+GaugeCallback('techcruit_resume_cache_bytes', 'Bytes stored in the resume cache',
+              _when_loaded(resume_cache, lambda: resume_cache.stats()['bytes']))
+GaugeCallback('techcruit_resume_cache_hits_total', 'Resume cache hits by entry kind',
+              _when_loaded(resume_cache, lambda: _cache_counters('hits')), kind='counter')
+GaugeCallback('techcruit_resume_cache_misses_total', 'Resume cache misses by entry kind',
+              _when_loaded(resume_cache, lambda: _cache_counters('misses')), kind='counter')
+GaugeCallback('techcruit_store_candidates', 'Candidates in the resume store',
+              _when_loaded(resume_store, lambda: resume_store.count()))
+GaugeCallback('techcruit_analytics_candidates', 'Candidates loaded into the columnar analytics store',
+              _when_loaded(candidate_columns, lambda: candidate_columns.ids.size))
+GaugeCallback('techcruit_store_pending_writes', 'Rows waiting for the next group commit',
+              _when_loaded(resume_store, lambda: resume_store.pending_writes()))
+# The executor has no public queue size; its work queue is a plain queue.Queue
+GaugeCallback('techcruit_groq_executor_queue', 'Groq calls waiting for an executor thread',
+              _when_loaded(llm_executor, lambda: llm_executor._work_queue.qsize()))
+GaugeCallback('techcruit_groq_quota_available', 'Groq quota left in the token buckets', lambda: [
+    ({'bucket': 'requests'}, groq_limiter.requests.available()),
+    ({'bucket': 'tokens'}, groq_limiter.tokens.available())
+])
+GaugeCallback('techcruit_groq_circuit_state', 'Groq circuit breaker state (1 for the current one)', lambda: [
+    ({'state': state}, int(groq_breaker.state == state)) for state in (CLOSED, HALF_OPEN, OPEN)
+])
+GaugeCallback('techcruit_groq_timeout_seconds', 'Current Groq call timeout per model and completion budget', lambda: [
+    ({'model': entry['model'], 'max_tokens': entry['max_tokens']}, entry['timeout'])
+    for entry in groq_latency.snapshot(GROQ_TIMEOUT)
+])
+GaugeCallback('techcruit_llm_queued', 'Groq calls waiting for a scheduler slot', llm_scheduler.queued)
+GaugeCallback('techcruit_llm_slots_free', 'Scheduler slots not held by a Groq call', lambda: llm_scheduler.free)
 
 # -------- Groq API Query --------
-def query_groq(prompt):
-    payload = {
-        "model": MODEL_NAME,
-        "messages": [
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 4000
-    }
-    try:
-        response = requests.post(GROQ_API_URL, headers=HEADERS, json=payload, timeout=30)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        return response.json()
-    except requests.exceptions.Timeout:
-        return {"error": "Request timeout - please try again"}
-    except requests.exceptions.HTTPError as e:
-        if response.status_code == 401:
-            return {"error": "Invalid API key - please check your GROQ_API_KEY"}
-        elif response.status_code == 429:
-            return {"error": "Rate limit exceeded - please try again later"}
-        else:
-            return {"error": f"HTTP error {response.status_code}: {str(e)}"}
-    except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"}
+# Batch jobs have no one waiting on each file, so any interactive call goes first
+TASK_LATENCY_CLASSES = {'batch_extract': BULK}
+LLM_CAPACITY_ERROR = 'LLM capacity for this account is exhausted - please try again later'
+
+def query_groq(task, prompt, validate=None):
+    """Groq reply for a task class, from the smallest tier of its route whose output passes ``validate``.
+
+    The call first waits for a slot of the current tenant's share; when
+    none is granted the usual error dict is returned.
+    """
+    with llm_scheduler.slot(TASK_LATENCY_CLASSES.get(task, INTERACTIVE), estimate_tokens(prompt)) as ticket:
+        if ticket is None:
+            return {'error': LLM_CAPACITY_ERROR}
+        with STAGE_SECONDS.time(stage='groq_call'):
+            return model_router.chat(task, prompt, validate)
+
+def local_fallback(filename, text):
+    """Result extracted locally while the Groq circuit is not closed.
+
+    Never cached nor indexed for duplicate detection, so the file gets a
+    full analysis when uploaded again after Groq recovers.
+    """
+    return dict(extract_offline(text), filename=filename, extraction='local')
+
+def cacheable(resume):
+    return resume.get('extraction') != 'local'
 
 # -------- Extract JSON from Groq Response --------
+# The header UPLOAD_PROMPT asks for; bold, the colon and the fence's language tag are often dropped
+RESUME_BLOCK_PATTERN = re.compile(
+    r"(?:\*\*)?Resume\s*\d+\s*[-:]\s*([^\n]*?):?(?:\*\*)?:?[ \t]*\n\s*```(?:json)?[ \t]*\n(.*?)\n?```", re.DOTALL
+)
+
+def _parse_resume_block(filename, json_block):
+    try:
+        resume_data = json.loads(json_block)
+        resume_data["filename"] = filename.strip()
+        return resume_data
+    except json.JSONDecodeError as e:
+        print(f"Error parsing {filename}: {e}")
+        return None
+
 def extract_resumes_from_groq_content(content):
-    pattern = r"\*\*Resume\s\d+\s-\s(.*?)\*\*\n```json\n(.*?)\n```"
-    matches = re.findall(pattern, content, re.DOTALL)
+    started = time.perf_counter()
     results = []
-    for filename, json_block in matches:
-        try:
-            resume_data = json.loads(json_block)
-            resume_data["filename"] = filename.strip()
+    for filename, json_block in RESUME_BLOCK_PATTERN.findall(content):
+        resume_data = _parse_resume_block(filename, json_block)
+        if resume_data is not None:
             results.append(resume_data)
-        except json.JSONDecodeError as e:
-            print(f"Error parsing {filename}: {e}")
+    STAGE_SECONDS.observe(time.perf_counter() - started, stage='parse_response')
     return results
 
-# -------- Save Resume Data to Excel --------
-import os
-import openpyxl
-from openpyxl.styles import Font
+def _has_judgement_fields(resume, name_needed):
+    return (isinstance(resume, dict) and bool(str(resume.get("expected_domain") or "").strip())
+            and parse_experience(resume.get("experience_in_years")) is not None
+            and (not name_needed or bool(resume.get("name"))))
 
-def save_single_resume_to_excel(resume, filename=EXCEL_FILE):
-    if os.path.exists(filename):
-        wb = openpyxl.load_workbook(filename)
-        ws = wb.active
-    else:
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Resume Data"
-        headers = [
-            "Name", "Email", "Phone Number", "Experience (Years)",
-            "Skills", "Used Software", "Expected Domain"
-        ]
-        ws.append(headers)
-        for cell in ws[1]:
-            cell.font = Font(bold=True)
-
-    # Convert lists to comma-separated strings
-    skills = ", ".join(resume.get("skills", []))
-    software = ", ".join(resume.get("used_software", []))
-
-    # Append the row
-    ws.append([
-        resume.get("name", ""),
-        resume.get("email", ""),
-        resume.get("phone_number", ""),
-        resume.get("experience_in_years", ""),
-        skills,
-        software,
-        resume.get("expected_domain", "")
-    ])
-
-    wb.save(filename)
-
-# -------- DOCX Text Extraction --------
+def valid_upload_reply(content, chunk, local_fields):
+    """Whether a chunk's reply has a complete block for every resume in it"""
+    blocks = RESUME_BLOCK_PATTERN.findall(content)
+    if len(blocks) != len(chunk):
+        return False
+    filenames = {filename for filename, _ in chunk}
+    for filename, json_block in blocks:
+        filename = filename.strip() if len(chunk) > 1 else chunk[0][0]
+        try:
+            resume = json.loads(json_block)
+        except json.JSONDecodeError:
+            return False
+        if filename not in filenames or not _has_judgement_fields(resume, not local_fields[filename]["name"]):
+            return False
+    return True
+
+def valid_batch_reply(content, name_needed):
+    """Whether a batch file's reply is the JSON object the prompt asks for"""
+    try:
+        return _has_judgement_fields(json.loads(content), name_needed)
+    except json.JSONDecodeError:
+        return False
+
+class StreamingResumeParser:
+    """Incrementally parses resume JSON blocks out of a streamed completion"""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, text):
+        """Add streamed text and return the resumes whose blocks are now complete"""
+        started = time.perf_counter()
+        self.buffer += text
+        results = []
+        while True:
+            match = RESUME_BLOCK_PATTERN.search(self.buffer)
+            if not match:
+                break
+            self.buffer = self.buffer[match.end():]
+            resume_data = _parse_resume_block(*match.groups())
+            if resume_data is not None:
+                results.append(resume_data)
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage='parse_response')
+        return results
+
+# -------- Cached Text Extraction --------
+def text_cache_key(digest):
+    # Text kept by another extractor or character budget is never reused
+    return f"{digest}:{TEXT_VERSION}"
+
+def extract_texts_cached(blobs, digests):
+    """Like extract_texts, but reuses text already extracted for identical files"""
+    texts = [resume_cache.get('text', text_cache_key(digest)) for digest in digests]
+    missing = [i for i, text in enumerate(texts) if text is None]
+    if missing:
+        extracted = extract_texts([blobs[i] for i in missing])
+        for i, text in zip(missing, extracted):
+            if not isinstance(text, Exception):
+                resume_cache.put('text', text_cache_key(digests[i]), text)
+            texts[i] = text
+    return texts
+
+# -------- Chunked Upload Analysis --------
+def _upload_prompt(chunk, local_fields):
+    prompt = UPLOAD_PROMPT
+    for i, (filename, text) in enumerate(chunk, start=1):
+        hint = "" if local_fields[filename]["name"] else NAME_NEEDED
+        prompt += f"Resume {i} - {filename}:\n{hint}{text}\n\n"
+    return prompt
+
+def _merge_local(resume, local_fields):
+    """Fill a model result with the locally extracted fields of its file"""
+    local = local_fields.get(resume["filename"])
+    return merge_fields(local, resume) if local is not None else resume
+
+def _query_upload_chunk(chunk, local_fields):
+    groq_response = query_groq('upload_extract', _upload_prompt(chunk, local_fields),
+                               lambda content: valid_upload_reply(content, chunk, local_fields))
+    if "choices" not in groq_response:
+        if groq_breaker.degraded():
+            return [local_fallback(filename, text) for filename, text in chunk], None
+        return None, str(groq_response)
+    return extract_resumes_from_groq_content(groq_response["choices"][0]["message"]["content"]), None
+
+def analyze_resume_texts(resume_texts):
+    """Analyze {filename: text} with token-budgeted chunks sent to Groq concurrently.
+
+    Returns (parsed results by filename, results whose filename matched no
+    upload, per-file errors). Resumes missing from a chunk's reply (e.g. a
+    truncated completion) are retried once on their own. In NO_LLM mode
+    every field is extracted locally and Groq is never called.
+    """
+    if NO_LLM:
+        return analyze_offline(resume_texts)
+
+    local_fields = {filename: extract_local_fields(text) for filename, text in resume_texts.items()}
+    analysis = UploadAnalysis(resume_texts, local_fields)
+    tenant = current_tenant.get()
+    for chunks in analysis.passes():
+        analysis.collect(chunks, llm_executor.map(
+            lambda chunk: run_as(tenant, _query_upload_chunk, chunk, local_fields), chunks))
+    return analysis.outcome()
+
+def analyze_offline(resume_texts):
+    """analyze_resume_texts for NO_LLM mode: every field is extracted locally"""
+    return {filename: dict(extract_offline(text), filename=filename)
+            for filename, text in resume_texts.items()}, [], []
+
+class UploadAnalysis:
+    """Chunking and reply bookkeeping of analyze_resume_texts, shared with the async path"""
+
+    def __init__(self, resume_texts, local_fields):
+        self.resume_texts = resume_texts
+        self.local_fields = local_fields
+        self.parsed = {}
+        self.unmatched = []
+        self.errors = {}
+        self.pending = list(resume_texts.items())
+
+    def passes(self):
+        """Yield the chunks of each pass; the retry pass sends one resume per call"""
+        for per_resume_output in (OUTPUT_TOKENS_PER_RESUME, PROMPT_OUTPUT_TOKENS):
+            yield pack_resumes(self.pending, header_tokens=UPLOAD_PROMPT_TOKENS, per_resume_output=per_resume_output)
+            self.pending = [(filename, text) for filename, text in self.pending if filename not in self.parsed]
+            if not self.pending:
+                break
+
+    def collect(self, chunks, replies):
+        for chunk, (results, error) in zip(chunks, replies):
+            if error:
+                for filename, _ in chunk:
+                    self.errors[filename] = error
+                continue
+            if len(chunk) == 1 and len(results) == 1:
+                # A single-resume reply can only belong to that file
+                results[0]["filename"] = chunk[0][0]
+            for resume in results:
+                if resume["filename"] in self.resume_texts:
+                    self.parsed[resume["filename"]] = _merge_local(resume, self.local_fields)
+                else:
+                    self.unmatched.append(resume)
+
+    def outcome(self):
+        failed = [{'filename': filename, 'error': self.errors.get(filename, 'Resume missing from AI response')}
+                  for filename, _ in self.pending]
+        return self.parsed, self.unmatched, failed
+
+# -------- Near-Duplicate Detection --------
+def _duplicate_result(filename, candidate_id, similarity):
+    """The stored candidate returned in place of a duplicate upload"""
+    resume = resume_store.get_many([candidate_id]).get(candidate_id)
+    # Rows extracted locally while Groq was down must not stand in for a full analysis
+    if resume is None or not cacheable(resume):
+        return None
+    return dict(resume, filename=filename, duplicate_of=candidate_id, similarity=round(similarity, 3))
+
+def find_exact_duplicate(filename, digest):
+    """Stored candidate for a byte-identical file, or None"""
+    if near_duplicates.NEAR_DUPLICATE_ACTION == 'off':
+        return None
+    candidate_id = near_duplicate_index.find_exact(resume_store.connection(), digest)
+    return _duplicate_result(filename, candidate_id, 1.0) if candidate_id is not None else None
+
+def find_near_duplicate(filename, signature):
+    """Stored candidate whose text is a near-duplicate of ``signature``, or None"""
+    if near_duplicates.NEAR_DUPLICATE_ACTION == 'off' or signature is None:
+        return None
+    match = near_duplicate_index.find(resume_store.connection(), signature)
+    return _duplicate_result(filename, *match) if match is not None else None
+
+def index_saved_upload(candidate_id, resume, digests, signatures):
+    """Make a stored upload findable as a duplicate; local-only results are left out"""
+    filename = resume.get('filename')
+    if filename in digests and cacheable(resume):
+        near_duplicate_index.add(resume_store.connection(), candidate_id, digests[filename], signatures.get(filename))
 
 # -------- Routes --------
-@app.route('/api/upload', methods=['POST'])
-def upload_resumes():
-    if 'files' not in request.files:
-        return jsonify({'error': 'No files provided'}), 400
-    
-    files = request.files.getlist('files')
-    if len(files) > 10:  # Limit number of files
-        return jsonify({'error': 'Maximum 10 files allowed per upload'}), 400
-    
+def prepare_upload(files):
+    """Validate uploaded files, resolve duplicates and cache hits, and extract text for the rest.
+
+    Returns (upload order, already known results by filename, texts by
+    filename, digests by filename, MinHash signatures by filename, error
+    response or None). Duplicates of stored candidates come back as the
+    stored candidate with ``duplicate_of`` set and never reach Groq.
+    """
     resume_texts = {}
-    allowed_extensions = {'.pdf', '.docx'}
+    uploads = []
     
     for file in files:
         if not file.filename:
             continue
-            
-        # Security: Check file extension
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        if file_ext not in allowed_extensions:
-            return jsonify({'error': f'Unsupported file type: {file_ext}. Only PDF and DOCX files are allowed.'}), 400
         
-        # Security: Sanitize filename
-        import uuid
-        safe_filename = f"{uuid.uuid4()}{file_ext}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], safe_filename)
+        # Security: Check the file's magic bytes; the extension is not trusted
+        with STAGE_SECONDS.time(stage='read_upload'):
+            data = file.read()
+        if detect_format(data) is None:
+            return None, None, None, None, None, (jsonify({'error': f'Unsupported file type: {file.filename}. Only PDF and DOCX files are allowed.'}), 400)
         
-        try:
-            file.save(filepath)
-            text = extract_text_from_pdf(filepath)
-            if len(text.strip()) < 50:  # Basic validation
-                os.remove(filepath)  # Clean up
-                return jsonify({'error': f'File {file.filename} appears to be empty or corrupted'}), 400
-            resume_texts[file.filename] = text
-            os.remove(filepath)  # Clean up after processing
-        except Exception as e:
-            if os.path.exists(filepath):
-                os.remove(filepath)  # Clean up on error
-            return jsonify({'error': f'Error processing file {file.filename}: {str(e)}'}), 500
+        uploads.append((file.filename, data))
 
-    # Build one big prompt for all resumes
-    prompt = "Analyze the following resumes one by one. For each resume, return a single JSON object with keys: name, email, skills, experience in years, phone number, expected domain, used software.\n\n"
-    for i, (filename, text) in enumerate(resume_texts.items(), start=1):
-        prompt += f"Resume {i} - {filename}:\n{text}\n\n"
+    # Files seen before skip both extraction and Groq
+    results_by_file = {}
+    digests = {}
+    signatures = {}
+    pending = []
+    for filename, data in uploads:
+        digest = file_digest(data)
+        duplicate = find_exact_duplicate(filename, digest)
+        if duplicate is not None:
+            results_by_file[filename] = duplicate
+            continue
+        digests[filename] = digest
+        cached = resume_cache.get('upload', f"{digest}:{UPLOAD_PROMPT_VERSION}")
+        if cached is not None:
+            results_by_file[filename] = dict(cached, filename=filename)
+            text = resume_cache.get('text', text_cache_key(digest))
+            signatures[filename] = near_duplicates.minhash(text) if text else None
+        else:
+            pending.append((filename, data, digest))
 
-    groq_response = query_groq(prompt)
+    # Parse the remaining files in parallel straight from memory
+    texts = extract_texts_cached([data for _, data, _ in pending], [digest for _, _, digest in pending])
+    for (filename, _, digest), text in zip(pending, texts):
+        if isinstance(text, Exception):
+            return None, None, None, None, None, (jsonify({'error': f'Error processing file {filename}: {str(text)}'}), 500)
+        if len(text.strip()) < 50:  # Basic validation
+            return None, None, None, None, None, (jsonify({'error': f'File {filename} appears to be empty or corrupted'}), 400)
+        signatures[filename] = near_duplicates.minhash(text)
+        duplicate = find_near_duplicate(filename, signatures[filename])
+        if duplicate is not None:
+            results_by_file[filename] = duplicate
+            continue
+        resume_texts[filename] = text
 
-    if "choices" in groq_response:
-        content = groq_response["choices"][0]["message"]["content"]
-        resume_data = extract_resumes_from_groq_content(content)
-        
-        # Save to Excel
-        for resume in resume_data:
-            save_single_resume_to_excel(resume)
+    order = [filename for filename, _ in uploads]
+    return order, results_by_file, resume_texts, digests, signatures, None
 
-        return jsonify({'resumes': resume_data})
-    else:
-        return jsonify({'error': str(groq_response)}), 500
+def uploaded_files():
+    """Files of an upload request, or an error response"""
+    if 'files' not in request.files:
+        return None, (jsonify({'error': 'No files provided'}), 400)
+    
+    files = request.files.getlist('files')
+    if len(files) > 10:  # Limit number of files
+        return None, (jsonify({'error': 'Maximum 10 files allowed per upload'}), 400)
+    return files, None
+
+@api.route('/api/upload', methods=['POST'])
+def upload_resumes():
+    files, error = uploaded_files()
+    if error:
+        return error
+    
+    order, results_by_file, resume_texts, digests, signatures, error = prepare_upload(files)
+    if error:
+        return error
+
+    analysis = analyze_resume_texts(resume_texts) if resume_texts else ({}, [], [])
+    return finish_upload(order, results_by_file, digests, signatures, *analysis)
+
+def finish_upload(order, results_by_file, digests, signatures, parsed, unmatched, failed):
+    """Cache and store the analysed resumes and build the /api/upload response"""
+    if failed and not parsed and not results_by_file:
+        return jsonify({'error': failed[0]['error']}), 500
+    for filename, resume in parsed.items():
+        if cacheable(resume):
+            resume_cache.put('upload', f"{digests[filename]}:{UPLOAD_PROMPT_VERSION}",
+                             {k: v for k, v in resume.items() if k != "filename"})
+        results_by_file[filename] = resume
+
+    # Keep the upload order
+    resume_data = [results_by_file[filename] for filename in order if filename in results_by_file]
+    resume_data.extend(unmatched)
+
+    # Persist new candidates in one group commit; duplicates are already stored
+    new_resumes = [resume for resume in resume_data if 'duplicate_of' not in resume]
+    with STAGE_SECONDS.time(stage='store_save'):
+        candidate_ids = resume_store.save_many(new_resumes)
+    for candidate_id, resume in zip(candidate_ids, new_resumes):
+        index_saved_upload(candidate_id, resume, digests, signatures)
+
+    response = {'resumes': resume_data}
+    if failed:
+        response['errors'] = failed
+    return jsonify(response)
+
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _stream_upload_chunk(chunk, local_fields, events):
+    """Stream one chunk from Groq, pushing each resume onto ``events`` as soon as its block is complete"""
+    prompt = _upload_prompt(chunk, local_fields)
+    parser = StreamingResumeParser()
+    sent = set()
+    try:
+        with llm_scheduler.slot(INTERACTIVE, estimate_tokens(prompt)) as ticket:
+            if ticket is None:
+                raise GroqError(LLM_CAPACITY_ERROR)
+            for delta in model_router.chat_stream('upload_stream', prompt):
+                for resume in parser.feed(delta):
+                    sent.add(resume['filename'])
+                    events.put(('resume', _merge_local(resume, local_fields)))
+    except GroqError as e:
+        if groq_breaker.degraded():
+            for filename, text in chunk:
+                if filename not in sent:
+                    events.put(('resume', local_fallback(filename, text)))
+        else:
+            events.put(('chunk_error', {'files': [filename for filename, _ in chunk], 'error': str(e)}))
+    finally:
+        events.put(('chunk_done', None))
+
+class UploadStream:
+    """Server-sent events of one streamed upload, shared by the sync and async routes.
+
+    Every resume is stored before its event is produced, so a client never
+    hears about a candidate that is not saved yet.
+    """
+
+    def __init__(self, order, results_by_file, resume_texts, digests, signatures):
+        self.order = order
+        self.results_by_file = results_by_file
+        self.resume_texts = resume_texts
+        self.digests = digests
+        self.signatures = signatures
+        self.local_fields = {}
+        self.started = time.monotonic()
+        self.first_result_ms = None
+        self.count = 0
+        self.failed = []
+        self.seen = set()
+
+    def emit(self, resume):
+        # Persist before telling the client about it
+        if 'duplicate_of' not in resume:
+            with STAGE_SECONDS.time(stage='store_save'):
+                candidate_id = resume_store.save(resume)
+            index_saved_upload(candidate_id, resume, self.digests, self.signatures)
+        if self.first_result_ms is None:
+            self.first_result_ms = round((time.monotonic() - self.started) * 1000, 1)
+        self.count += 1
+        return _sse('resume', resume)
+
+    def known(self):
+        """Events for duplicates and cache hits, in upload order"""
+        for filename in self.order:
+            if filename in self.results_by_file:
+                yield self.emit(self.results_by_file[filename])
+
+    def offline(self):
+        """Events for NO_LLM mode, where every field is extracted locally"""
+        for filename, text in self.resume_texts.items():
+            resume = extract_offline(text)
+            resume_cache.put('upload', f"{self.digests[filename]}:{UPLOAD_PROMPT_VERSION}", resume)
+            self.seen.add(filename)
+            yield self.emit(dict(resume, filename=filename))
+
+    def chunks(self):
+        """Prompt chunks of the files that still need Groq"""
+        self.local_fields = {filename: extract_local_fields(text) for filename, text in self.resume_texts.items()}
+        return pack_resumes(list(self.resume_texts.items()), header_tokens=UPLOAD_PROMPT_TOKENS)
+
+    def handle(self, kind, payload):
+        """Event for a 'resume' or 'chunk_error' message of a streaming chunk, or None"""
+        if kind == 'chunk_error':
+            self.failed.extend({'filename': filename, 'error': payload['error']} for filename in payload['files'])
+            return None
+        filename = payload['filename']
+        if filename in self.digests:
+            self.seen.add(filename)
+        if filename in self.digests and cacheable(payload):
+            resume_cache.put('upload', f"{self.digests[filename]}:{UPLOAD_PROMPT_VERSION}",
+                             {k: v for k, v in payload.items() if k != "filename"})
+        return self.emit(payload)
+
+    def finish(self):
+        """Error events for files that got no result, then the closing 'done' event"""
+        failed_files = {item['filename'] for item in self.failed}
+        self.failed.extend({'filename': filename, 'error': 'Resume missing from AI response'}
+                           for filename in self.resume_texts
+                           if filename not in self.seen and filename not in failed_files)
+        for item in self.failed:
+            yield _sse('error', item)
+        yield _sse('done', {
+            'count': self.count,
+            'errors': self.failed,
+            'timings': {
+                'first_result_ms': self.first_result_ms,
+                'total_ms': round((time.monotonic() - self.started) * 1000, 1)
+            }
+        })
 
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/upload/stream', methods=['POST'])
+def upload_resumes_stream():
+    """Like /api/upload, but pushes each parsed resume as a server-sent event"""
+    files, error = uploaded_files()
+    if error:
+        return error
+    
+    order, results_by_file, resume_texts, digests, signatures, error = prepare_upload(files)
+    if error:
+        return error
+    stream = UploadStream(order, results_by_file, resume_texts, digests, signatures)
+    tenant = current_tenant.get()
+
+    def generate():
+        yield from stream.known()
+        if resume_texts and NO_LLM:
+            yield from stream.offline()
+        elif resume_texts:
+            events = queue.Queue()
+            chunks = stream.chunks()
+            for chunk in chunks:
+                llm_executor.submit(run_as, tenant, _stream_upload_chunk, chunk, stream.local_fields, events)
+
+            remaining = len(chunks)
+            while remaining:
+                kind, payload = events.get()
+                if kind == 'chunk_done':
+                    remaining -= 1
+                    continue
+                event = stream.handle(kind, payload)
+                if event is not None:
+                    yield event
+        yield from stream.finish()
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+def cached_response(body):
+    """Response for a CachedBody in the best encoding the client accepts; 304 when its ETag still matches"""
+    encoding, data, etag = body.negotiate(request.accept_encodings)
+    response = Response(data, mimetype=body.mimetype)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = body.cache_control
+    if body.compressible:
+        response.vary.add('Accept-Encoding')
+    if encoding:
+        response.content_encoding = encoding
+    return response.make_conditional(request, accept_ranges=encoding is None, complete_length=len(data))
+
+@api.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint for monitoring"""
-    return jsonify({
+    health = {
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
         'version': '1.0.0',
-        'service': 'Techcruit AI'
-    })
+        'service': 'Techcruit AI',
+        'startup': startup_report(),
+        'groq_circuit': groq_breaker.state
+    }
+    # The timestamp is left out of the ETag; a 304 still proves the service answered
+    etag = json_etag(health)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(dict(health, timestamp=datetime.now().isoformat()))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@api.route('/api/groq/stats', methods=['GET'])
+def groq_stats():
+    """Circuit breaker state and the latency percentiles and timeout of each model and completion budget"""
+    return jsonify({'circuit': groq_breaker.state, 'latency': groq_latency.snapshot(GROQ_TIMEOUT)})
+
+@api.route('/api/scheduler/stats', methods=['GET'])
+def scheduler_stats():
+    """Free slots and, per tenant, queued and in-flight Groq calls and their queue wait times"""
+    return jsonify(llm_scheduler.stats())
+
+@api.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss counters and size of the resume cache"""
+    return jsonify(resume_cache.stats())
+
+@api.route('/api/metrics', methods=['GET'])
+def metrics_api():
+    """Stage latencies, Groq tokens and errors, cache and queue depths in Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
 
-@app.route('/')
+@api.route('/api/extraction/stats', methods=['GET'])
+def extraction_stats_api():
+    """Files parsed, failures and parse times per detected format"""
+    return jsonify(extraction_stats.snapshot())
+
+@api.route('/')
 def serve_frontend():
     try:
-        return send_from_directory(app.static_folder, 'index.html')
+        body = static_assets.get('index.html')
+        if body is None:
+            raise FileNotFoundError('index.html')
+        return cached_response(body)
     except:
         # Fallback for when static files are not available (Vercel deployment)
         return """
@@ -235,6 +790,7 @@ def serve_frontend():
                     <h3>Available API Endpoints:</h3>
                     <div class="endpoint">GET /api/health - Health check</div>
                     <div class="endpoint">GET /api/dashboard/stats - Dashboard statistics</div>
+                    <div class="endpoint">GET /api/analytics/* - Skill, experience and trend analytics</div>
                     <div class="endpoint">POST /api/batch/process - Process resumes</div>
                     <div class="endpoint">GET /api/batch/history - Processing history</div>
                     <div class="endpoint">POST /api/ai/analyze - AI resume analysis</div>
@@ -252,110 +808,56 @@ def serve_frontend():
         </html>
         """
 
-@app.route('/<path:path>')
+@api.route('/<path:path>')
 def serve_static(path):
     try:
-        return send_from_directory(app.static_folder, path)
+        body = static_assets.get(path)
+        if body is not None:
+            return cached_response(body)
+        return send_from_directory(STATIC_FOLDER, path)
     except:
         # Fallback for API-only deployment
         return jsonify({'error': 'This is an API endpoint. Please use /api/* routes.'}), 404
 
-@app.route('/api/download-excel', methods=['GET'])
+@api.route('/api/download-excel', methods=['GET'])
 def download_excel():
-    excel_path = os.path.join(os.getcwd(), 'resumes_data.xlsx')
-    if os.path.exists(excel_path):
-        return send_from_directory(os.getcwd(), 'resumes_data.xlsx', as_attachment=True)
-    else:
-        return jsonify({'error': 'Excel file not found'}), 404
+    """All stored candidates as a streamed XLSX workbook"""
+    if resume_store.count() == 0:
+        return jsonify({'error': 'No candidates to export'}), 404
+    return export_response('xlsx', {}, 'resumes_data.xlsx')
 
 # -------- Dashboard API Routes --------
-@app.route('/api/dashboard/stats', methods=['GET'])
+@api.route('/api/dashboard/stats', methods=['GET'])
 def get_dashboard_stats():
     """Get dashboard statistics"""
     try:
-        # Initialize default stats
-        stats = {
-            'resumesProcessed': 0,
-            'topSkills': [],
-            'recentUploads': [],
-            'skillsDistribution': {},
-            'experienceLevels': {'Junior': 0, 'Mid': 0, 'Senior': 0}
-        }
+        # Served from aggregates maintained on every insert
+        version, aggregates = dashboard_aggregates.snapshot(resume_store.connection())
+        etag = f"dashboard-{version}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
         
-        # Quick check for Excel file existence
-        if os.path.exists(EXCEL_FILE):
-            try:
-                wb = openpyxl.load_workbook(EXCEL_FILE, read_only=True)
-                ws = wb.active
-                
-                rows = list(ws.iter_rows(min_row=2, values_only=True))
-                stats['resumesProcessed'] = len(rows)
-                
-                if len(rows) > 0:
-                    # Calculate skills distribution efficiently
-                    all_skills = []
-                    for row in rows:
-                        if row and len(row) > 4 and row[4]:  # Skills column
-                            skills = [skill.strip() for skill in str(row[4]).split(',') if skill.strip()]
-                            all_skills.extend(skills)
-                    
-                    # Count skill frequencies
-                    skill_counts = {}
-                    for skill in all_skills:
-                        if skill:  # Avoid empty skills
-                            skill_counts[skill] = skill_counts.get(skill, 0) + 1
-                    
-                    # Get top 5 skills
-                    if skill_counts:
-                        stats['topSkills'] = sorted(skill_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-                        stats['skillsDistribution'] = dict(sorted(skill_counts.items(), key=lambda x: x[1], reverse=True)[:10])
-                    
-                    # Calculate experience levels efficiently
-                    for row in rows:
-                        if row and len(row) > 3 and row[3]:  # Experience column
-                            try:
-                                exp_str = str(row[3]).strip()
-                                # Extract numeric value from experience string
-                                import re
-                                exp_match = re.search(r'(\d+(?:\.\d+)?)', exp_str)
-                                if exp_match:
-                                    exp = float(exp_match.group(1))
-                                    if exp <= 2:
-                                        stats['experienceLevels']['Junior'] += 1
-                                    elif exp <= 5:
-                                        stats['experienceLevels']['Mid'] += 1
-                                    else:
-                                        stats['experienceLevels']['Senior'] += 1
-                            except:
-                                pass
-                
-                wb.close()
-            except Exception as e:
-                print(f"Error reading Excel file: {e}")
-                # Continue with default stats
+        stats = dict(aggregates)
+        stats['recentUploads'] = []
         
-        # Get recent uploads from uploads folder (limit to 5 most recent)
-        uploads_folder = app.config['UPLOAD_FOLDER']
-        if os.path.exists(uploads_folder):
-            try:
-                files = [f for f in os.listdir(uploads_folder) if f.endswith('.pdf')]
-                files.sort(key=lambda x: os.path.getmtime(os.path.join(uploads_folder, x)), reverse=True)
-                
-                recent_files = []
-                for file in files[:5]:  # Last 5 files
-                    try:
-                        filepath = os.path.join(uploads_folder, file)
-                        import datetime
-                        mod_time = os.path.getmtime(filepath)
-                        date_str = datetime.datetime.fromtimestamp(mod_time).strftime('%Y-%m-%d')
-                        recent_files.append({'name': file, 'date': date_str})
-                    except:
-                        continue
-                stats['recentUploads'] = recent_files
-            except Exception as e:
-                print(f"Error reading uploads folder: {e}")
+        # Most recently stored candidates
+        try:
+            stats['recentUploads'] = [
+                {
+                    'name': item['filename'] or item['name'],
+                    'date': datetime.fromtimestamp(item['created_at']).strftime('%Y-%m-%d')
+                }
+                for item in resume_store.recent(5)
+            ]
+        except Exception as e:
+            print(f"Error reading recent uploads: {e}")
         
-        return jsonify(stats), 200
+        response = jsonify(stats)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response, 200
     except Exception as e:
         print(f"Dashboard stats error: {e}")
         # Return default stats even on error
@@ -367,195 +869,421 @@ def get_dashboard_stats():
             'experienceLevels': {'Junior': 0, 'Mid': 0, 'Senior': 0}
         }), 200
 
+# -------- Analytics API Routes --------
+def _date_arg(name):
+    """Unix time of an ISO date query argument (UTC unless it says otherwise), or None"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO date, e.g. 2025-01-31")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def _list_arg(name):
+    return [item.strip() for item in request.args.get(name, '').split(',') if item.strip()]
+
+def analytics_response(query):
+    """JSON of ``query(filters)`` over the columnar candidates, once newly stored ones are appended.
+
+    The ETag covers the query and the last candidate loaded, so an
+    unchanged result costs a 304 and no computation.
+    """
+    started = time.monotonic()
+    try:
+        candidate_columns.sync(resume_store.connection())
+        etag = f"analytics-{json_etag([request.full_path, candidate_columns.last_id])}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        filters = {
+            'domain': request.args.get('domain'),
+            'min_experience': request.args.get('min_experience', type=float),
+            'max_experience': request.args.get('max_experience', type=float),
+            'since': _date_arg('since'),
+            'until': _date_arg('until')
+        }
+        with STAGE_SECONDS.time(stage='analytics'):
+            result = query(filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    result['took_ms'] = round((time.monotonic() - started) * 1000, 2)
+    response = jsonify(result)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@api.route('/api/analytics/skills', methods=['GET'])
+def analytics_skills():
+    """Most common skills among the matching candidates, with counts and shares"""
+    limit = max(1, min(request.args.get('limit', 20, type=int), 500))
+    return analytics_response(lambda filters: candidate_columns.top_skills(limit, **filters))
+
+@api.route('/api/analytics/skills/co-occurrence', methods=['GET'])
+def analytics_skill_cooccurrence():
+    """Matrix of candidates having both skills, for the listed skills or the most common ones"""
+    top = max(1, min(request.args.get('top', 20, type=int), candidate_analytics.MAX_COOCCURRENCE_SKILLS))
+    return analytics_response(
+        lambda filters: candidate_columns.cooccurrence(_list_arg('skills'), top, **filters)
+    )
+
+@api.route('/api/analytics/experience', methods=['GET'])
+def analytics_experience():
+    """Experience percentiles overall and per domain"""
+    def query(filters):
+        try:
+            percentiles = [float(item) for item in _list_arg('percentiles')]
+        except ValueError:
+            raise ValueError('percentiles must be numbers between 0 and 100')
+        if not all(0 <= p <= 100 for p in percentiles):
+            raise ValueError('percentiles must be numbers between 0 and 100')
+        return candidate_columns.experience_percentiles(
+            percentiles or candidate_analytics.DEFAULT_PERCENTILES, **filters
+        )
+    return analytics_response(query)
+
+@api.route('/api/analytics/trends', methods=['GET'])
+def analytics_trends():
+    """Candidates ingested per day, week, month or year, with median experience and the share having ``skill``"""
+    return analytics_response(lambda filters: candidate_columns.trends(
+        request.args.get('interval', 'month'), request.args.get('skill'), **filters
+    ))
+
+# -------- Candidate Search API Routes --------
+@api.route('/api/candidates/search', methods=['GET'])
+def search_candidates_api():
+    """Search stored candidates by skills, experience range and domain"""
+    started = time.monotonic()
+    page, per_page = clamp_page(request.args.get('page', 1, type=int), request.args.get('per_page', 20, type=int))
+    try:
+        total, results = search_candidates(
+            resume_store.connection(),
+            query=request.args.get('q'),
+            min_experience=request.args.get('min_experience', type=float),
+            max_experience=request.args.get('max_experience', type=float),
+            domain=request.args.get('domain'),
+            page=page,
+            per_page=per_page,
+            sort=request.args.get('sort', 'recent')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'results': results,
+        'took_ms': round((time.monotonic() - started) * 1000, 2)
+    })
+
+def export_response(fmt, filters, filename):
+    """Streamed download of the candidates matching ``filters``; the first bytes go out before the rest is read"""
+    mimetype = EXPORT_FORMATS[fmt][0]
+    return Response(export_candidates(resume_store.connection(), fmt, **filters), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-store',
+        'X-Accel-Buffering': 'no'
+    })
+
+@api.route('/api/candidates/export', methods=['GET'])
+def export_candidates_api():
+    """Download the candidates matching the search filters as CSV, JSONL, Parquet or XLSX"""
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    if fmt == 'parquet' and not parquet_available():
+        return jsonify({'error': 'Parquet export requires pyarrow'}), 501
+    filters = {
+        'query': request.args.get('q'),
+        'min_experience': request.args.get('min_experience', type=float),
+        'max_experience': request.args.get('max_experience', type=float),
+        'domain': request.args.get('domain'),
+        'sort': request.args.get('sort', 'recent')
+    }
+    try:
+        return export_response(fmt, filters, f"candidates-{datetime.now().strftime('%Y%m%d')}.{fmt}")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
 # -------- Batch Processing API Routes --------
-@app.route('/api/batch/process', methods=['POST'])
+def process_batch_file(filename, data):
+    """Extract and analyze one batch file; used by the batch job workers"""
+    digest = file_digest(data)
+    cache_key = f"{digest}:{BATCH_PROMPT_VERSION}"
+    cached = resume_cache.get('batch', cache_key)
+    if cached is not None:
+        return dict(cached, filename=filename)
+    
+    duplicate = find_exact_duplicate(filename, digest)
+    if duplicate is not None:
+        return dict(duplicate, status='duplicate', message=f"Duplicate of candidate {duplicate['duplicate_of']}")
+    
+    text = extract_texts_cached([data], [digest])[0]
+    if isinstance(text, Exception):
+        return {'filename': filename, 'status': 'error', 'message': str(text)}
+    
+    duplicate = find_near_duplicate(filename, near_duplicates.minhash(text))
+    if duplicate is not None:
+        return dict(duplicate, status='duplicate', message=f"Duplicate of candidate {duplicate['duplicate_of']}")
+    
+    if NO_LLM:
+        result = dict(extract_offline(text), status='success')
+        resume_cache.put('batch', cache_key, result)
+        return dict(result, filename=filename)
+    
+    # Quick analysis for each resume; contact details and skills come from the local pass
+    local = extract_local_fields(text)
+    name_needed = not local['name']
+    prompt = BATCH_PROMPT.format(
+        name_hint=", name" if name_needed else "",
+        name_key=", name" if name_needed else "",
+        text=fit_text(text, PROMPT_INPUT_TOKENS - BATCH_PROMPT_TOKENS)
+    )
+    
+    groq_response = query_groq('batch_extract', prompt, lambda content: valid_batch_reply(content, name_needed))
+    if "choices" not in groq_response:
+        if groq_breaker.degraded():
+            return dict(local_fallback(filename, text), status='processed',
+                        message='Extracted locally - AI service unavailable')
+        return {'filename': filename, 'status': 'error', 'message': 'Failed to analyze'}
+    
+    content = groq_response["choices"][0]["message"]["content"]
+    # Try to extract JSON from response
+    try:
+        result = merge_fields(local, json.loads(content))
+        result['filename'] = filename
+        result['status'] = 'success'
+        resume_cache.put('batch', cache_key, {k: v for k, v in result.items() if k != 'filename'})
+    except:
+        result = dict(local, filename=filename, status='processed', message='Extracted basic info')
+    return result
+
+def _start_batch_engine():
+    engine = BatchJobEngine(BatchJobStore(), process_batch_file)
+    engine.resume_pending()
+    return engine
+
+batch_engine = LazyObject('batch_engine', _start_batch_engine)
+GaugeCallback('techcruit_batch_files_pending', 'Batch files queued or running',
+              _when_loaded(batch_engine, lambda: batch_engine.store.count_unfinished()))
+
+@api.route('/api/batch/process', methods=['POST'])
 def batch_process_resumes():
-    """Process multiple resumes in batch"""
+    """Queue multiple resumes for background batch processing"""
     try:
         if 'files' not in request.files:
             return jsonify({'error': 'No files provided'}), 400
         
         files = request.files.getlist('files')
-        if len(files) > 20:  # Limit batch size
-            return jsonify({'error': 'Maximum 20 files allowed per batch'}), 400
+        if len(files) > BATCH_MAX_FILES:  # Limit batch size
+            return jsonify({'error': f'Maximum {BATCH_MAX_FILES} files allowed per batch'}), 400
         
-        batch_results = []
-        total_files = len(files)
-        processed_files = 0
-        
-        for file in files:
-            try:
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-                file.save(filepath)
-                text = extract_text_from_pdf(filepath)
-                
-                # Quick analysis for each resume
-                prompt = f"Analyze this resume and extract: name, email, phone, years of experience, top 3 skills, expected domain. Return as JSON: {text[:2000]}..."
-                
-                groq_response = query_groq(prompt)
-                if "choices" in groq_response:
-                    content = groq_response["choices"][0]["message"]["content"]
-                    # Try to extract JSON from response
-                    try:
-                        import json
-                        data = json.loads(content)
-                        data['filename'] = file.filename
-                        data['status'] = 'success'
-                    except:
-                        data = {
-                            'filename': file.filename,
-                            'status': 'processed',
-                            'message': 'Extracted basic info'
-                        }
-                else:
-                    data = {
-                        'filename': file.filename,
-                        'status': 'error',
-                        'message': 'Failed to analyze'
-                    }
-                
-                batch_results.append(data)
-                processed_files += 1
-                
-            except Exception as e:
-                batch_results.append({
-                    'filename': file.filename,
-                    'status': 'error',
-                    'message': str(e)
-                })
+        job_id = batch_engine.submit([(file.filename, file.read()) for file in files], current_tenant.get())
         
         return jsonify({
-            'message': f'Batch processing completed: {processed_files}/{total_files} files processed',
-            'results': batch_results,
-            'summary': {
-                'total': total_files,
-                'processed': processed_files,
-                'errors': total_files - processed_files
-            }
-        })
+            'message': f'Batch queued: {len(files)} files',
+            'job_id': job_id,
+            'status': 'queued',
+            'total': len(files),
+            'status_url': f'/api/batch/jobs/{job_id}'
+        }), 202
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/batch/history', methods=['GET'])
+@api.route('/api/batch/jobs/<job_id>', methods=['GET'])
+def get_batch_job(job_id):
+    """Get progress and per-file results of a batch job"""
+    job = batch_engine.store.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Batch job not found'}), 404
+    job['summary'] = {
+        'total': job['total'],
+        'processed': job['processed'],
+        'errors': job['errors']
+    }
+    return jsonify(job)
+
+@api.route('/api/batch/history', methods=['GET'])
 def get_batch_history():
     """Get batch processing history"""
-    # Mock data for demonstration
-    history = [
-        {
-            'id': 1,
-            'date': '2025-06-15',
-            'filesCount': 15,
-            'status': 'completed',
-            'duration': '2m 34s'
-        },
-        {
-            'id': 2,
-            'date': '2025-06-14',
-            'filesCount': 8,
-            'status': 'completed',
-            'duration': '1m 12s'
-        },
-        {
-            'id': 3,
-            'date': '2025-06-13',
-            'filesCount': 22,
-            'status': 'partial',
-            'duration': '3m 45s'
-        }
-    ]
-    return jsonify({'history': history})
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    return jsonify({'history': batch_engine.store.list_jobs(limit)})
+
+# -------- Bulk Ingest API Routes --------
+def _start_bulk_ingest():
+    ingest = BulkIngest(BulkUploadStore(), batch_engine)
+    ingest.resume_pending()
+    return ingest
+
+bulk_ingest = LazyObject('bulk_ingest', _start_bulk_ingest)
+
+def _bulk_upload_view(upload):
+    view = {
+        'id': upload['id'],
+        'filename': upload['filename'],
+        'size': upload['size'],
+        'offset': upload['received'],
+        'status': upload['status'],
+        'members_read': upload['members_read'],
+        'skipped': upload['skipped'],
+        'error': upload['error'],
+        'upload_url': f"/api/bulk/uploads/{upload['id']}",
+        'job_id': upload['job_id'],
+        'job': None
+    }
+    if upload['job_id']:
+        view['job'] = batch_engine.store.get_job(upload['job_id'], include_results=False)
+    return view
+
+def _bulk_error(e):
+    response = jsonify({'error': str(e), 'offset': e.offset})
+    if e.offset is not None:
+        response.headers['Upload-Offset'] = str(e.offset)
+    return response, e.status
+
+@api.route('/api/bulk/uploads', methods=['POST'])
+def create_bulk_upload():
+    """Start a resumable ZIP upload; send the archive with PATCH requests to upload_url"""
+    data = request.get_json(silent=True) or {}
+    try:
+        upload = bulk_ingest.create(str(data.get('filename') or 'resumes.zip'), data.get('size'), current_tenant.get())
+    except BulkUploadError as e:
+        return _bulk_error(e)
+    response = jsonify(_bulk_upload_view(upload))
+    response.headers['Location'] = f"/api/bulk/uploads/{upload['id']}"
+    return response, 201
+
+@api.route('/api/bulk/uploads/<upload_id>', methods=['PATCH'])
+def upload_bulk_chunk(upload_id):
+    """Write the request body at Upload-Offset; a chunk is at most MAX_CONTENT_LENGTH"""
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset is None:
+        return jsonify({'error': 'Upload-Offset header required'}), 400
+    try:
+        # Copied to disk in 1MB pieces straight from the request stream
+        upload = bulk_ingest.write_chunk(upload_id, offset, request.stream)
+    except BulkUploadError as e:
+        return _bulk_error(e)
+    response = jsonify(_bulk_upload_view(upload))
+    response.headers['Upload-Offset'] = str(upload['received'])
+    return response
+
+@api.route('/api/bulk/uploads/<upload_id>', methods=['GET'])
+def get_bulk_upload(upload_id):
+    """Upload offset (to resume from), archive progress and the batch job's progress"""
+    try:
+        upload = bulk_ingest.get(upload_id)
+    except BulkUploadError as e:
+        return _bulk_error(e)
+    response = jsonify(_bulk_upload_view(upload))
+    response.headers['Upload-Offset'] = str(upload['received'])
+    return response
 
 # -------- AI Analysis API Routes --------
-@app.route('/api/ai/analyze', methods=['POST'])
+@api.route('/api/ai/analyze', methods=['POST'])
 def ai_analyze_resume():
     """Perform deep AI analysis on a single resume"""
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file provided'}), 400
-        
-        file = request.files['file']
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-        file.save(filepath)
-        text = extract_text_from_pdf(filepath)
-        
-        # Advanced AI analysis prompt
-        analysis_prompt = f"""
-        Perform a comprehensive analysis of this resume. Provide detailed insights on:
-        1. Candidate strengths and weaknesses
-        2. Skill proficiency levels
-        3. Career progression analysis
-        4. Recommended roles and salary range
-        5. Areas for improvement
-        6. Cultural fit indicators
-        
-        Resume text: {text[:3000]}...
-        
-        Return a detailed analysis in a structured format.
-        """
-        
-        groq_response = query_groq(analysis_prompt)
-        
-        if "choices" in groq_response:
-            analysis = groq_response["choices"][0]["message"]["content"]
-            
-            # Mock additional analysis data
-            result = {
-                'filename': file.filename,
-                'analysis': analysis,
-                'scores': {
-                    'technical_skills': 85,
-                    'experience_relevance': 78,
-                    'communication': 82,
-                    'leadership': 65,
-                    'overall_fit': 77
-                },
-                'recommendations': [
-                    'Strong technical background in mentioned technologies',
-                    'Good progression in career responsibilities',
-                    'Consider additional leadership experience',
-                    'Skills align well with senior developer roles'
-                ],
-                'salary_estimate': {
-                    'min': 75000,
-                    'max': 95000,
-                    'currency': 'USD'
-                }
-            }
-            
-            return jsonify(result)
-        else:
-            return jsonify({'error': 'AI analysis failed'}), 500
-            
+        filename, cache_key, analysis_prompt, response = prepare_analysis()
+        if response is not None:
+            return response
+        return finish_analysis(filename, cache_key, query_groq('analysis', analysis_prompt))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/ai/compare', methods=['POST'])
+def prepare_analysis():
+    """(filename, cache key, prompt, None) for an analysis request, or a response when no Groq call is needed"""
+    if 'file' not in request.files:
+        return None, None, None, (jsonify({'error': 'No file provided'}), 400)
+    
+    if NO_LLM:
+        return None, None, None, (jsonify({'error': 'AI analysis is disabled in NO_LLM mode'}), 503)
+    
+    file = request.files['file']
+    data = file.read()
+    digest = file_digest(data)
+    cache_key = f"{digest}:{ANALYSIS_PROMPT_VERSION}"
+    cached = resume_cache.get('analysis', cache_key)
+    if cached is not None:
+        return None, None, None, jsonify(dict(cached, filename=file.filename))
+    
+    text = extract_texts_cached([data], [digest])[0]
+    if isinstance(text, Exception):
+        raise text
+    
+    # Advanced AI analysis prompt
+    return file.filename, cache_key, ANALYSIS_PROMPT.format(text=fit_text(text, ANALYSIS_TEXT_TOKENS)), None
+
+def finish_analysis(filename, cache_key, groq_response):
+    """Build, cache and return the analysis response from Groq's reply"""
+    if "choices" in groq_response:
+        analysis = groq_response["choices"][0]["message"]["content"]
+        
+        # Mock additional analysis data
+        result = {
+            'filename': filename,
+            'analysis': analysis,
+            'scores': {
+                'technical_skills': 85,
+                'experience_relevance': 78,
+                'communication': 82,
+                'leadership': 65,
+                'overall_fit': 77
+            },
+            'recommendations': [
+                'Strong technical background in mentioned technologies',
+                'Good progression in career responsibilities',
+                'Consider additional leadership experience',
+                'Skills align well with senior developer roles'
+            ],
+            'salary_estimate': {
+                'min': 75000,
+                'max': 95000,
+                'currency': 'USD'
+            }
+        }
+        resume_cache.put('analysis', cache_key, {k: v for k, v in result.items() if k != 'filename'})
+        
+        return jsonify(result)
+    else:
+        return jsonify({'error': 'AI analysis failed'}), 500
+
+@api.route('/api/ai/compare', methods=['POST'])
 def ai_compare_resumes():
-    """Compare multiple resumes using AI"""
+    """Compare stored candidates, optionally against a job description"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         resume_ids = data.get('resume_ids', [])
+        job_description = data.get('job_description')
         
         if len(resume_ids) < 2:
             return jsonify({'error': 'At least 2 resumes required for comparison'}), 400
+        if len(resume_ids) > candidate_compare.MAX_COMPARE_CANDIDATES:
+            return jsonify({'error': f'At most {candidate_compare.MAX_COMPARE_CANDIDATES} resumes can be compared at once'}), 400
+        try:
+            resume_ids = list(dict.fromkeys(int(resume_id) for resume_id in resume_ids))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'resume_ids must be candidate ids'}), 400
         
-        # Mock comparison data
-        comparison = {
-            'resumes': resume_ids,
-            'comparison_matrix': {
-                'technical_skills': [85, 78, 90],
-                'experience': [5, 3, 7],
-                'education': [88, 92, 85],
-                'overall_score': [82, 78, 88]
-            },
-            'winner': resume_ids[2] if len(resume_ids) > 2 else resume_ids[0],
-            'insights': [
-                f"Resume {resume_ids[0]} shows strong technical foundation",
-                f"Resume {resume_ids[1]} has excellent educational background",
-                f"Resume {resume_ids[2] if len(resume_ids) > 2 else resume_ids[0]} demonstrates best overall fit"
-            ]
-        }
+        found = resume_store.get_many(resume_ids)
+        missing = [resume_id for resume_id in resume_ids if resume_id not in found]
+        if len(found) < 2:
+            return jsonify({'error': 'At least 2 stored resumes required for comparison', 'missing': missing}), 404
+        
+        candidates = [(resume_id, found[resume_id]) for resume_id in resume_ids if resume_id in found]
+        comparison = candidate_compare.compare_candidates(resume_store.connection(), candidates, job_description)
+        if missing:
+            comparison['missing'] = missing
         
         return jsonify(comparison)
         
@@ -563,139 +1291,138 @@ def ai_compare_resumes():
         return jsonify({'error': str(e)}), 500
 
 # -------- Pricing API Routes --------
-@app.route('/api/pricing/plans', methods=['GET'])
-def get_pricing_plans():
-    """Get pricing plans and add-ons"""
-    try:
-        pricing_data = {
-            'plans': [
-                {
-                    'id': 'starter',
-                    'name': 'Starter',
-                    'description': 'Perfect for small teams and startups',
-                    'price': 15,
-                    'currency': 'INR',
-                    'unit': 'per resume',
-                    'resumeLimit': 'Up to 100 resumes',
-                    'resumeCount': 100,
-                    'features': [
-                        'Basic resume screening',
-                        'AI-powered skills extraction', 
-                        'Excel export',
-                        'Email support',
-                        'Standard processing speed'
-                    ],
-                    'savings': 'Basic screening package',
-                    'popular': False,
-                    'enterprise': False,
-                    'icon': '<Rocket className="w-8 h-8" />',
-                    'color': 'text-blue-600',
-                    'bgColor': 'bg-blue-50',
-                    'borderColor': 'border-blue-200'
-                },
-                {
-                    'id': 'growth',
-                    'name': 'Growth', 
-                    'description': 'Best for growing companies',
-                    'price': 20,
-                    'currency': 'INR',
-                    'unit': 'per resume',
-                    'resumeLimit': 'Up to 500 resumes',
-                    'resumeCount': 500,
-                    'features': [
-                        'Advanced AI filtering (Skills, Experience, Location)',
-                        'Batch processing up to 1000 resumes',
-                        'All export formats (Excel, PDF, Word)',
-                        'Email auto-delivery',
-                        'Priority support',
-                        'Custom filters',
-                        'Fresher/Experienced filtering'
-                    ],
-                    'savings': 'Filtered, All formats',
-                    'popular': True,
-                    'enterprise': False,
-                    'icon': '<Building className="w-8 h-8" />',
-                    'color': 'text-emerald-600',
-                    'bgColor': 'bg-emerald-50',
-                    'borderColor': 'border-emerald-300'
-                },
-                {
-                    'id': 'enterprise',
-                    'name': 'Enterprise',
-                    'description': 'For large organizations (1000-20,000 resumes)',
-                    'price': 0,
-                    'currency': 'INR',
-                    'unit': 'custom pricing',
-                    'resumeLimit': '1000-20,000 resumes',
-                    'resumeCount': 15000,
-                    'features': [
-                        'Full automation suite',
-                        'Unlimited bulk processing',
-                        'Advanced AI filtering',
-                        'White-label solution',
-                        'Dedicated account manager',
-                        'Custom integrations',
-                        'Branded reports with your logo',
-                        'Priority processing',
-                        'API access',
-                        'Training sessions'
-                    ],
-                    'savings': 'Full automation + email delivery',
-                    'popular': False,
-                    'enterprise': True,
-                    'icon': '<Crown className="w-8 h-8" />',
-                    'color': 'text-purple-600',
-                    'bgColor': 'bg-purple-50',
-                    'borderColor': 'border-purple-300'
-                }
+PRICING_PLANS = {
+    'plans': [
+        {
+            'id': 'starter',
+            'name': 'Starter',
+            'description': 'Perfect for small teams and startups',
+            'price': 15,
+            'currency': 'INR',
+            'unit': 'per resume',
+            'resumeLimit': 'Up to 100 resumes',
+            'resumeCount': 100,
+            'features': [
+                'Basic resume screening',
+                'AI-powered skills extraction', 
+                'Excel export',
+                'Email support',
+                'Standard processing speed'
             ],
-            'addOns': [
-                {
-                    'id': 'skills-filter',
-                    'name': 'Advanced Skills & Education Filter',
-                    'description': 'Filter by specific skills, education levels, and experience criteria',
-                    'price': 499,
-                    'currency': 'INR',
-                    'icon': '<Shield className="w-6 h-6" />',
-                    'category': 'analytics'
-                },
-                {
-                    'id': 'email-delivery',
-                    'name': 'Email Auto-Delivery',
-                    'description': 'Automated email delivery of processed results to your team',
-                    'price': 299,
-                    'currency': 'INR',
-                    'icon': '<Mail className="w-6 h-6" />',
-                    'category': 'integration'
-                },
-                {
-                    'id': 'branded-reports',
-                    'name': 'Branded Reports (With Your Logo)',
-                    'description': 'Custom branded reports with your company logo and styling',
-                    'price': 999,
-                    'currency': 'INR',
-                    'icon': '<Award className="w-6 h-6" />',
-                    'category': 'security'
-                }
+            'savings': 'Basic screening package',
+            'popular': False,
+            'enterprise': False,
+            'icon': '<Rocket className="w-8 h-8" />',
+            'color': 'text-blue-600',
+            'bgColor': 'bg-blue-50',
+            'borderColor': 'border-blue-200'
+        },
+        {
+            'id': 'growth',
+            'name': 'Growth', 
+            'description': 'Best for growing companies',
+            'price': 20,
+            'currency': 'INR',
+            'unit': 'per resume',
+            'resumeLimit': 'Up to 500 resumes',
+            'resumeCount': 500,
+            'features': [
+                'Advanced AI filtering (Skills, Experience, Location)',
+                'Batch processing up to 1000 resumes',
+                'All export formats (Excel, PDF, Word)',
+                'Email auto-delivery',
+                'Priority support',
+                'Custom filters',
+                'Fresher/Experienced filtering'
             ],
-            'contact': {
-                'name': 'Tushar Jain',
-                'phone': '+91-9359205909',
-                'email': 'info@techmarqx.com'
-            },
-            'freeTrial': {
-                'enabled': True,
-                'resumeCount': 10,
-                'description': 'Get your first 10 resumes screened at no cost!'
-            }
+            'savings': 'Filtered, All formats',
+            'popular': True,
+            'enterprise': False,
+            'icon': '<Building className="w-8 h-8" />',
+            'color': 'text-emerald-600',
+            'bgColor': 'bg-emerald-50',
+            'borderColor': 'border-emerald-300'
+        },
+        {
+            'id': 'enterprise',
+            'name': 'Enterprise',
+            'description': 'For large organizations (1000-20,000 resumes)',
+            'price': 0,
+            'currency': 'INR',
+            'unit': 'custom pricing',
+            'resumeLimit': '1000-20,000 resumes',
+            'resumeCount': 15000,
+            'features': [
+                'Full automation suite',
+                'Unlimited bulk processing',
+                'Advanced AI filtering',
+                'White-label solution',
+                'Dedicated account manager',
+                'Custom integrations',
+                'Branded reports with your logo',
+                'Priority processing',
+                'API access',
+                'Training sessions'
+            ],
+            'savings': 'Full automation + email delivery',
+            'popular': False,
+            'enterprise': True,
+            'icon': '<Crown className="w-8 h-8" />',
+            'color': 'text-purple-600',
+            'bgColor': 'bg-purple-50',
+            'borderColor': 'border-purple-300'
         }
-        
-        return jsonify(pricing_data)
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    ],
+    'addOns': [
+        {
+            'id': 'skills-filter',
+            'name': 'Advanced Skills & Education Filter',
+            'description': 'Filter by specific skills, education levels, and experience criteria',
+            'price': 499,
+            'currency': 'INR',
+            'icon': '<Shield className="w-6 h-6" />',
+            'category': 'analytics'
+        },
+        {
+            'id': 'email-delivery',
+            'name': 'Email Auto-Delivery',
+            'description': 'Automated email delivery of processed results to your team',
+            'price': 299,
+            'currency': 'INR',
+            'icon': '<Mail className="w-6 h-6" />',
+            'category': 'integration'
+        },
+        {
+            'id': 'branded-reports',
+            'name': 'Branded Reports (With Your Logo)',
+            'description': 'Custom branded reports with your company logo and styling',
+            'price': 999,
+            'currency': 'INR',
+            'icon': '<Award className="w-6 h-6" />',
+            'category': 'security'
+        }
+    ],
+    'contact': {
+        'name': 'Tushar Jain',
+        'phone': '+91-9359205909',
+        'email': 'info@techmarqx.com'
+    },
+    'freeTrial': {
+        'enabled': True,
+        'resumeCount': 10,
+        'description': 'Get your first 10 resumes screened at no cost!'
+    }
+}
+
+# Serialised and compressed once; clients revalidate with the ETag
+PRICING_PLANS_BODY = CachedBody(json.dumps(PRICING_PLANS).encode('utf-8'), 'application/json', 'public, max-age=600')
 
-@app.route('/api/pricing/calculate', methods=['POST'])
+@api.route('/api/pricing/plans', methods=['GET'])
+def get_pricing_plans():
+    """Get pricing plans and add-ons"""
+    return cached_response(PRICING_PLANS_BODY)
+
+@api.route('/api/pricing/calculate', methods=['POST'])
 def calculate_pricing():
     """Calculate total pricing based on selected plan and add-ons"""
     try:
@@ -754,7 +1481,7 @@ def calculate_pricing():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/pricing/contact', methods=['POST'])
+@api.route('/api/pricing/contact', methods=['POST'])
 def submit_contact_form():
     """Handle contact form submissions for enterprise inquiries"""
     try:
@@ -783,6 +1510,62 @@ def submit_contact_form():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# -------- App Factory --------
+STARTUP = {}
+SERVICES = [resume_cache, resume_store, near_duplicate_index, candidate_columns, groq_client, llm_executor, batch_engine,
+            bulk_ingest, static_assets]
+
+def startup_report():
+    """Cold-start timings plus which services and heavy libraries have been loaded since"""
+    return dict(
+        STARTUP,
+        services={service._name: round(service.load_seconds * 1000, 1) for service in SERVICES if service.loaded},
+        heavy_modules=[name for name in HEAVY_MODULES if name in sys.modules]
+    )
+
+def create_app(preload=PRELOAD_SERVICES):
+    """Build the Flask app; with ``preload`` the stores, clients and batch workers start now"""
+    started = time.perf_counter()
+    # The frontend is served by serve_frontend/serve_static from static_assets, not Flask's static route
+    app = Flask(__name__, static_folder=None)
+    CORS(app)  # Enable CORS for all routes
+    
+    # Configuration
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'fallback-secret-key-for-development')
+    
+    # Set up logging
+    if os.environ.get('FLASK_ENV') == 'production':
+        logging.basicConfig(level=logging.WARNING)
+    else:
+        logging.basicConfig(level=logging.INFO)
+    
+    if not GROQ_API_KEY and not NO_LLM:
+        app.logger.warning("GROQ_API_KEY is not set; resume analysis will fail until it is configured")
+    
+    app.register_blueprint(api)
+    app_ready = time.perf_counter()
+    
+    if preload:
+        for service in SERVICES:
+            if service is groq_client and not GROQ_API_KEY:
+                continue
+            service.load()
+        static_assets.warm()
+    
+    finished = time.perf_counter()
+    STARTUP.update({
+        'import_ms': round((started - IMPORT_STARTED) * 1000, 1),
+        'create_app_ms': round((app_ready - started) * 1000, 1),
+        'preload_ms': round((finished - app_ready) * 1000, 1),
+        'total_ms': round((finished - IMPORT_STARTED) * 1000, 1),
+        'preloaded': preload
+    })
+    app.logger.info("Startup: %s", startup_report())
+    return app
+
+app = create_app()
+
 if __name__ == '__main__':
     # For local development
     debug_mode = os.environ.get('FLASK_ENV') != 'production'
@@ -0,0 +1,177 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans a cached lookup up to a slow Groq completion
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+def _register(metric):
+    with _registry_lock:
+        _registry.append(metric)
+    return metric
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# -------- Metric Types --------
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _register(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, tuple(zip(self.labelnames, key)), value) for key, value in items]
+
+class Histogram:
+    """Cumulative-bucket histogram; ``observe`` is one bisect and one locked update"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+        _register(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (non-cumulative) + overflow, sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(series[0]), series[1], series[2]) for key, series in self._series.items()]
+        samples = []
+        for key, counts, total, count in items:
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", labels + (("le", _format_value(float(bound))),), cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+class GaugeCallback:
+    """Gauge (or counter) read at scrape time from ``fn``.
+
+    ``fn`` returns a number, or a list of (labels dict, number) pairs.
+    Errors while reading are skipped so one broken source cannot fail a scrape.
+    """
+
+    def __init__(self, name, help, fn, kind="gauge"):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.kind = kind
+        _register(self)
+
+    def samples(self):
+        try:
+            value = self.fn()
+        except Exception as e:
+            logger.warning("Metric %s unavailable: %s", self.name, e)
+            return []
+        if isinstance(value, (int, float)):
+            return [(self.name, (), value)]
+        return [(self.name, tuple(sorted(labels.items())), number) for labels, number in value]
+
+# -------- Exposition --------
+def render():
+    """All registered metrics in the Prometheus text exposition format"""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+# -------- Shared Metrics --------
+STAGE_SECONDS = Histogram(
+    "techcruit_stage_seconds", "Time spent in each ingest stage", labelnames=("stage", "format")
+)
+GROQ_REQUEST_SECONDS = Histogram(
+    "techcruit_groq_request_seconds", "Groq HTTP round trip (until response headers) per attempt",
+    labelnames=("outcome",)
+)
+GROQ_TOKENS = Counter("techcruit_groq_tokens_total", "Tokens billed by Groq, from response usage", labelnames=("type",))
+GROQ_ERRORS = Counter("techcruit_groq_errors_total", "Failed Groq calls by category", labelnames=("category",))
+GROQ_RETRIES = Counter("techcruit_groq_retries_total", "Groq attempts retried, by cause", labelnames=("cause",))
+HTTP_REQUEST_SECONDS = Histogram(
+    "techcruit_http_request_seconds", "HTTP request handling time", labelnames=("endpoint", "method", "status")
+)
+MODEL_TIER_SECONDS = Histogram(
+    "techcruit_model_tier_seconds", "Groq call time per routed task and model tier, including retries",
+    labelnames=("task", "tier")
+)
+MODEL_TIER_TOKENS = Counter(
+    "techcruit_model_tier_tokens_total", "Tokens billed per routed task and model tier", labelnames=("task", "tier", "type")
+)
+MODEL_FALLBACKS = Counter(
+    "techcruit_model_fallbacks_total", "Calls retried on the next model tier, by the tier that fell short and why",
+    labelnames=("task", "tier", "reason")
+)
+LLM_QUEUE_WAIT = Histogram(
+    "techcruit_llm_queue_wait_seconds", "Time a Groq call waited for a scheduler slot", labelnames=("plan", "class")
+)
+LLM_REJECTED = Counter(
+    "techcruit_llm_rejected_total", "Groq calls turned away by the scheduler", labelnames=("plan", "reason")
+)
+GROQ_HEDGES = Counter(
+    "techcruit_groq_hedges_total", "Duplicate Groq calls sent for slow extraction calls, and how many answered first",
+    labelnames=("outcome",)
+)
+GROQ_CIRCUIT_TRIPS = Counter("techcruit_groq_circuit_trips_total", "Times the Groq circuit breaker opened")
@@ -0,0 +1,128 @@
+import os
+import time
+from metrics import MODEL_FALLBACKS, MODEL_TIER_SECONDS, MODEL_TIER_TOKENS
+from prompt_packing import PROMPT_OUTPUT_TOKENS
+
+# Model behind each tier
+MODEL_TIERS = {
+    'small': os.environ.get('GROQ_SMALL_MODEL', 'llama-3.1-8b-instant'),
+    'large': os.environ.get('GROQ_LARGE_MODEL', 'llama-3.3-70b-versatile')
+}
+# Completion budget of a single-resume extraction (a few JSON keys)
+EXTRACT_OUTPUT_TOKENS = int(os.environ.get('EXTRACT_OUTPUT_TOKENS', 256))
+
+class Route:
+    """One tier of a task's route: the model plus the limits used with it"""
+
+    def __init__(self, tier, max_tokens, temperature):
+        self.tier = tier
+        self.model = MODEL_TIERS[tier]
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+
+# Task class -> tier budgets. GROQ_ROUTE_<TASK> (e.g. GROQ_ROUTE_BATCH_EXTRACT=large)
+# lists the tiers to try, in order; later tiers are only used when the output
+# of an earlier one fails validation.
+TASK_BUDGETS = {
+    # Field extraction: the small model does this well; low temperature keeps the JSON terse
+    'batch_extract': (EXTRACT_OUTPUT_TOKENS, 0.3, 'small,large'),
+    'upload_extract': (PROMPT_OUTPUT_TOKENS, 0.3, 'small,large'),
+    # Streamed results are sent as they arrive and cannot be re-asked, so one tier only
+    'upload_stream': (PROMPT_OUTPUT_TOKENS, 0.3, 'large'),
+    'analysis': (PROMPT_OUTPUT_TOKENS, 0.7, 'large')
+}
+# Extraction calls are idempotent, so a slow one may be raced by a duplicate
+HEDGED_TASKS = ('batch_extract', 'upload_extract')
+ROUTES = {
+    task: [Route(tier.strip(), max_tokens, temperature)
+           for tier in os.environ.get(f'GROQ_ROUTE_{task.upper()}', tiers).split(',') if tier.strip()]
+    for task, (max_tokens, temperature, tiers) in TASK_BUDGETS.items()
+}
+
+def route_version(*tasks):
+    """Models the given tasks may be answered by; part of their cache keys"""
+    return "+".join(route.model for task in tasks for route in ROUTES[task])
+
+# -------- Model Router --------
+class _ModelRouterBase:
+    """Tier selection, fallback decisions and per-tier accounting shared by the sync and async routers"""
+
+    def __init__(self, client, routes=ROUTES):
+        self.client = client
+        self.routes = routes
+
+    def _record(self, task, route, started, response):
+        MODEL_TIER_SECONDS.observe(time.perf_counter() - started, task=task, tier=route.tier)
+        usage = response.get("usage") if isinstance(response, dict) else None
+        if usage:
+            MODEL_TIER_TOKENS.inc(usage.get("prompt_tokens", 0), task=task, tier=route.tier, type="prompt")
+            MODEL_TIER_TOKENS.inc(usage.get("completion_tokens", 0), task=task, tier=route.tier, type="completion")
+
+    def _fallback_reason(self, response, validate):
+        """Why a reply should be re-asked on the next tier, or None to accept it"""
+        if "choices" not in response:
+            return "error"
+        if validate is not None and not validate(response["choices"][0]["message"]["content"]):
+            return "invalid"
+        return None
+
+    def _accept(self, task, routes, index, response, validate):
+        reason = self._fallback_reason(response, validate)
+        if reason is None or index == len(routes) - 1:
+            return True
+        MODEL_FALLBACKS.inc(task=task, tier=routes[index].tier, reason=reason)
+        return False
+
+class ModelRouter(_ModelRouterBase):
+    """Sends each task class to its model tier, moving up a tier only when the reply fails validation.
+
+    ``validate`` receives the completion text; a failed call or a False
+    result moves the request to the next tier of the task's route. The
+    last tier's reply is returned as is.
+    """
+
+    def chat(self, task, prompt, validate=None):
+        routes = self.routes[task]
+        for index, route in enumerate(routes):
+            started = time.perf_counter()
+            response = self.client.chat(prompt, temperature=route.temperature, max_tokens=route.max_tokens,
+                                        model=route.model, hedge=task in HEDGED_TASKS)
+            self._record(task, route, started, response)
+            if self._accept(task, routes, index, response, validate):
+                return response
+
+    def chat_stream(self, task, prompt):
+        """Content deltas from the task's first tier; streams are never re-asked"""
+        route = self.routes[task][0]
+        started = time.perf_counter()
+        usage = {}
+        try:
+            yield from self.client.chat_stream(prompt, temperature=route.temperature, max_tokens=route.max_tokens,
+                                               model=route.model, on_usage=usage.update)
+        finally:
+            self._record(task, route, started, {"usage": usage})
+
+class AsyncModelRouter(_ModelRouterBase):
+    """ModelRouter over an AsyncGroqClient"""
+
+    async def chat(self, task, prompt, validate=None):
+        routes = self.routes[task]
+        for index, route in enumerate(routes):
+            started = time.perf_counter()
+            response = await self.client.chat(prompt, temperature=route.temperature, max_tokens=route.max_tokens,
+                                              model=route.model, hedge=task in HEDGED_TASKS)
+            self._record(task, route, started, response)
+            if self._accept(task, routes, index, response, validate):
+                return response
+
+    async def chat_stream(self, task, prompt):
+        route = self.routes[task][0]
+        started = time.perf_counter()
+        usage = {}
+        try:
+            async for content in self.client.chat_stream(prompt, temperature=route.temperature,
+                                                         max_tokens=route.max_tokens, model=route.model,
+                                                         on_usage=usage.update):
+                yield content
+        finally:
+            self._record(task, route, started, {"usage": usage})
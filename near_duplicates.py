@@ -0,0 +1,122 @@
+import os
+import re
+import zlib
+import hashlib
+import time
+import numpy as np
+from metrics import STAGE_SECONDS
+
+# Estimated Jaccard similarity of word shingles above which two resumes are the same CV
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.8))
+# 'skip' returns the stored candidate instead of calling Groq; 'off' disables detection
+NEAR_DUPLICATE_ACTION = os.environ.get('NEAR_DUPLICATE_ACTION', 'skip').lower()
+
+SHINGLE_WORDS = 3
+NUM_PERM = 128
+# 16 bands of 8 rows: pairs at 0.8 similarity collide in some band ~95% of the time, pairs at 0.5 ~6%
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.RandomState(1)
+# a, b < 2**31 and shingle hashes < 2**32, so a * x + b cannot overflow 64 bits
+PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM).astype(np.uint64)
+PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM).astype(np.uint64)
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+def shingles(text, size=SHINGLE_WORDS):
+    """Set of hashed word n-grams of normalised text"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        words = words and [" ".join(words)]
+        size = 1
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+def minhash(text):
+    """MinHash signature (NUM_PERM uint32 values) of ``text``, or None for empty text"""
+    with STAGE_SECONDS.time(stage='minhash'):
+        hashed = np.fromiter(shingles(text), dtype=np.uint64)
+        if not hashed.size:
+            return None
+        values = (hashed[:, None] * PERM_A + PERM_B) % MERSENNE_PRIME
+        return (values.min(axis=0) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+def estimated_similarity(a, b):
+    """Share of equal MinHash slots, an unbiased estimate of the Jaccard similarity"""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+def band_keys(signature):
+    """(band, bucket) pairs of a signature for the LSH tables"""
+    keys = []
+    for band in range(LSH_BANDS):
+        chunk = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()
+        keys.append((band, int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "big", signed=True)))
+    return keys
+
+# -------- LSH Index --------
+class NearDuplicateIndex:
+    """MinHash signatures of stored candidates with banded LSH buckets in SQLite.
+
+    A lookup only compares signatures of candidates sharing at least one
+    bucket, so the cost does not grow with the size of the store. Exact
+    re-uploads are matched by file digest without extracting any text.
+    """
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+
+    def create(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS candidate_minhash (
+                candidate_id INTEGER PRIMARY KEY,
+                digest TEXT,
+                signature BLOB
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_candidate_minhash_digest ON candidate_minhash(digest)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS candidate_lsh (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                candidate_id INTEGER NOT NULL,
+                PRIMARY KEY (band, bucket, candidate_id)
+            ) WITHOUT ROWID
+        """)
+
+    def add(self, conn, candidate_id, digest, signature):
+        """Index a stored candidate; ``signature`` may be None when only the digest is known"""
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO candidate_minhash (candidate_id, digest, signature) VALUES (?, ?, ?)",
+                (candidate_id, digest, signature.tobytes() if signature is not None else None)
+            )
+            if signature is not None:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO candidate_lsh (band, bucket, candidate_id) VALUES (?, ?, ?)",
+                    [(band, bucket, candidate_id) for band, bucket in band_keys(signature)]
+                )
+
+    def find_exact(self, conn, digest):
+        """Candidate id stored from byte-identical file, or None"""
+        row = conn.execute("SELECT candidate_id FROM candidate_minhash WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def find(self, conn, signature):
+        """(candidate id, similarity) of the most similar stored candidate above the threshold, or None"""
+        started = time.perf_counter()
+        keys = band_keys(signature)
+        # One primary-key lookup per band (a row-value IN list would scan the table)
+        buckets = " UNION ".join("SELECT candidate_id FROM candidate_lsh WHERE band = ? AND bucket = ?" for _ in keys)
+        rows = conn.execute(
+            f"""SELECT m.candidate_id, m.signature FROM candidate_minhash m
+                WHERE m.candidate_id IN ({buckets})""",
+            [value for key in keys for value in key]
+        ).fetchall()
+        best = None
+        for candidate_id, blob in rows:
+            similarity = estimated_similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate_id, similarity)
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage='dedupe_lookup')
+        return best
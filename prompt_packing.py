@@ -0,0 +1,46 @@
+import os
+from groq_client import estimate_tokens
+from resume_sections import budget_sections
+
+# Input tokens (resume text + instructions) allowed in a single upload prompt
+PROMPT_INPUT_TOKENS = int(os.environ.get('PROMPT_INPUT_TOKENS', 6000))
+# Completion budget per call (sent as max_tokens)
+PROMPT_OUTPUT_TOKENS = int(os.environ.get('PROMPT_OUTPUT_TOKENS', 4000))
+# Expected completion size of one parsed resume JSON block (judgement fields only)
+OUTPUT_TOKENS_PER_RESUME = int(os.environ.get('OUTPUT_TOKENS_PER_RESUME', 120))
+
+# -------- Token-Budgeted Prompt Packing --------
+def fit_text(text, max_tokens):
+    """Trim ``text`` so its estimated size fits ``max_tokens``, keeping the most useful sections"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return budget_sections(text, max_tokens * 4)
+
+def pack_resumes(resumes, header_tokens=0, input_budget=PROMPT_INPUT_TOKENS,
+                 output_budget=PROMPT_OUTPUT_TOKENS, per_resume_output=OUTPUT_TOKENS_PER_RESUME):
+    """Group (filename, text) pairs into chunks that fit the input and output budgets.
+
+    Uses first-fit decreasing so large resumes are placed first and the
+    number of Groq calls stays low. A resume that alone exceeds the input
+    budget gets its own chunk with its text trimmed to fit.
+    """
+    max_per_chunk = max(1, output_budget // per_resume_output)
+    text_budget = max(1, input_budget - header_tokens)
+    # Each resume also carries a "Resume N - filename:" line
+    sized = [(filename, text, estimate_tokens(text) + estimate_tokens(filename) + 8)
+             for filename, text in resumes]
+    sized.sort(key=lambda item: item[2], reverse=True)
+
+    chunks = []  # [used_tokens, [(filename, text), ...]]
+    for filename, text, tokens in sized:
+        if tokens >= text_budget:
+            chunks.append([text_budget, [(filename, fit_text(text, max(1, text_budget - estimate_tokens(filename) - 8)))]])
+            continue
+        for chunk in chunks:
+            if chunk[0] + tokens <= text_budget and len(chunk[1]) < max_per_chunk:
+                chunk[0] += tokens
+                chunk[1].append((filename, text))
+                break
+        else:
+            chunks.append([tokens, [(filename, text)]])
+    return [items for _, items in chunks]
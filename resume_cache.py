@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = os.environ.get('RESUME_CACHE_FILE', 'data/resume_cache.sqlite3')
+CACHE_MAX_BYTES = int(os.environ.get('RESUME_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+# Hits are remembered and their recency written in one transaction once this
+# many have gathered or the oldest is this many seconds old (or with the next put)
+TOUCH_BATCH = 256
+TOUCH_INTERVAL = 5.0
+
+def file_digest(data):
+    """Content address of an uploaded file"""
+    return hashlib.sha256(data).hexdigest()
+
+def prompt_version(*parts):
+    """Short version tag for a prompt template + model combination"""
+    return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()[:12]
+
+# -------- Content-Addressed Resume Cache --------
+class ResumeCache:
+    """Persistent LRU cache of extracted text and parsed Groq results.
+
+    Entries live in a small SQLite file so they survive restarts and are
+    shared between worker processes. The total stored size is capped at
+    ``max_bytes``; the least recently used entries are evicted first.
+    Triggers keep the entry count and byte total in a one-row table, so
+    neither eviction nor stats scan the cache, and reads only write when a
+    batch of hits is flushed.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = {}
+        self.misses = {}
+        self._touched = {}
+        self._touched_since = None
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache_entries(last_access)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    entries INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL
+                )
+            """)
+            # Seeded from the entries of an older cache file in the same transaction the triggers are added in
+            conn.execute(
+                """INSERT OR IGNORE INTO cache_totals (id, entries, bytes)
+                   SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"""
+            )
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS cache_entries_insert AFTER INSERT ON cache_entries BEGIN
+                    UPDATE cache_totals SET entries = entries + 1, bytes = bytes + new.size WHERE id = 0;
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS cache_entries_delete AFTER DELETE ON cache_entries BEGIN
+                    UPDATE cache_totals SET entries = entries - 1, bytes = bytes - old.size WHERE id = 0;
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS cache_entries_resize AFTER UPDATE OF size ON cache_entries BEGIN
+                    UPDATE cache_totals SET bytes = bytes + new.size - old.size WHERE id = 0;
+                END
+            """)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, counters, kind):
+        with self._lock:
+            counters[kind] = counters.get(kind, 0) + 1
+
+    def get(self, kind, key):
+        """Return the cached value for ``key`` or None, updating recency"""
+        full_key = f"{kind}:{key}"
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM cache_entries WHERE key = ?", (full_key,)).fetchone()
+            if row is None:
+                self._count(self.misses, kind)
+                return None
+            if self._touch(full_key):
+                with conn:
+                    self._flush_touches(conn)
+            self._count(self.hits, kind)
+            return json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning("Resume cache read error: %s", e)
+            self._count(self.misses, kind)
+            return None
+
+    def _touch(self, full_key):
+        """Remember a hit; True once the gathered hits are due to be written"""
+        now = time.time()
+        with self._lock:
+            self._touched[full_key] = now
+            if self._touched_since is None:
+                self._touched_since = now
+            return len(self._touched) >= TOUCH_BATCH or now - self._touched_since >= TOUCH_INTERVAL
+
+    def _flush_touches(self, conn):
+        """Write the recency of gathered hits in the caller's transaction"""
+        with self._lock:
+            touched, self._touched, self._touched_since = self._touched, {}, None
+        if touched:
+            conn.executemany(
+                "UPDATE cache_entries SET last_access = MAX(last_access, ?) WHERE key = ?",
+                [(accessed, full_key) for full_key, accessed in touched.items()]
+            )
+
+    def put(self, kind, key, value):
+        full_key = f"{kind}:{key}"
+        payload = json.dumps(value)
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    """INSERT INTO cache_entries (key, kind, value, size, last_access) VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size,
+                       last_access = excluded.last_access""",
+                    (full_key, kind, payload, size, time.time())
+                )
+                # Recent hits must count before anything is chosen for eviction
+                self._flush_touches(conn)
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning("Resume cache write error: %s", e)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT bytes FROM cache_totals WHERE id = 0").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM cache_entries ORDER BY last_access ASC"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache_entries")
+
+    def stats(self):
+        conn = self._connect()
+        entries, size = conn.execute("SELECT entries, bytes FROM cache_totals WHERE id = 0").fetchone()
+        with self._lock:
+            hits = dict(self.hits)
+            misses = dict(self.misses)
+        return {
+            'entries': entries,
+            'bytes': size,
+            'maxBytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses
+        }
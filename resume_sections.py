@@ -0,0 +1,78 @@
+import re
+
+# Sections in the order the prompt budget is spent on them. "header" is the
+# text before the first heading (name and contact details).
+SECTION_PRIORITY = ['header', 'skills', 'experience', 'projects', 'summary', 'education', 'certifications', 'other']
+
+SECTION_HEADINGS = {
+    'skills': ['skills', 'technical skills', 'key skills', 'core skills', 'core competencies', 'competencies',
+               'technologies', 'tech stack', 'tools', 'tools and technologies', 'skills and tools',
+               'technical expertise', 'areas of expertise'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment', 'employment history',
+                   'work history', 'career history', 'internships', 'internship', 'relevant experience'],
+    'projects': ['projects', 'personal projects', 'academic projects', 'key projects', 'selected projects'],
+    'summary': ['summary', 'profile', 'professional summary', 'career summary', 'objective', 'career objective',
+                'about', 'about me'],
+    'education': ['education', 'academic background', 'academics', 'qualifications',
+                  'educational qualifications', 'academic qualifications'],
+    'certifications': ['certifications', 'certificates', 'courses', 'training', 'achievements', 'awards',
+                       'publications'],
+    'other': ['languages', 'interests', 'hobbies', 'references', 'personal details', 'declaration',
+              'extracurricular activities', 'volunteering'],
+}
+HEADING_KINDS = {heading: kind for kind, headings in SECTION_HEADINGS.items() for heading in headings}
+MAX_HEADING_CHARS = 40
+NON_LETTER_PATTERN = re.compile(r"[^a-z ]+")
+
+def heading_kind(line):
+    """Section kind of a heading line such as "TECHNICAL SKILLS:", or None"""
+    if len(line) > MAX_HEADING_CHARS:
+        return None
+    key = NON_LETTER_PATTERN.sub(" ", line.lower().replace("&", " and "))
+    return HEADING_KINDS.get(" ".join(key.split()))
+
+def split_sections(text):
+    """Split resume text into [(kind, text)] in document order"""
+    sections = []
+    kind = 'header'
+    lines = []
+    for line in text.splitlines(keepends=True):
+        new_kind = heading_kind(line.strip())
+        if new_kind is not None:
+            if lines:
+                sections.append((kind, "".join(lines)))
+            kind = new_kind
+            lines = []
+        lines.append(line)
+    if lines:
+        sections.append((kind, "".join(lines)))
+    return sections
+
+def _cut(text, max_chars):
+    """``text`` shortened to ``max_chars``, at a line break when one is close"""
+    cut = text[:max_chars]
+    newline = cut.rfind("\n")
+    return cut[:newline + 1] if newline > max_chars // 2 else cut
+
+def budget_sections(text, max_chars):
+    """Keep at most ``max_chars`` of ``text``, spending the budget on the highest-value sections first.
+
+    Sections are visited in priority order twice: first each may take up to
+    a quarter of the budget, so one oversized section (say a portfolio
+    appended under "Skills") cannot crowd out the rest, then leftover budget
+    extends them in the same order. Kept text stays in document order.
+    """
+    if len(text) <= max_chars:
+        return text
+    sections = split_sections(text)
+    ranked = sorted(range(len(sections)), key=lambda i: (SECTION_PRIORITY.index(sections[i][0]), i))
+    share = max(1, max_chars // 4)
+    sizes = [0] * len(sections)
+    remaining = max_chars
+    for cap in (share, max_chars):
+        for i in ranked:
+            grant = min(len(sections[i][1]), cap, sizes[i] + remaining) - sizes[i]
+            if grant > 0:
+                sizes[i] += grant
+                remaining -= grant
+    return "".join(_cut(sections[i][1], sizes[i]) for i in range(len(sections)) if sizes[i])
@@ -0,0 +1,280 @@
+import os
+import json
+import time
+import queue
+import logging
+import sqlite3
+import threading
+from lazy_loading import LazyModule
+from metrics import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Only the legacy Excel import needs openpyxl
+openpyxl = LazyModule('openpyxl')
+
+STORE_FILE = os.environ.get('RESUME_STORE_FILE', 'data/resumes.sqlite3')
+# Most rows written in one transaction, and how long the writer waits for more
+GROUP_COMMIT_MAX = int(os.environ.get('GROUP_COMMIT_MAX', 500))
+GROUP_COMMIT_LINGER = float(os.environ.get('GROUP_COMMIT_LINGER_MS', 5)) / 1000
+
+def resume_row(resume):
+    """The spreadsheet row for a parsed resume"""
+    # Convert lists to comma-separated strings
+    skills = ", ".join(resume.get("skills", []))
+    software = ", ".join(resume.get("used_software", []))
+    return [
+        resume.get("name", ""),
+        resume.get("email", ""),
+        resume.get("phone_number", ""),
+        resume.get("experience_in_years", ""),
+        skills,
+        software,
+        resume.get("expected_domain", "")
+    ]
+
+class _PendingWrite:
+    __slots__ = ('resume', 'done', 'id', 'error')
+
+    def __init__(self, resume, wait):
+        self.resume = resume
+        self.done = threading.Event() if wait else None
+        self.id = None
+        self.error = None
+
+# -------- Candidate Store --------
+class ResumeStore:
+    """Append-only SQLite (WAL) system of record for parsed resumes.
+
+    Every insert goes through one writer thread that drains its queue and
+    commits whatever has accumulated in a single transaction (group commit),
+    so the cost per row stays constant no matter how many rows exist.
+    """
+
+    def __init__(self, path=STORE_FILE, batch_size=GROUP_COMMIT_MAX, linger=GROUP_COMMIT_LINGER):
+        self.path = path
+        self.batch_size = batch_size
+        self.linger = linger
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self.indexes = []
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            # experience_in_years has no declared type so numbers and strings keep their form
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS candidates (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT,
+                    email TEXT,
+                    phone_number TEXT,
+                    experience_in_years,
+                    skills TEXT,
+                    used_software TEXT,
+                    expected_domain TEXT,
+                    filename TEXT,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_created ON candidates(created_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def connection(self):
+        """This thread's read connection"""
+        return self._connect()
+
+    # -------- Derived Indexes --------
+    def register_index(self, index):
+        """Attach a derived index that is updated in the same transaction as each insert.
+
+        ``index`` provides ``create(conn)``, ``is_built(conn)``, ``mark_built(conn)``
+        and ``on_insert(conn, candidate_id, resume)``. Indexes added to an
+        existing store are backfilled once from the stored candidates.
+        """
+        conn = self._connect()
+        with conn:
+            index.create(conn)
+        if not index.is_built(conn):
+            with conn:
+                # Re-check inside the write transaction in case another process built it
+                conn.execute("BEGIN IMMEDIATE")
+                if not index.is_built(conn):
+                    for candidate_id, resume in self.iter_resumes(conn):
+                        index.on_insert(conn, candidate_id, resume)
+                    index.mark_built(conn)
+        self.indexes.append(index)
+        return index
+
+    # -------- Writes --------
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            with self._writer_lock:
+                if self._writer is None or not self._writer.is_alive():
+                    self._writer = threading.Thread(target=self._write_loop, name='resume-store-writer', daemon=True)
+                    self._writer.start()
+
+    def save(self, resume, wait=True):
+        """Queue a resume for the next group commit.
+
+        With ``wait`` the call blocks until the row is durable and returns
+        its candidate id.
+        """
+        pending = _PendingWrite(resume, wait)
+        self._ensure_writer()
+        self._queue.put(pending)
+        if wait:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.id
+        return None
+
+    def save_many(self, resumes):
+        pending = [_PendingWrite(resume, True) for resume in resumes]
+        self._ensure_writer()
+        for item in pending:
+            self._queue.put(item)
+        ids = []
+        for item in pending:
+            item.done.wait()
+            if item.error is not None:
+                raise item.error
+            ids.append(item.id)
+        return ids
+
+    def flush(self):
+        """Block until everything queued so far is committed"""
+        if self._writer is not None and self._writer.is_alive():
+            marker = _PendingWrite(None, True)
+            self._queue.put(marker)
+            marker.done.wait()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit(conn, batch)
+
+    def _commit(self, conn, batch):
+        writes = [item for item in batch if item.resume is not None]
+        started = time.perf_counter()
+        try:
+            with conn:
+                now = time.time()
+                for item in writes:
+                    item.id = self._insert(conn, item.resume, now)
+        except Exception as e:
+            # Fall back to one transaction per row so one bad row cannot sink the group
+            logger.warning("Resume store group commit failed, retrying rows singly: %s", e)
+            for item in writes:
+                try:
+                    with conn:
+                        item.id = self._insert(conn, item.resume, time.time())
+                except Exception as row_error:
+                    item.error = row_error
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="store_commit")
+        for item in batch:
+            if item.done is not None:
+                item.done.set()
+
+    def _insert(self, conn, resume, now):
+        row = resume_row(resume)
+        cur = conn.execute(
+            """INSERT INTO candidates (name, email, phone_number, experience_in_years, skills,
+                                       used_software, expected_domain, filename, data, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            row + [resume.get("filename", ""), json.dumps(resume), now]
+        )
+        for index in self.indexes:
+            index.on_insert(conn, cur.lastrowid, resume)
+        return cur.lastrowid
+
+    def pending_writes(self):
+        """Rows queued for the writer thread but not yet committed"""
+        return self._queue.qsize()
+
+    # -------- Reads --------
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def iter_rows(self):
+        """Yield spreadsheet-shaped rows in insertion order without loading them all"""
+        cur = self._connect().execute(
+            """SELECT name, email, phone_number, experience_in_years, skills, used_software, expected_domain
+               FROM candidates ORDER BY id"""
+        )
+        for row in cur:
+            yield row
+
+    def iter_resumes(self, conn=None):
+        """Yield (candidate id, parsed resume dict) in insertion order"""
+        cur = (conn or self._connect()).execute("SELECT id, data FROM candidates ORDER BY id")
+        for candidate_id, data in cur:
+            yield candidate_id, json.loads(data)
+
+    def get_many(self, ids):
+        """Map of candidate id -> parsed resume for the ids that exist"""
+        ids = list(ids)
+        found = {}
+        conn = self._connect()
+        for start in range(0, len(ids), 900):
+            batch = ids[start:start + 900]
+            placeholders = ",".join("?" * len(batch))
+            for candidate_id, data in conn.execute(
+                f"SELECT id, data FROM candidates WHERE id IN ({placeholders})", batch
+            ):
+                found[candidate_id] = json.loads(data)
+        return found
+
+    def recent(self, limit=5):
+        rows = self._connect().execute(
+            "SELECT id, name, filename, created_at FROM candidates ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [{'id': row[0], 'name': row[1], 'filename': row[2], 'created_at': row[3]} for row in rows]
+
+    # -------- Excel --------
+    def import_excel(self, path):
+        """One-off import of a legacy resumes_data.xlsx into an empty store"""
+        if self.count() or not os.path.exists(path):
+            return 0
+        wb = openpyxl.load_workbook(path, read_only=True)
+        try:
+            resumes = []
+            for row in wb.active.iter_rows(min_row=2, values_only=True):
+                if not row or not any(row):
+                    continue
+                row = list(row) + [None] * (7 - len(row))
+                resumes.append({
+                    "name": row[0] or "",
+                    "email": row[1] or "",
+                    "phone_number": row[2] or "",
+                    "experience_in_years": row[3] if row[3] is not None else "",
+                    "skills": [s.strip() for s in str(row[4] or "").split(",") if s.strip()],
+                    "used_software": [s.strip() for s in str(row[5] or "").split(",") if s.strip()],
+                    "expected_domain": row[6] or ""
+                })
+        finally:
+            wb.close()
+        for start in range(0, len(resumes), self.batch_size):
+            self.save_many(resumes[start:start + self.batch_size])
+        return len(resumes)
+
+    def close(self):
+        self.flush()
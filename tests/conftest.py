@@ -0,0 +1,25 @@
+import os
+import sys
+import tempfile
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Importing main opens its stores; keep them out of the working tree and skip warm-up
+_DATA_DIR = tempfile.mkdtemp(prefix='techcruit-tests-')
+for _name, _file in (('BATCH_JOBS_FILE', 'batch_jobs.sqlite3'), ('RESUME_STORE_FILE', 'resumes.sqlite3'),
+                     ('RESUME_CACHE_FILE', 'resume_cache.sqlite3'), ('BULK_UPLOAD_DIR', 'bulk')):
+    os.environ.setdefault(_name, os.path.join(_DATA_DIR, _file))
+os.environ.setdefault('PRELOAD_SERVICES', '0')
+
+from benchmarks.stub_groq import StubGroqServer
+
+@pytest.fixture
+def stub_groq():
+    """Start a stub Groq server; tests tune its failure rates before calling it"""
+    server = StubGroqServer().start()
+    try:
+        yield server
+    finally:
+        server.stop()
@@ -0,0 +1,75 @@
+import asyncio
+from flask import Flask, jsonify, request
+from asgi import AsyncApp, AsyncStream
+
+def make_app():
+    flask_app = Flask(__name__)
+    flask_app.config['MAX_CONTENT_LENGTH'] = 1000
+
+    @flask_app.route('/echo', methods=['POST'])
+    def echo():
+        # Read the way the bulk upload route copies its body to disk
+        sizes = []
+        while True:
+            chunk = request.stream.read(64)
+            if not chunk:
+                break
+            sizes.append(len(chunk))
+        return jsonify({'read': sum(sizes), 'chunks': len(sizes)})
+
+    @flask_app.after_request
+    def tag(response):
+        response.headers['X-Hook'] = 'ran'
+        return response
+
+    async def analyze():
+        await asyncio.sleep(0)
+        return jsonify({'body': request.get_data(as_text=True)})
+
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"data: {i}\n\n"
+        return AsyncStream(chunks(), 'text/event-stream')
+
+    return AsyncApp(flask_app, {('POST', '/analyze'): analyze, ('GET', '/stream'): stream}, threads=2)
+
+def call(app, method, path, chunks=(b'',), content_length=None):
+    headers = [(b'content-type', b'application/octet-stream')]
+    if content_length is not None:
+        headers.append((b'content-length', str(content_length).encode()))
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': b'', 'headers': headers}
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1}
+                for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    return start['status'], dict(start['headers']), b"".join(message.get('body', b'') for message in sent[1:])
+
+def test_wsgi_routes_read_the_body_as_it_arrives():
+    status, headers, body = call(make_app(), 'POST', '/echo', [b'x' * 300, b'y' * 300], content_length=600)
+    assert status == 200 and headers[b'x-hook'] == b'ran'
+    assert body == b'{"chunks":10,"read":600}\n'
+
+def test_async_routes_run_with_the_request_and_hooks():
+    status, headers, body = call(make_app(), 'POST', '/analyze', [b'hello ', b'world'])
+    assert status == 200 and headers[b'x-hook'] == b'ran'
+    assert body == b'{"body":"hello world"}\n'
+
+def test_async_streams_are_sent_chunk_by_chunk():
+    status, headers, body = call(make_app(), 'GET', '/stream')
+    assert status == 200 and headers[b'content-type'].startswith(b'text/event-stream')
+    assert body == b"data: 0\n\ndata: 1\n\ndata: 2\n\n"
+
+def test_oversized_bodies_are_rejected_before_reading():
+    assert call(make_app(), 'POST', '/echo', [b'x' * 10], content_length=5000)[0] == 413
+    # Without a Content-Length the body is read until it passes the limit
+    assert call(make_app(), 'POST', '/echo', [b'x' * 600, b'x' * 600])[0] == 413
+    assert call(make_app(), 'POST', '/analyze', [b'x' * 600, b'x' * 600])[0] == 413
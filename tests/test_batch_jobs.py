@@ -0,0 +1,69 @@
+import os
+import threading
+import pytest
+import batch_jobs
+from batch_jobs import BatchJobEngine, BatchJobStore
+
+def process(filename, data):
+    if data == b'bad':
+        raise ValueError('unreadable')
+    return {'filename': filename, 'status': 'success', 'size': len(data)}
+
+@pytest.fixture
+def store(tmp_path):
+    return BatchJobStore(os.path.join(tmp_path, 'jobs.sqlite3'))
+
+def run_job(store, files):
+    engine = BatchJobEngine(store, process, workers=2)
+    job_id = engine.submit(files)
+    engine.executor.shutdown(wait=True)
+    return store.get_job(job_id)
+
+def test_job_completes_with_results_in_file_order(store):
+    job = run_job(store, [('a.pdf', b'aa'), ('b.pdf', b'bbb'), ('c.pdf', b'c')])
+    assert job['status'] == 'completed'
+    assert (job['processed'], job['errors'], job['progress']) == (3, 0, 100)
+    assert [result['filename'] for result in job['results']] == ['a.pdf', 'b.pdf', 'c.pdf']
+    assert [result['size'] for result in job['results']] == [2, 3, 1]
+
+def test_failures_are_recorded_per_file(store):
+    job = run_job(store, [('a.pdf', b'aa'), ('b.pdf', b'bad')])
+    assert job['status'] == 'partial'
+    assert job['results'][1] == {'filename': 'b.pdf', 'status': 'error', 'message': 'unreadable'}
+    assert run_job(store, [('b.pdf', b'bad')])['status'] == 'failed'
+
+def test_a_file_is_claimed_once_until_its_lease_expires(store, monkeypatch):
+    job_id = store.create_job([('a.pdf', b'aa')])
+    assert store.claim_file(job_id, 0)[:2] == ('a.pdf', b'aa')
+    assert store.claim_file(job_id, 0) is None
+    assert store.resumable_files() == []
+    # A worker that died mid-file leaves the claim behind; once the lease lapses it is handed out again
+    monkeypatch.setattr(batch_jobs, 'BATCH_LEASE_SECONDS', -1)
+    assert store.resumable_files() == [(job_id, 0)]
+    assert store.claim_file(job_id, 0) is not None
+
+def test_resume_runs_files_left_by_a_previous_process(store):
+    job_id = store.create_job([('a.pdf', b'aa'), ('b.pdf', b'bb')])
+    store.claim_file(job_id, 0)
+    engine = BatchJobEngine(store, process, workers=2)
+    # The running file is still leased to the dead worker; only the queued one is resumed
+    assert engine.resume_pending() == 1
+    engine.executor.shutdown(wait=True)
+    job = store.get_job(job_id, include_results=False)
+    assert (job['status'], job['processed']) == ('running', 1)
+
+def test_resume_skips_files_queued_in_this_process(store):
+    release = threading.Event()
+
+    def blocking(filename, data):
+        release.wait(5)
+        return process(filename, data)
+
+    engine = BatchJobEngine(store, blocking, workers=1)
+    job_id = engine.submit([('a.pdf', b'aa'), ('b.pdf', b'bb')])
+    try:
+        assert engine.resume_pending() == 0
+    finally:
+        release.set()
+        engine.executor.shutdown(wait=True)
+    assert store.get_job(job_id)['processed'] == 2
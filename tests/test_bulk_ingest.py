@@ -0,0 +1,122 @@
+import io
+import os
+import time
+import zipfile
+import pytest
+import bulk_ingest
+from batch_jobs import BatchJobEngine, BatchJobStore
+from bulk_ingest import BulkIngest, BulkUploadError, BulkUploadStore, iter_archive_members
+
+def docx_bytes():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as docx:
+        docx.writestr('word/document.xml', '<w:document/>')
+    return buffer.getvalue()
+
+def archive_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+MEMBERS = [
+    ('cvs/', b''),
+    ('cvs/ada.pdf', b'%PDF-1.4 ada'),
+    ('cvs/notes.txt', b'not a resume'),
+    ('__MACOSX/cvs/._ada.pdf', b'%PDF-1.4 metadata'),
+    ('cvs/alan.docx', docx_bytes()),
+    ('cvs/.hidden.pdf', b'%PDF-1.4 hidden'),
+    ('grace.pdf', b'%PDF-1.4 grace'),
+]
+
+def process(filename, data):
+    return {'filename': filename, 'status': 'success'}
+
+@pytest.fixture
+def ingest(tmp_path):
+    path = os.path.join(tmp_path, 'jobs.sqlite3')
+    engine = BatchJobEngine(BatchJobStore(path), process, workers=2)
+    yield BulkIngest(BulkUploadStore(path), engine, os.path.join(tmp_path, 'bulk'))
+    engine.executor.shutdown(wait=True)
+
+def wait_for(ingest, upload_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        upload = ingest.get(upload_id)
+        if upload['status'] not in ('uploading', 'ingesting'):
+            return upload
+        time.sleep(0.01)
+    raise AssertionError(f"upload still {upload['status']}")
+
+def wait_for_job(ingest, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = ingest.engine.store.get_job(job_id)
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job still {job['status']}")
+
+def test_only_resumes_are_taken_from_an_archive():
+    with zipfile.ZipFile(io.BytesIO(archive_bytes(MEMBERS))) as archive:
+        taken = [info.filename for _, info, data in iter_archive_members(archive) if data is not None]
+    assert taken == ['cvs/ada.pdf', 'cvs/alan.docx', 'grace.pdf']
+
+def test_chunked_upload_feeds_a_job(ingest):
+    data = archive_bytes(MEMBERS)
+    upload = ingest.create('resumes.zip', len(data))
+    middle = len(data) // 2
+    assert ingest.write_chunk(upload['id'], 0, io.BytesIO(data[:middle]))['received'] == middle
+    # A client that lost track of the offset is told where to resume
+    with pytest.raises(BulkUploadError) as error:
+        ingest.write_chunk(upload['id'], 0, io.BytesIO(data))
+    assert (error.value.status, error.value.offset) == (409, middle)
+    ingest.write_chunk(upload['id'], middle, io.BytesIO(data[middle:]))
+    upload = wait_for(ingest, upload['id'])
+    assert (upload['status'], upload['members_read'], upload['skipped']) == ('done', len(MEMBERS), 4)
+    job = wait_for_job(ingest, upload['job_id'])
+    assert job['status'] == 'completed'
+    assert job['sealed'] and job['total'] == 3
+    assert [result['filename'] for result in job['results']] == ['cvs/ada.pdf', 'cvs/alan.docx', 'grace.pdf']
+    assert not os.path.exists(os.path.join(ingest.directory, f"{upload['id']}.zip"))
+
+def test_uploads_are_validated(ingest):
+    with pytest.raises(BulkUploadError):
+        ingest.create('resumes.zip', 0)
+    with pytest.raises(BulkUploadError) as error:
+        ingest.create('resumes.zip', bulk_ingest.BULK_MAX_BYTES + 1)
+    assert error.value.status == 413
+    upload = ingest.create('resumes.zip', 4)
+    with pytest.raises(BulkUploadError) as error:
+        ingest.write_chunk(upload['id'], 0, io.BytesIO(b'12345'))
+    assert error.value.status == 413
+    with pytest.raises(BulkUploadError) as error:
+        ingest.get('missing')
+    assert error.value.status == 404
+
+def test_a_file_that_is_not_a_zip_fails(ingest):
+    upload = ingest.create('resumes.zip', 4)
+    assert ingest.write_chunk(upload['id'], 0, io.BytesIO(b'oops'))['status'] == 'failed'
+    assert ingest.get(upload['id'])['error'] == 'Not a ZIP archive'
+
+def test_a_dead_walk_is_taken_over_where_it_stopped(ingest):
+    data = archive_bytes(MEMBERS)
+    upload = ingest.create('resumes.zip', len(data))
+    with open(os.path.join(ingest.directory, f"{upload['id']}.zip"), 'wb') as f:
+        f.write(data)
+    # A walk that recorded the first two members, then its process died
+    job_id = ingest.engine.store.open_job()
+    lease = ingest.store.start_ingest(upload['id'], job_id)
+    ingest.store.advance(upload['id'], lease, 1, 1)
+    ingest.store.advance(upload['id'], lease, 2, 1, job_id, 'cvs/ada.pdf', b'%PDF-1.4 ada')
+    # It holds a live lease, so nothing is taken over yet
+    assert ingest.resume_pending() == 0
+    with ingest.store._connect() as conn:
+        conn.execute("UPDATE bulk_uploads SET claimed_at = 0 WHERE id = ?", (upload['id'],))
+    assert ingest.resume_pending() == 1
+    assert wait_for(ingest, upload['id'])['status'] == 'done'
+    # The previously stored member is still queued in the job; run it as the batch engine would on restart
+    ingest.engine.dispatch(job_id, 0)
+    job = wait_for_job(ingest, job_id)
+    assert [result['filename'] for result in job['results']] == ['cvs/ada.pdf', 'cvs/alan.docx', 'grace.pdf']
@@ -0,0 +1,89 @@
+import sqlite3
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+import candidate_analytics
+from candidate_analytics import CandidateColumns
+
+def at(day):
+    return datetime.strptime(day, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()
+
+# (created, experience, skills, domain)
+ROWS = [
+    (at('2026-01-05'), 2, 'Python, SQL', 'Data Science'),
+    (at('2026-01-20'), '5 years', 'python, Docker', 'Data Science'),
+    (at('2026-02-03'), 8, 'Java, SQL, Docker', 'Backend'),
+    (at('2026-02-10'), None, 'Python', 'Backend'),
+    (at('2026-04-01'), 1, 'SQL', ''),
+]
+
+def insert(conn, rows):
+    conn.executemany(
+        "INSERT INTO candidates (created_at, experience_in_years, skills, expected_domain) VALUES (?, ?, ?, ?)", rows
+    )
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("""CREATE TABLE candidates (id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL,
+                    experience_in_years, skills TEXT, expected_domain TEXT)""")
+    insert(conn, ROWS)
+    return conn
+
+@pytest.fixture
+def columns(conn):
+    columns = CandidateColumns()
+    assert columns.sync(conn) == len(ROWS)
+    return columns
+
+def test_sync_appends_only_new_candidates(conn, columns, monkeypatch):
+    assert columns.sync(conn) == 0
+    monkeypatch.setattr(candidate_analytics, 'LOAD_BATCH', 2)
+    insert(conn, ROWS * 3)
+    assert columns.sync(conn) == 15
+    assert len(columns) == 20
+    assert columns.top_skills()['skills'][0] == {'skill': 'Python', 'count': 12, 'share': 0.6}
+
+def test_top_skills_are_counted_once_per_candidate(columns):
+    result = columns.top_skills()
+    assert result['candidates'] == 5
+    assert [(skill['skill'], skill['count']) for skill in result['skills']] == [
+        ('Python', 3), ('SQL', 3), ('Docker', 2), ('Java', 1)]
+    # Ties go to the skill seen first
+    assert columns.top_skills(limit=1, domain='backend')['skills'] == [{'skill': 'Python', 'count': 1, 'share': 0.5}]
+    assert columns.top_skills(min_experience=3)['candidates'] == 2
+
+def test_cooccurrence_counts_candidates_per_pair(columns):
+    result = columns.cooccurrence(skills=['sql', 'Docker', 'PYTHON'])
+    assert result['skills'] == ['SQL', 'Docker', 'Python']
+    assert result['counts'] == [[3, 1, 1], [1, 2, 1], [1, 1, 3]]
+    assert columns.cooccurrence(top=2)['skills'] == ['Python', 'SQL']
+    with pytest.raises(ValueError):
+        columns.cooccurrence(skills=['COBOL'])
+
+def test_percentiles_match_numpy(columns):
+    result = columns.experience_percentiles(percentiles=(25, 50, 90))
+    known = [2, 5, 8, 1]
+    assert result['overall']['count'] == 4
+    assert result['overall']['p50'] == round(float(np.percentile(known, 50)), 2)
+    assert result['overall']['p90'] == round(float(np.percentile(known, 90)), 2)
+    domains = {group['domain']: group for group in result['domains']}
+    assert domains['Data Science']['count'] == 2 and domains['Data Science']['p50'] == 3.5
+    assert domains['Backend']['count'] == 1 and domains['Backend']['mean'] == 8.0
+    assert domains['Unknown']['count'] == 1
+    assert columns.experience_percentiles(domain='nowhere')['overall'] is None
+
+def test_trends_fill_empty_periods(columns):
+    result = columns.trends('month', skill='python')
+    assert [period['period'] for period in result['periods']] == ['2026-01', '2026-02', '2026-03', '2026-04']
+    assert [period['candidates'] for period in result['periods']] == [2, 2, 0, 1]
+    assert [period['with_skill'] for period in result['periods']] == [2, 1, 0, 0]
+    assert [period['median_experience'] for period in result['periods']] == [3.5, 8.0, None, 1.0]
+    assert result['skill'] == 'Python'
+
+def test_weeks_start_on_monday(columns):
+    periods = columns.trends('week', since=at('2026-02-01'), until=at('2026-03-01'))['periods']
+    # 2026-02-03 and 2026-02-10 are Tuesdays
+    assert [period['period'] for period in periods] == ['2026-02-02', '2026-02-09']
+    with pytest.raises(ValueError):
+        columns.trends('fortnight')
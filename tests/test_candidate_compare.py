@@ -0,0 +1,57 @@
+import sqlite3
+import pytest
+from candidate_compare import candidate_terms, compare_candidates, text_ngrams
+from candidate_search import CandidateIndex
+
+CANDIDATES = [
+    (1, {'name': 'Ada', 'skills': ['Python', 'Machine Learning'], 'used_software': ['Docker'],
+         'experience_in_years': 5, 'expected_domain': 'Data Science'}),
+    (2, {'name': 'Alan', 'skills': 'python, django', 'used_software': ['PostgreSQL'],
+         'experience_in_years': '3 years', 'expected_domain': 'Backend Development'}),
+    (3, {'name': 'Grace', 'skills': ['Java', 'Spring'], 'used_software': ['Docker', 'Kubernetes'],
+         'experience_in_years': 12, 'expected_domain': 'Backend Development'}),
+]
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    index = CandidateIndex()
+    index.create(conn)
+    for candidate_id, resume in CANDIDATES:
+        index.on_insert(conn, candidate_id, resume)
+    # A candidate outside the comparison still counts towards document frequencies
+    index.on_insert(conn, 4, {'skills': ['Python', 'Kubernetes'], 'experience_in_years': 1})
+    return conn
+
+def test_terms_and_ngrams_are_normalised():
+    assert candidate_terms(CANDIDATES[1][1]) == {'python', 'django', 'postgresql'}
+    assert {'machine learning', 'python', 'c++'} <= text_ngrams('Machine learning in Python, C++.')
+
+def test_job_description_ranks_by_matched_skills(conn):
+    result = compare_candidates(conn, CANDIDATES, 'We need machine learning with Python and Docker')
+    assert result['query_terms'] == ['docker', 'machine learning', 'python']
+    assert result['winner'] == 1
+    assert [entry['id'] for entry in result['ranking']] == [1, 3, 2]
+    matrix = result['comparison_matrix']
+    assert matrix['experience'] == [5.0, 3.0, 12.0]
+    assert matrix['experience_score'] == [50.0, 30.0, 100.0]
+    assert matrix['domain_match'] == [0.0, 0.0, 0.0]
+    assert result['insights'][0] == 'Ada matches 3/3 job skills and has the best overall fit'
+
+def test_domain_words_in_the_job_description_count(conn):
+    result = compare_candidates(conn, CANDIDATES, 'Backend development role using Java and Spring')
+    assert result['comparison_matrix']['domain_match'] == [0.0, 100.0, 100.0]
+    assert result['winner'] == 3
+
+def test_without_job_description_scores_skill_breadth(conn):
+    result = compare_candidates(conn, CANDIDATES)
+    assert 'domain_match' not in result['comparison_matrix']
+    assert max(result['comparison_matrix']['technical_skills']) == 100.0
+    assert result['query_terms'] == []
+    assert 'Grace has the most experience (12 years)' in result['insights']
+
+def test_similarity_is_cosine_of_shared_skills(conn):
+    similarity = compare_candidates(conn, CANDIDATES)['similarity']
+    assert [similarity[i][i] for i in range(3)] == [1.0, 1.0, 1.0]
+    assert similarity[0][1] == similarity[1][0] > 0
+    assert similarity[1][2] == 0.0
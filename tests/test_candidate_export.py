@@ -0,0 +1,84 @@
+import io
+import os
+import csv
+import json
+import zipfile
+import openpyxl
+import pytest
+import candidate_export
+from candidate_export import export_candidates
+from candidate_search import CandidateIndex
+from resume_store import ResumeStore
+
+CANDIDATES = [
+    {'name': 'Ada', 'email': 'ada@example.com', 'skills': ['Python', 'SQL'], 'used_software': ['Docker'],
+     'experience_in_years': 5, 'expected_domain': 'Data Science', 'filename': 'ada.pdf'},
+    {'name': 'Alan', 'email': 'alan@example.com', 'skills': ['Java'], 'used_software': [],
+     'experience_in_years': '3 years', 'expected_domain': 'Backend Development', 'filename': 'alan.pdf'},
+    {'name': 'Grace \x01Hopper', 'skills': ['Python', 'COBOL'], 'experience_in_years': 12, 'filename': 'grace.docx'},
+]
+
+@pytest.fixture
+def conn(tmp_path):
+    store = ResumeStore(os.path.join(tmp_path, 'resumes.sqlite3'))
+    store.register_index(CandidateIndex())
+    store.save_many(CANDIDATES)
+    return store.connection()
+
+def export(conn, fmt, **filters):
+    return b"".join(export_candidates(conn, fmt, **filters))
+
+def test_csv_has_a_header_and_one_row_per_candidate(conn):
+    rows = list(csv.reader(io.StringIO(export(conn, 'csv', sort='experience_asc').decode('utf-8'))))
+    assert rows[0] == candidate_export.EXPORT_FIELDS
+    assert [row[1] for row in rows[1:]] == ['Alan', 'Ada', 'Grace \x01Hopper']
+    assert rows[2][4:6] == ['5', 'Python, SQL']
+    assert rows[2][-1].endswith('+00:00')
+
+def test_jsonl_round_trips_the_stored_resume(conn):
+    lines = export(conn, 'jsonl', query='python', sort='experience_asc').decode('utf-8').splitlines()
+    candidates = [json.loads(line) for line in lines]
+    assert [candidate['name'] for candidate in candidates] == ['Ada', 'Grace \x01Hopper']
+    assert candidates[0]['skills'] == ['Python', 'SQL']
+    assert isinstance(candidates[0]['id'], int) and isinstance(candidates[0]['created_at'], float)
+
+def test_filters_are_those_of_search(conn):
+    assert export(conn, 'jsonl', min_experience=4, domain='Backend Development') == b""
+    assert export(conn, 'jsonl', domain='Backend Development').count(b"\n") == 1
+
+def test_bad_query_fails_before_streaming(conn):
+    with pytest.raises(ValueError):
+        export_candidates(conn, 'csv', query='(python')
+
+def test_xlsx_is_a_valid_workbook(conn):
+    wb = openpyxl.load_workbook(io.BytesIO(export(conn, 'xlsx', sort='experience_asc')), read_only=True)
+    rows = list(wb.active.iter_rows(values_only=True))
+    assert rows[0][:2] == ('ID', 'Name')
+    assert [row[1] for row in rows[1:]] == ['Alan', 'Ada', 'Grace Hopper']
+    assert rows[1][4] == '3 years' and rows[2][4] == 5
+    assert rows[3][2] is None
+
+def test_xlsx_writes_non_finite_numbers_as_empty_cells(tmp_path):
+    store = ResumeStore(os.path.join(tmp_path, 'resumes.sqlite3'))
+    store.register_index(CandidateIndex())
+    store.save_many([{'name': 'NaN', 'experience_in_years': float('nan')},
+                     {'name': 'Inf', 'experience_in_years': float('-inf')}])
+    data = export(store.connection(), 'xlsx')
+    with zipfile.ZipFile(io.BytesIO(data)) as package:
+        sheet = package.read('xl/worksheets/sheet1.xml').lower()
+    assert b"nan</v>" not in sheet and b"inf</v>" not in sheet
+    rows = list(openpyxl.load_workbook(io.BytesIO(data), read_only=True).active.iter_rows(values_only=True))
+    assert sorted((row[1], row[4]) for row in rows[1:]) == [('Inf', None), ('NaN', None)]
+
+def test_parquet_keeps_types_across_row_groups(conn):
+    pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+    data = b"".join(export_candidates(conn, 'parquet', sort='experience_asc'))
+    table = pq.read_table(io.BytesIO(data))
+    assert table.num_rows == 3
+    assert table.column('name').to_pylist() == ['Alan', 'Ada', 'Grace \x01Hopper']
+    assert table.column('experience_in_years').to_pylist() == ['3 years', '5', '12']
+    assert str(table.schema.field('created_at').type) == 'timestamp[us, tz=UTC]'
+    rows = list(candidate_export.iter_candidates(conn, candidate_export.EXPORT_FIELDS, sort='experience_asc'))
+    grouped = pq.ParquetFile(io.BytesIO(b"".join(candidate_export.parquet_chunks(iter(rows), batch_rows=2))))
+    assert grouped.num_row_groups == 2
@@ -0,0 +1,105 @@
+import json
+import sqlite3
+import pytest
+from candidate_search import (MAX_PER_PAGE, CandidateIndex, clamp_page, compile_query, parse_query,
+                              search_candidates, tokenize)
+
+CANDIDATES = {
+    1: {'skills': ['Python', 'Machine Learning'], 'used_software': ['Docker'], 'experience_in_years': 5,
+        'expected_domain': 'Data Science'},
+    2: {'skills': 'python, django', 'used_software': ['PostgreSQL'], 'experience_in_years': '3 years',
+        'expected_domain': 'Backend Development'},
+    3: {'skills': ['Java', 'Spring'], 'used_software': ['Docker', 'Kubernetes'], 'experience_in_years': 8,
+        'expected_domain': 'Backend Development'},
+    4: {'skills': ['React', 'TypeScript'], 'used_software': ['python'], 'experience_in_years': 1,
+        'expected_domain': 'Web Development'},
+}
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE candidates (id INTEGER PRIMARY KEY, data TEXT NOT NULL, created_at REAL NOT NULL)")
+    index = CandidateIndex()
+    index.create(conn)
+    for candidate_id, resume in CANDIDATES.items():
+        conn.execute("INSERT INTO candidates (id, data, created_at) VALUES (?, ?, ?)",
+                     (candidate_id, json.dumps(resume), 1700000000.0 + candidate_id))
+        index.on_insert(conn, candidate_id, resume)
+    return conn
+
+def matches(conn, query):
+    params = []
+    sql = compile_query(parse_query(query), params)
+    return sorted(row[0] for row in conn.execute(sql, params))
+
+def search(conn, **filters):
+    total, results = search_candidates(conn, **filters)
+    assert total == len(results)
+    return sorted(candidate['id'] for candidate in results)
+
+# -------- Parsing --------
+def test_tokenize_keeps_quoted_phrases_and_upper_cases_operators():
+    assert tokenize('"machine learning" and (docker OR not java)') == [
+        ('term', 'machine learning'), ('AND', None), ('(', None), ('term', 'docker'),
+        ('OR', None), ('NOT', None), ('term', 'java'), (')', None)]
+
+def test_and_binds_tighter_than_or_and_is_implicit():
+    assert parse_query('python django OR java') == (
+        'or', ('and', ('term', None, 'python'), ('term', None, 'django')), ('term', None, 'java'))
+    assert parse_query('python AND (django OR java)') == (
+        'and', ('term', None, 'python'), ('or', ('term', None, 'django'), ('term', None, 'java')))
+
+def test_field_prefixes_and_normalisation():
+    assert parse_query('"Machine  Learning "') == ('term', None, 'machine learning')
+    assert parse_query('Skills:Python') == ('term', 'skill', 'python')
+    assert parse_query('software:Docker') == ('term', 'software', 'docker')
+    # Unknown prefixes are part of the term
+    assert parse_query('c:sharp') == ('term', None, 'c:sharp')
+
+@pytest.mark.parametrize('query', ['(python', 'python)', 'python AND', 'NOT', '""', 'a ( b'])
+def test_invalid_queries_raise_value_error(query):
+    with pytest.raises(ValueError):
+        parse_query(query)
+
+def test_blank_query_parses_to_nothing():
+    assert parse_query('   ') is None
+
+# -------- Compiled SQL --------
+def test_terms_match_either_field_unless_prefixed(conn):
+    assert matches(conn, 'python') == [1, 2, 4]
+    assert matches(conn, 'skill:python') == [1, 2]
+    assert matches(conn, 'software:python') == [4]
+
+def test_boolean_operators(conn):
+    assert matches(conn, 'python docker') == [1]
+    assert matches(conn, 'django OR java') == [2, 3]
+    assert matches(conn, 'docker AND NOT java') == [1]
+    assert matches(conn, 'NOT docker AND python') == [2, 4]
+    assert matches(conn, 'NOT docker') == [2, 4]
+    assert matches(conn, 'NOT (python OR docker)') == []
+    assert matches(conn, '"machine learning" OR (kubernetes AND spring)') == [1, 3]
+
+def test_parameters_are_bound_not_interpolated(conn):
+    params = []
+    sql = compile_query(parse_query("'; DROP TABLE candidate_terms; --"), params)
+    assert 'DROP' not in sql
+    assert conn.execute(sql, params).fetchall() == []
+    assert matches(conn, 'python') == [1, 2, 4]
+
+def test_filters_combine_with_the_query(conn):
+    assert search(conn, query='docker', min_experience=6) == [3]
+    assert search(conn, query='NOT docker', domain='backend development') == [2]
+    assert search(conn, min_experience=2, max_experience=5) == [1, 2]
+    assert search(conn) == [1, 2, 3, 4]
+
+def test_results_are_sorted_and_paginated(conn):
+    total, results = search_candidates(conn, query='docker OR python', sort='experience', page=2, per_page=2)
+    assert total == 4
+    assert [candidate['id'] for candidate in results] == [2, 4]
+    assert results[0]['skills'] == 'python, django' and results[0]['created_at'] == 1700000002.0
+    total, results = search_candidates(conn, per_page=3)
+    assert [candidate['id'] for candidate in results] == [4, 3, 2]
+
+def test_clamp_page():
+    assert clamp_page(0, 0) == (1, 1)
+    assert clamp_page(3, 10 * MAX_PER_PAGE) == (3, MAX_PER_PAGE)
@@ -0,0 +1,46 @@
+import os
+from dashboard_stats import DashboardAggregates, experience_level, split_skills
+from resume_store import ResumeStore
+
+RESUMES = [
+    {'name': 'Ada', 'skills': ['SQL', 'Python'], 'experience_in_years': 1},
+    {'name': 'Alan', 'skills': ['Python', 'Java'], 'experience_in_years': '4 years'},
+    {'name': 'Grace', 'skills': ['Java', 'COBOL'], 'experience_in_years': 12},
+    {'name': 'Linus', 'skills': [], 'experience_in_years': ''},
+]
+
+def test_cells_are_parsed_like_the_spreadsheet():
+    assert split_skills('Python, , SQL ') == ['Python', 'SQL']
+    assert [experience_level(value) for value in (2, '2.5 yrs', 6, 'n/a', '')] == ['Junior', 'Mid', 'Senior', None, None]
+
+def test_aggregates_match_a_full_scan(tmp_path):
+    store = ResumeStore(os.path.join(tmp_path, 'resumes.sqlite3'))
+    aggregates = store.register_index(DashboardAggregates())
+    store.save_many(RESUMES)
+    version, stats = aggregates.snapshot(store.connection())
+    assert version == 4
+    assert stats['resumesProcessed'] == 4
+    # Ties keep the order skills were first seen in
+    assert stats['topSkills'] == [['Python', 2], ['Java', 2], ['SQL', 1], ['COBOL', 1]]
+    assert stats['experienceLevels'] == {'Junior': 1, 'Mid': 1, 'Senior': 1}
+
+def test_snapshot_is_reused_until_a_write(tmp_path):
+    store = ResumeStore(os.path.join(tmp_path, 'resumes.sqlite3'))
+    aggregates = store.register_index(DashboardAggregates())
+    store.save(RESUMES[0])
+    conn = store.connection()
+    _, first = aggregates.snapshot(conn)
+    assert aggregates.snapshot(conn)[1] is first
+    store.save(RESUMES[1])
+    version, second = aggregates.snapshot(conn)
+    assert version == 2 and second['resumesProcessed'] == 2
+
+def test_existing_candidates_are_backfilled_once(tmp_path):
+    path = os.path.join(tmp_path, 'resumes.sqlite3')
+    ResumeStore(path).save_many(RESUMES[:2])
+    store = ResumeStore(path)
+    aggregates = store.register_index(DashboardAggregates())
+    assert aggregates.snapshot(store.connection())[1]['resumesProcessed'] == 2
+    # A second process registering the same index does not count them again
+    other = ResumeStore(path)
+    assert other.register_index(DashboardAggregates()).snapshot(other.connection())[1]['resumesProcessed'] == 2
@@ -0,0 +1,49 @@
+import io
+import docx
+import fitz
+import pytest
+import extraction
+from extraction import UnsupportedFormatError, detect_format, extract_text_from_bytes, extract_texts
+
+def pdf_bytes(*pages):
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+def docx_bytes(*paragraphs):
+    document = docx.Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def test_formats_are_detected_by_content():
+    assert detect_format(pdf_bytes('Jane Doe')) == 'pdf'
+    assert detect_format(b'junk before the header %PDF-1.7') == 'pdf'
+    assert detect_format(docx_bytes('Jane Doe')) == 'docx'
+    # A zip that is not a Word document, and plain text, are not resumes
+    assert detect_format(b'PK\x03\x04 not really a zip') is None
+    assert detect_format(b'Jane Doe, Python') is None
+
+def test_text_comes_from_the_matching_extractor():
+    assert 'Jane Doe' in extract_text_from_bytes(pdf_bytes('Jane Doe'))
+    assert extract_text_from_bytes(docx_bytes('Jane Doe', 'Skills', 'Python')) == 'Jane Doe\nSkills\nPython\n'
+    with pytest.raises(UnsupportedFormatError):
+        extract_text_from_bytes(b'Jane Doe, Python')
+
+def test_pdf_pages_stop_being_read_once_over_budget():
+    pages = [f'Page {i} ' + 'x' * 60 for i in range(20)]
+    text = extract_text_from_bytes(pdf_bytes(*pages), max_chars=100)
+    assert len(text) <= 100
+    assert 'Page 0' in text and 'Page 19' not in text
+
+def test_batch_extraction_returns_errors_in_place(monkeypatch):
+    monkeypatch.setattr(extraction, 'EXTRACT_WORKERS', 1)
+    results = extract_texts([pdf_bytes('Jane Doe'), b'junk', docx_bytes('Alan Turing')])
+    assert 'Jane Doe' in results[0]
+    assert isinstance(results[1], UnsupportedFormatError)
+    assert results[2] == 'Alan Turing\n'
+    stats = extraction.extraction_stats.snapshot()
+    assert stats['unknown']['errors'] >= 1 and stats['docx']['count'] >= 1
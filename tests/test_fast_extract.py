@@ -0,0 +1,47 @@
+from datetime import datetime
+from fast_extract import (KeywordMatcher, SKILL_MATCHER, SOFTWARE_MATCHER, estimate_experience, extract_email,
+                          extract_name, extract_offline, extract_phone, guess_domain, merge_fields)
+
+RESUME = """CURRICULUM VITAE
+JANE DOE
+jane.doe@example.com | +1 (555) 123-4567 | Berlin
+Experience
+Data Engineer, Acme 2018 - 2022
+Built ETL pipelines in Python and PySpark on AWS with Airflow, using k8s and VS Code.
+"""
+
+def test_contact_fields():
+    assert extract_name(RESUME) == 'Jane Doe'
+    assert extract_email(RESUME) == 'jane.doe@example.com'
+    assert extract_phone(RESUME) == '+1 (555) 123-4567'
+    # A year range is not a phone number
+    assert extract_phone('Worked 2018 - 2022 at Acme') == ''
+    assert extract_name('Resume\nsenior engineer at acme corp') == ''
+
+def test_keywords_match_whole_words_in_order_of_appearance():
+    assert SKILL_MATCHER.find(RESUME) == ['ETL', 'Python', 'PySpark', 'AWS', 'Airflow', 'Kubernetes']
+    assert SOFTWARE_MATCHER.find(RESUME) == ['VS Code']
+    assert SKILL_MATCHER.find('JavaScript and C++ but not Javaland') == ['JavaScript', 'C++']
+
+def test_matcher_finds_overlapping_keywords():
+    matcher = KeywordMatcher({'react': 'React', 'react native': 'React Native', 'native': 'Native'})
+    assert matcher.find('React Native apps') == ['React', 'React Native', 'Native']
+
+def test_experience_from_mentions_or_merged_date_ranges():
+    assert estimate_experience('Over 7+ years of experience, 3 yrs in Java') == 7.0
+    assert estimate_experience('Acme 2015 - 2018\nGlobex 2017 to 2020') == 5
+    assert estimate_experience(f'Initech 2020 - present') == datetime.now().year - 2020
+    assert estimate_experience('No dates at all') == 0
+
+def test_offline_fields_guess_a_domain():
+    fields = extract_offline(RESUME)
+    assert fields['experience_in_years'] == 4
+    assert fields['expected_domain'] == 'Data Engineering'
+    assert guess_domain([], []) == ''
+
+def test_local_contact_details_win_over_the_llm():
+    local = {'name': 'Jane Doe', 'email': '', 'skills': ['Python']}
+    llm = {'name': 'J. Doe', 'email': 'jane@example.com', 'skills': ['Python', 'Leadership'], 'expected_domain': 'Data'}
+    assert merge_fields(local, llm) == {'name': 'Jane Doe', 'email': 'jane@example.com',
+                                        'skills': ['Python', 'Leadership'], 'expected_domain': 'Data'}
+    assert merge_fields(local, None) == local
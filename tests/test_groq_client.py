@@ -0,0 +1,131 @@
+import time
+from email.utils import formatdate
+import pytest
+from groq_client import (CLOSED, HALF_OPEN, OPEN, CIRCUIT_OPEN_MESSAGE, CircuitBreaker, GroqClient,
+                         RateLimiter, TokenBucket, parse_retry_after)
+
+def make_client(server, **options):
+    options.setdefault('limiter', RateLimiter(rpm=1000, tpm=1_000_000))
+    options.setdefault('backoff_base', 0.01)
+    return GroqClient("test-key", server.url, "stub-model", hedge_threads=1, **options)
+
+# -------- Token Bucket --------
+def test_bucket_refuses_once_empty_and_refills_at_rate():
+    bucket = TokenBucket(2, per_seconds=1.0)
+    assert bucket.acquire(2, timeout=0)
+    assert not bucket.acquire(1, timeout=0.01)
+    assert 0 < bucket.reserve(1) <= 0.5
+    started = time.monotonic()
+    assert bucket.acquire(1, timeout=1.0)
+    assert 0.3 < time.monotonic() - started < 1.0
+
+def test_bucket_caps_requests_larger_than_capacity():
+    bucket = TokenBucket(5, per_seconds=1.0)
+    assert bucket.acquire(50, timeout=0)
+    assert bucket.available() < 1
+
+def test_bucket_debit_leaves_debt_and_refund_stops_at_capacity():
+    bucket = TokenBucket(10, per_seconds=60.0)
+    bucket.debit(15)
+    assert bucket.available() < 0
+    bucket.refund(100)
+    assert bucket.available() == 10
+
+def test_limiter_returns_request_when_token_quota_times_out():
+    limiter = RateLimiter(rpm=10, tpm=100)
+    assert limiter.acquire(100, timeout=0)
+    requests_left = limiter.requests.available()
+    assert not limiter.acquire(100, timeout=0.01)
+    assert limiter.requests.available() == pytest.approx(requests_left, abs=0.01)
+
+# -------- Retry-After --------
+def test_parse_retry_after_seconds_and_http_dates():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert 55 < parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+def test_429_is_retried_after_retry_after(stub_groq):
+    stub_groq.rate_429 = 1.0
+    stub_groq.retry_after = 1
+    client = make_client(stub_groq, max_retries=1)
+    started = time.monotonic()
+    result = client.chat("hello")
+    assert result == {"error": "Rate limit exceeded - please try again later"}
+    assert stub_groq.requests == 2
+    # One wait of Retry-After (plus jitter below backoff_base) between the two attempts
+    assert 1.0 <= time.monotonic() - started < 2.0
+    # Being throttled says nothing about Groq's health
+    assert client.breaker.state == CLOSED
+
+def test_throttled_calls_succeed_on_retry(stub_groq):
+    stub_groq.rate_429 = 0.5
+    stub_groq.retry_after = 0
+    client = make_client(stub_groq, max_retries=6)
+    for _ in range(5):
+        assert client.chat("hello", max_tokens=10)["choices"][0]["message"]["content"]
+    assert stub_groq.rejected > 0
+    assert stub_groq.requests == 5 + stub_groq.rejected
+
+# -------- Circuit Breaker --------
+def test_breaker_opens_at_error_rate_and_probes_after_cooldown():
+    breaker = CircuitBreaker(calls=10, window=60, min_calls=4, error_rate=0.5, cooldown=0.05)
+    for healthy in (True, False, True):
+        assert breaker.allow()
+        breaker.record(healthy)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN and breaker.degraded()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CLOSED and not breaker.degraded()
+
+def test_failed_probe_reopens_and_neutral_probe_frees_the_slot():
+    breaker = CircuitBreaker(calls=10, window=60, min_calls=1, error_rate=0.5, cooldown=0.05)
+    breaker.allow()
+    breaker.record(False)
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(None)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+def test_neutral_outcomes_never_open_the_circuit():
+    breaker = CircuitBreaker(calls=10, window=60, min_calls=2, error_rate=0.5, cooldown=60)
+    for _ in range(10):
+        breaker.allow()
+        breaker.record(None)
+    assert breaker.state == CLOSED
+
+def test_outcomes_outside_the_window_are_forgotten():
+    breaker = CircuitBreaker(calls=10, window=0.05, min_calls=2, error_rate=0.5, cooldown=60)
+    breaker.allow()
+    breaker.record(False)
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record(True)
+    breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CLOSED
+
+def test_client_fails_fast_while_circuit_is_open(stub_groq):
+    stub_groq.rate_503 = 1.0
+    breaker = CircuitBreaker(calls=10, window=60, min_calls=2, error_rate=0.5, cooldown=60)
+    client = make_client(stub_groq, max_retries=0, breaker=breaker)
+    for _ in range(2):
+        assert client.chat("hello")["error"].startswith("HTTP error 503")
+    assert breaker.state == OPEN
+    assert client.chat("hello") == {"error": CIRCUIT_OPEN_MESSAGE}
+    assert stub_groq.requests == 2
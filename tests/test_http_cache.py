@@ -0,0 +1,54 @@
+import os
+import gzip
+from werkzeug.http import parse_accept_header
+from http_cache import IMMUTABLE, REVALIDATE, CachedBody, StaticAssets, json_etag
+
+SCRIPT = b"console.log('techcruit');\n" * 100
+
+def accept(header):
+    return parse_accept_header(header)
+
+def test_json_etag_ignores_key_order():
+    assert json_etag({'a': 1, 'b': [1, 2]}) == json_etag({'b': [1, 2], 'a': 1})
+    assert json_etag({'a': 1}) != json_etag({'a': 2})
+
+def test_each_encoding_is_its_own_representation():
+    body = CachedBody(SCRIPT, 'application/javascript')
+    encoding, data, etag = body.negotiate(accept('gzip'))
+    assert encoding == 'gzip' and gzip.decompress(data) == SCRIPT
+    assert etag == f"{body.etag}-gzip"
+    assert body.negotiate(accept('identity')) == (None, SCRIPT, body.etag)
+    # Compressed once, then served from memory
+    assert body.negotiate(accept('gzip'))[1] is data
+
+def test_small_or_binary_bodies_are_sent_as_is():
+    assert CachedBody(b"tiny", 'text/plain').negotiate(accept('gzip'))[0] is None
+    assert CachedBody(os.urandom(4096), 'image/png').negotiate(accept('gzip'))[0] is None
+
+def test_no_encoding_when_compression_saves_nothing():
+    body = CachedBody(os.urandom(4096), 'text/plain')
+    assert body.negotiate(accept('gzip')) == (None, body.data, body.etag)
+
+def test_hashed_assets_are_immutable(tmp_path):
+    os.makedirs(os.path.join(tmp_path, 'assets'))
+    for path, data in (('index.html', b'<html></html>'), ('assets/index-B7x_kQ2m.js', SCRIPT)):
+        with open(os.path.join(tmp_path, path), 'wb') as f:
+            f.write(data)
+    assets = StaticAssets(str(tmp_path))
+    assert assets.get('assets/index-B7x_kQ2m.js').cache_control == IMMUTABLE
+    assert assets.get('index.html').cache_control == REVALIDATE
+    assert assets.get('missing.js') is None
+    assert assets.get('../secrets') is None
+    assert assets.warm() == 2
+
+def test_changed_files_are_reloaded(tmp_path):
+    path = os.path.join(tmp_path, 'index.html')
+    with open(path, 'wb') as f:
+        f.write(b'<html>v1</html>')
+    assets = StaticAssets(str(tmp_path))
+    first = assets.get('index.html')
+    assert assets.get('index.html') is first
+    with open(path, 'wb') as f:
+        f.write(b'<html>v2 longer</html>')
+    second = assets.get('index.html')
+    assert second.data == b'<html>v2 longer</html>' and second.etag != first.etag
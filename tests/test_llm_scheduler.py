@@ -0,0 +1,140 @@
+import time
+import threading
+import pytest
+import llm_scheduler
+from llm_scheduler import ANONYMOUS, BULK, INTERACTIVE, FairScheduler, request_tenant
+
+PLANS = {
+    'default': {'weight': 1, 'concurrency': 8, 'tpm': None},
+    'small': {'weight': 1, 'concurrency': 8, 'tpm': None},
+    'big': {'weight': 3, 'concurrency': 8, 'tpm': None},
+    'narrow': {'weight': 1, 'concurrency': 1, 'tpm': None},
+    'metered': {'weight': 1, 'concurrency': 8, 'tpm': 100}
+}
+
+@pytest.fixture(autouse=True)
+def tenant_plans(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, 'TENANT_PLANS',
+                        {'a': 'small', 'b': 'big', 'n': 'narrow', 'm': 'metered'})
+
+def make_scheduler(slots=4, interactive_reserve=1, **options):
+    return FairScheduler(slots, interactive_reserve, plan_limits=PLANS,
+                         queue_timeouts={INTERACTIVE: 5, BULK: 5}, **options)
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+# -------- Weighting --------
+def grant_order(scheduler, backlog):
+    """Tenants in the order a single slot is handed to their queued calls"""
+    holder = scheduler.acquire('holder', INTERACTIVE, 1)
+    order = []
+    lock = threading.Lock()
+
+    def call(tenant):
+        ticket = scheduler.acquire(tenant, INTERACTIVE, 1)
+        with lock:
+            order.append(tenant)
+        scheduler.release(ticket)
+
+    threads = [threading.Thread(target=call, args=(tenant,)) for tenant, count in backlog for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    total = sum(count for _, count in backlog)
+    wait_until(lambda: sum(t['queued'][INTERACTIVE] for t in scheduler.stats()['tenants'].values()) == total)
+    scheduler.release(holder)
+    for thread in threads:
+        thread.join(5)
+    return order
+
+def test_slots_are_shared_in_proportion_to_weight():
+    order = grant_order(make_scheduler(slots=1, interactive_reserve=0), [('a', 12), ('b', 12)])
+    assert len(order) == 24
+    # While both have backlog, the weight-3 tenant gets three calls for each of the other's
+    assert order[:8].count('b') == 6
+
+def test_equal_weights_alternate():
+    order = grant_order(make_scheduler(slots=1, interactive_reserve=0), [('a', 6), ('default-x', 6)])
+    assert order[:6].count('a') == 3
+
+def test_interactive_calls_go_before_queued_bulk():
+    scheduler = make_scheduler(slots=2, interactive_reserve=0)
+    first = scheduler.acquire('a', BULK, 1)
+    second = scheduler.acquire('a', BULK, 1)
+    order = []
+
+    def call(latency_class):
+        ticket = scheduler.acquire('a', latency_class, 1)
+        order.append(latency_class)
+        scheduler.release(ticket)
+
+    bulk = threading.Thread(target=call, args=(BULK,))
+    bulk.start()
+    wait_until(lambda: scheduler.stats()['tenants']['a']['queued'][BULK] == 1)
+    interactive = threading.Thread(target=call, args=(INTERACTIVE,))
+    interactive.start()
+    wait_until(lambda: scheduler.stats()['tenants']['a']['queued'][INTERACTIVE] == 1)
+    scheduler.release(first)
+    for thread in (bulk, interactive):
+        thread.join(5)
+    scheduler.release(second)
+    assert order == [INTERACTIVE, BULK]
+
+# -------- Quotas --------
+def test_concurrency_limit_per_tenant_and_class():
+    scheduler = make_scheduler()
+    ticket = scheduler.acquire('n', INTERACTIVE, 1)
+    assert scheduler.acquire('n', INTERACTIVE, 1, timeout=0.05) is None
+    # The limit is per latency class, and other tenants still get the free slots
+    bulk = scheduler.acquire('n', BULK, 1, timeout=0.05)
+    assert bulk is not None
+    assert scheduler.acquire('a', INTERACTIVE, 1, timeout=0.05) is not None
+    scheduler.release(ticket)
+    assert scheduler.acquire('n', INTERACTIVE, 1, timeout=0.05) is not None
+
+def test_bulk_never_takes_the_interactive_reserve():
+    scheduler = make_scheduler(slots=2, interactive_reserve=1)
+    assert scheduler.acquire('a', BULK, 1) is not None
+    assert scheduler.acquire('b', BULK, 1, timeout=0.05) is None
+    assert scheduler.acquire('b', INTERACTIVE, 1, timeout=0.05) is not None
+
+def test_token_quota_rejects_and_queue_timeout_refunds():
+    scheduler = make_scheduler(slots=1, interactive_reserve=0)
+    ticket = scheduler.acquire('m', INTERACTIVE, 60)
+    # 60 of the 100 tokens are spent, so 60 more are not available in time
+    assert scheduler.acquire('m', INTERACTIVE, 60, timeout=0.05) is None
+    # 30 tokens are, but the only slot is taken: the tokens come back on timeout
+    assert scheduler.acquire('m', INTERACTIVE, 30, timeout=0.05) is None
+    assert scheduler.tenants['m'].tokens.available() == pytest.approx(40, abs=1)
+    scheduler.release(ticket)
+
+def test_queue_timeout_leaves_no_waiter_behind():
+    scheduler = make_scheduler(slots=1, interactive_reserve=0)
+    ticket = scheduler.acquire('a', INTERACTIVE, 1)
+    assert scheduler.acquire('b', INTERACTIVE, 1, timeout=0.05) is None
+    scheduler.release(ticket)
+    stats = scheduler.stats()
+    assert stats['free'] == 1
+    assert stats['tenants']['b']['queued'][INTERACTIVE] == 0
+
+def test_idle_tenants_are_evicted():
+    scheduler = make_scheduler(idle_seconds=0)
+    scheduler.release(scheduler.acquire('a', INTERACTIVE, 1))
+    held = scheduler.acquire('b', INTERACTIVE, 1)
+    assert set(scheduler.tenants) == {'b'}
+    # A tenant with a call in flight is kept
+    scheduler.release(scheduler.acquire('n', INTERACTIVE, 1))
+    assert 'b' in scheduler.tenants
+    scheduler.release(held)
+
+# -------- Tenant Identity --------
+def test_tenant_header_is_only_trusted_from_proxies():
+    proxies = [llm_scheduler.ipaddress.ip_network('10.0.0.0/8')]
+    assert request_tenant('a', '10.1.2.3', proxies) == 'a'
+    assert request_tenant('a', '192.168.0.1', proxies) == ANONYMOUS
+    assert request_tenant('unknown', '10.1.2.3', proxies) == ANONYMOUS
+    assert request_tenant(None, '10.1.2.3', proxies) == ANONYMOUS
+    assert request_tenant('a', 'not-an-ip', proxies) == ANONYMOUS
@@ -0,0 +1,41 @@
+import math
+from metrics import Counter, GaugeCallback, Histogram, render
+
+def test_counters_render_per_label_set():
+    counter = Counter('test_uploads_total', 'Uploads', labelnames=('format',))
+    counter.inc(format='pdf')
+    counter.inc(2, format='pdf')
+    counter.inc(format='do"cx')
+    text = render()
+    assert '# TYPE test_uploads_total counter' in text
+    assert 'test_uploads_total{format="pdf"} 3' in text
+    assert 'test_uploads_total{format="do\\"cx"} 1' in text
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('test_stage_seconds', 'Stage time', labelnames=('stage',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, stage='extract')
+    samples = {(name, labels): value for name, labels, value in histogram.samples()}
+    stage = (('stage', 'extract'),)
+    assert samples[('test_stage_seconds_bucket', stage + (('le', '0.1'),))] == 2
+    assert samples[('test_stage_seconds_bucket', stage + (('le', '1.0'),))] == 3
+    assert samples[('test_stage_seconds_bucket', stage + (('le', '+Inf'),))] == 4
+    assert samples[('test_stage_seconds_count', stage)] == 4
+    assert math.isclose(samples[('test_stage_seconds_sum', stage)], 3.65)
+
+def test_timer_observes_even_when_the_block_raises():
+    histogram = Histogram('test_timed_seconds', 'Timed')
+    try:
+        with histogram.time():
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert dict((name, value) for name, _, value in histogram.samples())['test_timed_seconds_count'] == 1
+
+def test_broken_gauges_do_not_fail_a_scrape():
+    GaugeCallback('test_queue_depth', 'Queue depth', lambda: [({'queue': 'batch'}, 4)])
+    GaugeCallback('test_broken_gauge', 'Broken', lambda: 1 / 0)
+    text = render()
+    assert 'test_queue_depth{queue="batch"} 4' in text
+    assert '# HELP test_broken_gauge Broken' in text
+    assert 'test_broken_gauge ' not in text.replace('# HELP test_broken_gauge', '').replace('# TYPE test_broken_gauge', '')
@@ -0,0 +1,45 @@
+import asyncio
+from groq_client import AsyncGroqClient, GroqClient, RateLimiter
+from metrics import MODEL_FALLBACKS, MODEL_TIER_TOKENS
+from model_routing import AsyncModelRouter, ModelRouter, Route
+
+def tier_tokens(task):
+    return {dict(labels)['type']: value for _, labels, value in MODEL_TIER_TOKENS.samples()
+            if dict(labels)['task'] == task}
+
+def test_invalid_replies_move_to_the_next_tier(stub_groq):
+    client = GroqClient("test-key", stub_groq.url, "stub-model", limiter=RateLimiter(rpm=1000, tpm=1_000_000))
+    router = ModelRouter(client, routes={'fallback_test': [Route('small', 256, 0.3), Route('large', 256, 0.3)]})
+    try:
+        response = router.chat('fallback_test', "Resume text", validate=lambda content: False)
+    finally:
+        client.close()
+    assert "choices" in response
+    assert stub_groq.requests == 2
+    fallbacks = {dict(labels)['tier']: value for _, labels, value in MODEL_FALLBACKS.samples()
+                 if dict(labels)['task'] == 'fallback_test'}
+    assert fallbacks == {'small': 1}
+
+def test_streamed_calls_record_billed_tokens(stub_groq):
+    client = GroqClient("test-key", stub_groq.url, "stub-model", limiter=RateLimiter(rpm=1000, tpm=1_000_000))
+    router = ModelRouter(client, routes={'stream_test': [Route('large', 256, 0.3)]})
+    try:
+        content = "".join(router.chat_stream('stream_test', "x" * 400))
+    finally:
+        client.close()
+    assert content
+    assert tier_tokens('stream_test') == {'prompt': 100, 'completion': len(content) // 4}
+
+def test_async_streamed_calls_record_billed_tokens(stub_groq):
+    async def stream():
+        client = AsyncGroqClient("test-key", stub_groq.url, "stub-model",
+                                 limiter=RateLimiter(rpm=1000, tpm=1_000_000))
+        router = AsyncModelRouter(client, routes={'async_stream_test': [Route('large', 256, 0.3)]})
+        try:
+            return "".join([delta async for delta in router.chat_stream('async_stream_test', "x" * 400)])
+        finally:
+            await client.close()
+
+    content = asyncio.run(stream())
+    assert content
+    assert tier_tokens('async_stream_test') == {'prompt': 100, 'completion': len(content) // 4}
@@ -0,0 +1,55 @@
+import sqlite3
+import pytest
+from near_duplicates import NUM_PERM, NearDuplicateIndex, estimated_similarity, minhash, shingles
+
+RESUME = (
+    "Jane Doe, senior data engineer with eight years of experience building batch and streaming "
+    "pipelines in Python, Spark and Airflow. Led the migration of a nightly warehouse load to "
+    "incremental Kafka consumers, cutting freshness from a day to minutes. Designed dimensional "
+    "models for finance reporting, mentored four engineers and ran the on-call rotation. Skills: "
+    "Python, SQL, Spark, Airflow, Kafka, dbt, Terraform, AWS, Docker, Kubernetes, PostgreSQL."
+)
+OTHER = (
+    "John Smith, frontend developer focused on accessible React interfaces and design systems. "
+    "Shipped a component library used by twelve product teams, introduced visual regression "
+    "testing and halved bundle size through code splitting. Skills: TypeScript, React, Redux, "
+    "CSS, Storybook, Jest, Cypress, Figma, Webpack, Node.js."
+)
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    NearDuplicateIndex().create(conn)
+    return conn
+
+def test_signatures_are_deterministic():
+    signature = minhash(RESUME)
+    assert signature.shape == (NUM_PERM,)
+    assert (minhash(RESUME) == signature).all()
+    assert estimated_similarity(signature, minhash(RESUME.upper())) == 1.0
+    assert minhash("  ...  ") is None
+
+def test_short_texts_fall_back_to_one_shingle():
+    assert len(shingles("two words")) == 1
+    assert shingles("") == set()
+
+def test_similarity_estimates_jaccard():
+    edited = RESUME.replace("four engineers", "five engineers")
+    assert estimated_similarity(minhash(RESUME), minhash(edited)) > 0.8
+    assert estimated_similarity(minhash(RESUME), minhash(OTHER)) < 0.2
+
+def test_finds_near_duplicates_above_the_threshold(conn):
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add(conn, 1, 'digest-1', minhash(RESUME))
+    index.add(conn, 2, 'digest-2', minhash(OTHER))
+    match = index.find(conn, minhash(RESUME.replace("Jane Doe", "Jane A. Doe")))
+    assert match is not None and match[0] == 1 and match[1] >= 0.8
+    assert index.find(conn, minhash("Completely unrelated text about gardening, roses and soil " * 3)) is None
+
+def test_exact_matches_by_digest(conn):
+    index = NearDuplicateIndex()
+    # A file with no extractable text is still matched by its bytes
+    index.add(conn, 7, 'digest-7', None)
+    assert index.find_exact(conn, 'digest-7') == 7
+    assert index.find_exact(conn, 'unknown') is None
+    assert index.find(conn, minhash(RESUME)) is None
@@ -0,0 +1,38 @@
+from groq_client import estimate_tokens
+from prompt_packing import pack_resumes
+
+def sized(filename, text):
+    return estimate_tokens(text) + estimate_tokens(filename) + 8
+
+def resume(i, tokens):
+    return f"cv{i}.pdf", "word " * (tokens * 4 // 5)
+
+def test_every_resume_is_placed_once_within_the_input_budget():
+    resumes = [resume(i, tokens) for i, tokens in enumerate([900, 120, 400, 650, 80, 300, 510, 45, 700])]
+    chunks = pack_resumes(resumes, header_tokens=100, input_budget=1500)
+    placed = [filename for chunk in chunks for filename, _ in chunk]
+    assert sorted(placed) == sorted(filename for filename, _ in resumes)
+    for chunk in chunks:
+        assert sum(sized(filename, text) for filename, text in chunk) <= 1400
+
+def test_first_fit_decreasing_keeps_the_call_count_low():
+    # Packed in arrival order the small resumes pair up and this takes four calls
+    resumes = [resume(i, tokens) for i, tokens in enumerate([350, 350, 350, 650, 650, 650])]
+    chunks = pack_resumes(resumes, input_budget=1064)
+    assert len(chunks) == 3
+    assert all(len(chunk) == 2 for chunk in chunks)
+
+def test_output_budget_caps_resumes_per_chunk():
+    resumes = [resume(i, 10) for i in range(10)]
+    chunks = pack_resumes(resumes, input_budget=10_000, output_budget=400, per_resume_output=100)
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+
+def test_oversized_resume_gets_its_own_trimmed_chunk():
+    big = ("big.pdf", "Experience\n" + "built distributed systems. " * 2000)
+    small = resume(1, 50)
+    chunks = pack_resumes([small, big], header_tokens=200, input_budget=1200)
+    assert len(chunks) == 2
+    (filename, text), = chunks[0]
+    assert filename == "big.pdf"
+    assert sized(filename, text) <= 1000
+    assert chunks[1] == [small]
@@ -0,0 +1,71 @@
+import os
+import resume_cache
+from resume_cache import ResumeCache, file_digest, prompt_version
+
+def make_cache(tmp_path, **options):
+    return ResumeCache(os.path.join(tmp_path, 'cache.sqlite3'), **options)
+
+def test_round_trip_counts_hits_and_misses(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.get('text', 'abc') is None
+    cache.put('text', 'abc', {'text': 'Jane Doe'})
+    assert cache.get('text', 'abc') == {'text': 'Jane Doe'}
+    assert cache.get('groq', 'abc') is None
+    stats = cache.stats()
+    assert stats['entries'] == 1
+    assert stats['hits'] == {'text': 1}
+    assert stats['misses'] == {'text': 1, 'groq': 1}
+
+def test_totals_follow_inserts_updates_and_clear(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put('text', 'a', 'x' * 10)
+    cache.put('text', 'b', 'y' * 20)
+    cache.put('text', 'a', 'z' * 30)
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert stats['bytes'] == len('"' + 'y' * 20 + '"') + len('"' + 'z' * 30 + '"')
+    cache.clear()
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['bytes'] == 0
+
+def test_totals_are_seeded_from_an_existing_file(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put('text', 'a', 'x' * 10)
+    reopened = make_cache(tmp_path)
+    assert reopened.stats()['entries'] == 1
+    assert reopened.stats()['bytes'] == 12
+
+def test_evicts_least_recently_used_first(tmp_path, monkeypatch):
+    # Write every hit straight away so recency is visible to the next put
+    monkeypatch.setattr(resume_cache, 'TOUCH_BATCH', 1)
+    cache = make_cache(tmp_path, max_bytes=100)
+    cache.put('text', 'old', 'a' * 40)
+    cache.put('text', 'new', 'b' * 40)
+    assert cache.get('text', 'old') is not None
+    cache.put('text', 'third', 'c' * 40)
+    assert cache.get('text', 'new') is None
+    assert cache.get('text', 'old') is not None
+    assert cache.get('text', 'third') is not None
+    assert cache.stats()['bytes'] <= 100
+
+def test_batched_hits_count_before_eviction(tmp_path):
+    # Hits are only gathered in memory here; the next put must still see them
+    cache = make_cache(tmp_path, max_bytes=100)
+    cache.put('text', 'old', 'a' * 40)
+    cache.put('text', 'new', 'b' * 40)
+    cache.get('text', 'old')
+    cache.put('text', 'third', 'c' * 40)
+    assert cache.get('text', 'new') is None
+    assert cache.get('text', 'old') is not None
+
+def test_skips_values_larger_than_the_cache(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=10)
+    cache.put('text', 'big', 'x' * 50)
+    assert cache.get('text', 'big') is None
+    assert cache.stats()['entries'] == 0
+
+def test_keys_are_stable():
+    assert file_digest(b'resume') == file_digest(b'resume')
+    assert file_digest(b'resume') != file_digest(b'resume2')
+    assert prompt_version('prompt', 'model-a') != prompt_version('prompt', 'model-b')
+    assert len(prompt_version('prompt')) == 12
@@ -0,0 +1,45 @@
+from resume_sections import budget_sections, heading_kind, split_sections
+
+RESUME = (
+    "Jane Doe\njane@example.com\n"
+    "PROFESSIONAL SUMMARY:\n" + "Engineer who likes data.\n" * 10 +
+    "Technical Skills\nPython, SQL, Spark\n"
+    "Education\n" + "BSc Computer Science\n" * 10 +
+    "Work Experience\n" + "Built pipelines at Acme.\n" * 10
+)
+
+def test_headings_are_recognised_loosely():
+    assert heading_kind('TECHNICAL SKILLS:') == 'skills'
+    assert heading_kind('Tools & Technologies') == 'skills'
+    assert heading_kind('Work   Experience') == 'experience'
+    assert heading_kind('Experience with Python, SQL and Spark at scale for years') is None
+
+def test_split_keeps_document_order_and_text():
+    sections = split_sections(RESUME)
+    assert [kind for kind, _ in sections] == ['header', 'summary', 'skills', 'education', 'experience']
+    assert "".join(text for _, text in sections) == RESUME
+
+def test_short_text_is_untouched():
+    assert budget_sections(RESUME, len(RESUME)) == RESUME
+
+def test_budget_goes_to_high_value_sections_first():
+    kept = budget_sections(RESUME, 400)
+    assert len(kept) <= 400
+    assert kept.startswith("Jane Doe\njane@example.com\n")
+    assert "Python, SQL, Spark" in kept
+    assert "Built pipelines at Acme." in kept
+    # What is kept stays in document order
+    assert kept.index("Python") < kept.index("Built pipelines")
+
+def test_leftover_budget_extends_higher_value_sections_first():
+    text = "Jane Doe\nEducation\n" + "BSc Computer Science\n" * 10 + "Work Experience\n" + "Built pipelines at Acme.\n" * 10
+    kept = budget_sections(text, 300)
+    assert len(kept) <= 300
+    assert kept.startswith("Jane Doe\nEducation\nBSc Computer Science\n")
+    assert kept.count("Built pipelines at Acme.") > kept.count("BSc Computer Science") > 0
+
+def test_one_oversized_section_cannot_crowd_out_the_rest():
+    text = "Skills\n" + "Portfolio item\n" * 500 + "Experience\nLead engineer at Acme\n"
+    kept = budget_sections(text, 400)
+    assert "Lead engineer at Acme" in kept
+    assert len(kept) <= 400
@@ -0,0 +1,62 @@
+import os
+import threading
+import openpyxl
+import pytest
+from resume_store import ResumeStore
+
+def resume(name, **fields):
+    return dict({'name': name, 'email': f'{name.lower()}@example.com', 'skills': ['Python', 'SQL'],
+                 'used_software': ['Git'], 'experience_in_years': 3, 'expected_domain': 'Data'}, **fields)
+
+@pytest.fixture
+def store(tmp_path):
+    return ResumeStore(os.path.join(tmp_path, 'resumes.sqlite3'), linger=0.001)
+
+def test_save_returns_the_committed_id(store):
+    first = store.save(resume('Ada', filename='ada.pdf'))
+    second = store.save(resume('Alan'))
+    assert second == first + 1
+    assert store.count() == 2
+    assert [item['name'] for item in store.recent()] == ['Alan', 'Ada']
+    assert store.recent()[1]['filename'] == 'ada.pdf'
+
+def test_rows_keep_the_spreadsheet_shape(store):
+    store.save(resume('Ada'))
+    assert list(store.iter_rows()) == [('Ada', 'ada@example.com', '', 3, 'Python, SQL', 'Git', 'Data')]
+
+def test_unawaited_saves_are_visible_after_flush(store):
+    for name in ('Ada', 'Alan', 'Grace'):
+        assert store.save(resume(name), wait=False) is None
+    store.flush()
+    assert store.count() == 3
+    assert [row[0] for row in store.iter_rows()] == ['Ada', 'Alan', 'Grace']
+
+def test_concurrent_saves_get_distinct_ids(tmp_path):
+    store = ResumeStore(os.path.join(tmp_path, 'resumes.sqlite3'), linger=0.05)
+    ids = []
+    threads = [threading.Thread(target=lambda i=i: ids.append(store.save(resume(f'C{i}')))) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(ids) == list(range(1, 21))
+    assert store.count() == 20
+
+def test_a_bad_row_does_not_sink_its_group(store):
+    good = resume('Ada')
+    bad = resume('Alan', extra={1, 2})  # not JSON serialisable
+    with pytest.raises(TypeError):
+        store.save_many([good, bad])
+    assert store.count() == 1
+    assert next(store.iter_rows())[0] == 'Ada'
+
+def test_legacy_workbook_is_imported_once(store, tmp_path):
+    path = os.path.join(tmp_path, 'resumes_data.xlsx')
+    wb = openpyxl.Workbook()
+    wb.active.append(['Name', 'Email', 'Phone Number', 'Experience (Years)', 'Skills', 'Used Software', 'Expected Domain'])
+    wb.active.append(['Ada', 'ada@example.com', '555', 3, 'Python, SQL', 'Git', 'Data'])
+    wb.active.append([None] * 7)
+    wb.save(path)
+    assert store.import_excel(path) == 1
+    assert store.import_excel(path) == 0
+    assert list(store.iter_rows()) == [('Ada', 'ada@example.com', '555', 3, 'Python, SQL', 'Git', 'Data')]
@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+import threading
+import subprocess
+from lazy_loading import LazyModule, LazyObject
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('numpy', 'fitz', 'openpyxl', 'requests')
+
+def test_lazy_object_is_built_once():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {'ready': True}
+
+    service = LazyObject('service', build)
+    assert not service.loaded
+    threads = [threading.Thread(target=service.load) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert service.get('ready') is True
+    assert len(calls) == 1 and service.load_seconds is not None
+
+def test_lazy_module_imports_on_first_use():
+    module = LazyModule('json')
+    assert not module.loaded
+    assert module.dumps([1]) == '[1]'
+    assert module.loaded
+
+def test_importing_the_app_loads_no_heavy_modules():
+    # A fresh interpreter, since other tests import these modules
+    code = (
+        "import sys, json, main\n"
+        f"print(json.dumps([[m for m in {HEAVY_MODULES!r} if m in sys.modules], [s.loaded for s in main.SERVICES]]))"
+    )
+    env = dict(os.environ, PRELOAD_SERVICES='0')
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+                            timeout=60, check=True)
+    heavy, loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    assert heavy == []
+    assert not any(loaded)
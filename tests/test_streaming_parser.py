@@ -0,0 +1,36 @@
+import json
+from main import StreamingResumeParser, extract_resumes_from_groq_content
+
+def block(number, filename, fields):
+    return f"**Resume {number} - {filename}**\n```json\n{json.dumps(fields)}\n```\n\n"
+
+def test_resumes_come_out_as_their_blocks_complete():
+    reply = block(1, "a.pdf", {"name": "Ada"}) + block(2, "b.docx", {"name": "Bob"})
+    cut = reply.index("```\n\n") + 3
+    parser = StreamingResumeParser()
+    assert parser.feed(reply[:cut - 10]) == []
+    assert parser.feed(reply[cut - 10:cut]) == [{"name": "Ada", "filename": "a.pdf"}]
+    assert parser.feed(reply[cut:]) == [{"name": "Bob", "filename": "b.docx"}]
+
+def test_reply_fed_a_few_characters_at_a_time():
+    resumes = [{"name": f"Candidate {i}", "experience_in_years": i} for i in range(1, 6)]
+    reply = "Here are the results:\n\n" + "".join(block(i, f"cv {i}.pdf", r) for i, r in enumerate(resumes, 1))
+    parser = StreamingResumeParser()
+    parsed = []
+    for start in range(0, len(reply), 7):
+        parsed += parser.feed(reply[start:start + 7])
+    assert [r["filename"] for r in parsed] == [f"cv {i}.pdf" for i in range(1, 6)]
+    assert parsed == extract_resumes_from_groq_content(reply)
+
+def test_header_variants():
+    reply = ("Resume 1 - plain.pdf:\n```json\n{\"n\": 1}\n```\n"
+             "**Resume 2 - colon inside.pdf:**\n```\n{\"n\": 2}\n```\n"
+             "**Resume 3: colon-sep.pdf**:\n```json\n{\"n\": 3}```\n")
+    parsed = StreamingResumeParser().feed(reply)
+    assert [(r["filename"], r["n"]) for r in parsed] == [
+        ("plain.pdf", 1), ("colon inside.pdf", 2), ("colon-sep.pdf", 3)]
+
+def test_malformed_block_is_skipped_without_stalling_the_stream():
+    parser = StreamingResumeParser()
+    assert parser.feed(block(1, "bad.pdf", {"x": 1}).replace('"x"', 'x')) == []
+    assert parser.feed(block(2, "good.pdf", {"x": 2})) == [{"x": 2, "filename": "good.pdf"}]
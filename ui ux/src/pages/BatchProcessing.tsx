@@ -13,7 +13,7 @@ interface BatchResult {
 }
 
 interface BatchHistory {
-  id: number;
+  id: string;
   date: string;
   filesCount: number;
   status: string;
@@ -63,34 +63,32 @@ const BatchProcessing = () => {
     });
 
     try {
-      // Simulate progress
-      const progressInterval = setInterval(() => {
-        setProgress(prev => {
-          if (prev >= 90) {
-            clearInterval(progressInterval);
-            return prev;
-          }
-          return prev + 10;
-        });
-      }, 500);
-
       const response = await fetch('http://localhost:5000/api/batch/process', {
         method: 'POST',
         body: formData,
       });
 
-      clearInterval(progressInterval);
-      setProgress(100);
-
-      if (response.ok) {
-        const data = await response.json();
-        setResults(data.results);
-        setSummary(data.summary);
-        fetchBatchHistory(); // Refresh history
-      } else {
+      if (!response.ok) {
         const error = await response.json();
         console.error('Batch processing failed:', error);
+        return;
+      }
+
+      // The batch runs in the background; poll the job until it finishes
+      const { status_url } = await response.json();
+      while (true) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const jobResponse = await fetch(`http://localhost:5000${status_url}`);
+        if (!jobResponse.ok) break;
+        const job = await jobResponse.json();
+        setProgress(job.progress);
+        setResults(job.results);
+        if (['completed', 'partial', 'failed'].includes(job.status)) {
+          setSummary(job.summary);
+          break;
+        }
       }
+      fetchBatchHistory(); // Refresh history
     } catch (error) {
       console.error('Network error:', error);
     } finally {
@@ -102,6 +100,7 @@ const BatchProcessing = () => {
     switch (status) {
       case 'success':
       case 'processed':
+      case 'duplicate':
         return <CheckCircle className="w-5 h-5 text-green-500" />;
       case 'error':
         return <XCircle className="w-5 h-5 text-red-500" />;
@@ -157,7 +156,7 @@ const BatchProcessing = () => {
                       Click to select PDF files
                     </p>
                     <p className="text-sm text-slate-500 dark:text-slate-400">
-                      Maximum 20 files per batch
+                      Maximum 500 files per batch
                     </p>
                   </div>
                 </label>